@@ -0,0 +1,22 @@
+"""Micro-benchmarks for the per-tick hot paths of the three games.
+
+Every benchmark builds a realistic scenario (a long snake, a board full of
+food, hundreds of ghosts, a large maze), then times one call of a hot path
+(Snake.move, Food.spawn, Game.update, Game.draw, ...) at a time, headless
+under the SDL dummy video driver. Games are seeded, so every run measures
+the same play.
+
+    python -m benchmarks run --out results.json           # all benchmarks
+    python -m benchmarks run --filter pacman2. --out new.json
+    python -m benchmarks compare results.json new.json    # exit status 1 on regressions
+
+Benchmarks live in one module per game and register with @benchmark(name).
+"""
+import os
+
+# Must be set before pygame creates a display in any of the games
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from benchmarks.harness import benchmark, compare, measure, registered, run
+from benchmarks import snake, pacman, pacman2 # Registers their benchmarks
@@ -0,0 +1,48 @@
+"""Command line for the benchmarks: `python -m benchmarks run|compare ...` (see benchmarks/__init__.py)."""
+import argparse
+import sys
+
+from benchmarks import harness
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write their results as JSON")
+    run_parser.add_argument("--out", help="results file to write")
+    run_parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    run_parser.add_argument("--min-time", type=float, default=harness.MIN_TIME,
+                            help="seconds of timed samples per benchmark (default: %(default)s)")
+    run_parser.add_argument("--list", action="store_true", help="list the benchmarks instead of running them")
+
+    compare_parser = commands.add_parser("compare", help="compare results against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=harness.REGRESSION_THRESHOLD,
+                                help="slowdown reported as a regression (default: %(default)s = 10%%)")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        if args.list:
+            print("\n".join(harness.registered(args.filter)))
+            return
+        document = harness.run(args.filter, args.min_time)
+        if args.out:
+            harness.save(document, args.out)
+            print(f"Results written to {args.out}")
+    else:
+        baseline, current = harness.load(args.baseline), harness.load(args.current)
+        rows = harness.compare(baseline, current, args.threshold)
+        for name, slowdown, p99_change, regressed in rows:
+            flag = "REGRESSION" if regressed else ""
+            print(f"{name:40} {slowdown:+8.1%} time/op   {p99_change:+8.1%} p99   {flag}")
+        for name in sorted(set(baseline["results"]) ^ set(current["results"])):
+            print(f"{name:40} only in {'baseline' if name in baseline['results'] else 'current'}")
+        regressions = sum(regressed for *_, regressed in rows)
+        print(f"{regressions} regression(s) over {args.threshold:.0%} in {len(rows)} benchmarks")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Timing harness: registers benchmarks, measures them and compares result files."""
+import contextlib
+import gc
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+MIN_TIME = 1.0 # Seconds of timed samples per benchmark
+WARMUP_TIME = 0.2 # Seconds of untimed calls before sampling (fills caches, settles the allocator)
+MIN_SAMPLES = 30
+SAMPLE_TARGET_NS = 20_000 # Fast ops are timed in batches of at least this long, so timer overhead stays small
+REGRESSION_THRESHOLD = 0.10 # Default slowdown (10%) that compare() reports as a regression
+PERCENTILES = (50, 90, 99)
+
+_benchmarks = {} # name -> setup function, in registration order
+
+
+def benchmark(name):
+    """Registers a benchmark. The decorated setup() builds a scenario and returns the op to time."""
+    def register(setup):
+        _benchmarks[name] = setup
+        return setup
+    return register
+
+
+def registered(pattern=None):
+    """Names of the registered benchmarks containing `pattern` (all if None)."""
+    return [name for name in _benchmarks if pattern is None or pattern in name]
+
+
+def measure(op, min_time=MIN_TIME):
+    """Times op() and returns its stats: ops/sec plus latency percentiles in microseconds.
+
+    Each sample times `batch` back-to-back calls (1 unless a call is shorter than
+    SAMPLE_TARGET_NS), so percentiles of fast ops are over batch averages.
+    """
+    clock = time.perf_counter_ns
+    warmup_end = clock() + int(WARMUP_TIME * 1e9)
+    calls = 0
+    start = clock()
+    while clock() < warmup_end:
+        op()
+        calls += 1
+    per_call = (clock() - start) / calls
+    batch = max(1, int(SAMPLE_TARGET_NS // max(per_call, 1)))
+
+    gc.collect()
+    samples = []
+    total = 0
+    while total < min_time * 1e9 or len(samples) < MIN_SAMPLES:
+        start = clock()
+        for _ in range(batch):
+            op()
+        elapsed = clock() - start
+        samples.append(elapsed / batch)
+        total += elapsed
+
+    latencies = np.array(samples) / 1000.0 # ns -> us
+    stats = {
+        "ops_per_sec": len(samples) * batch / (total / 1e9),
+        "mean_us": float(latencies.mean()),
+        "min_us": float(latencies.min()),
+    }
+    for p, value in zip(PERCENTILES, np.percentile(latencies, PERCENTILES)):
+        stats[f"p{p}_us"] = float(value)
+    stats["samples"] = len(samples)
+    stats["batch"] = batch
+    return stats
+
+
+def run(pattern=None, min_time=MIN_TIME, report=print):
+    """Sets up and measures every matching benchmark. Returns the results document."""
+    import pygame
+
+    results = {}
+    for name in registered(pattern):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull): # The games' own prints
+            op = _benchmarks[name]()
+            results[name] = stats = measure(op, min_time)
+        report(f"{name:40} {stats['ops_per_sec']:12.0f} ops/s   p50 {stats['p50_us']:9.1f} us"
+               f"   p99 {stats['p99_us']:9.1f} us")
+        del op
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "pygame": pygame.version.ver,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def save(document, path):
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """Compares two results documents.
+
+    Returns one row per benchmark in both, (name, slowdown, p99 change, regressed),
+    where slowdown is how much longer an op takes on average (baseline ops/sec /
+    current ops/sec - 1) and regressed is True when it exceeds `threshold`.
+    """
+    rows = []
+    for name, old in baseline["results"].items():
+        new = current["results"].get(name)
+        if new is None:
+            continue
+        slowdown = old["ops_per_sec"] / new["ops_per_sec"] - 1
+        p99_change = new["p99_us"] / old["p99_us"] - 1
+        rows.append((name, slowdown, p99_change, slowdown > threshold))
+    return rows
@@ -0,0 +1,106 @@
+"""pacman_game benchmarks: wall checks, full ticks (few ghosts, mass ghosts, a large maze) and drawing."""
+import itertools
+import random
+
+import pacman_game
+from pacman_game import DOWN, INITIAL_LIVES, LEFT, RIGHT, UP, Game
+
+from benchmarks.harness import benchmark
+
+SEED = 0
+DIRECTIONS = [UP, DOWN, LEFT, RIGHT]
+TURN_PROB = 0.05 # Chance per tick that the simulated player presses a new direction
+
+
+def large_level_map(cols=81, rows=61, ghosts=5):
+    """A level map of `cols` x `rows` tiles: a lattice of one-tile corridors around wall pillars, full of food."""
+    level_map = []
+    for y in range(rows):
+        row = ""
+        for x in range(cols):
+            border = x in (0, cols - 1) or y in (0, rows - 1)
+            row += "W" if border or (x % 2 == 0 and y % 2 == 0) else "F"
+        level_map.append(row)
+    level_map[1] = "WP" + level_map[1][2:]
+    for i in range(ghosts):
+        y = rows // 2 + 2 * (i - ghosts // 2) - 1
+        level_map[y] = level_map[y][:cols // 2] + "G" + level_map[y][cols // 2 + 1:]
+    return level_map
+
+
+def make_game(mass_ghosts=False, dirty_rects=False, level_map=None):
+    """A seeded Game on level 1, or on `level_map` played as the level after the shipped ones."""
+    level_maps = None if level_map is None else pacman_game.LEVEL_MAPS + [level_map] # A copy; LEVEL_MAPS is untouched
+    game = Game(dirty_rects=dirty_rects, mass_ghosts=mass_ghosts, seed=SEED, level_maps=level_maps)
+    if level_map is not None:
+        game.current_level_index = len(level_maps) - 1
+        game.load_level(game.current_level_index)
+    if mass_ghosts:
+        # Pacman dies nearly every tick among this many ghosts; let the batch spread out over the maze
+        # instead of returning to the start tiles at each death (the collision check itself still runs)
+        game.ghost_batch.reset_positions = lambda: None
+    return game
+
+
+def play(game):
+    """Returns an op running one Game.update with Pacman steered at random and never losing or leaving the level."""
+    rng = random.Random(SEED)
+    pacman = game.pacman
+
+    def op():
+        if rng.random() < TURN_PROB:
+            pacman.change_direction(rng.choice(DIRECTIONS))
+        pacman.lives = INITIAL_LIVES
+        game.death_pause_ticks = 0 # Every timed tick runs the full update
+        game.update()
+        if game.level_complete_screen:
+            game.load_level(game.current_level_index)
+    return op
+
+
+@benchmark("pacman.can_move_in_direction")
+def can_move_in_direction():
+    game = make_game()
+    directions = itertools.cycle(DIRECTIONS)
+    can_move = game.ghosts[0].can_move_in_direction
+    return lambda: can_move(next(directions))
+
+
+@benchmark("pacman.update")
+def update():
+    return play(make_game())
+
+
+@benchmark("pacman.update_mass_ghosts")
+def update_mass_ghosts():
+    """Game.update with MASS_GHOST_COUNT ghosts in a GhostBatch."""
+    return play(make_game(mass_ghosts=True))
+
+
+@benchmark("pacman.update_large_maze")
+def update_large_maze():
+    """Game.update on an 81x61-tile maze (chase paths search far more tiles)."""
+    return play(make_game(level_map=large_level_map()))
+
+
+def draw_op(game):
+    """Returns an op drawing one interpolated frame, after a second of play."""
+    tick = play(game)
+    for _ in range(pacman_game.FPS):
+        tick()
+    return lambda: game.draw(0.5)
+
+
+@benchmark("pacman.draw")
+def draw():
+    return draw_op(make_game())
+
+
+@benchmark("pacman.draw_dirty_rects")
+def draw_dirty_rects():
+    return draw_op(make_game(dirty_rects=True))
+
+
+@benchmark("pacman.draw_mass_ghosts")
+def draw_mass_ghosts():
+    return draw_op(make_game(mass_ghosts=True))
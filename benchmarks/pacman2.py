@@ -0,0 +1,104 @@
+"""pacman2_game benchmarks: ghost move decisions, full ticks (few ghosts and a 5,000-ghost swarm) and drawing."""
+import itertools
+import random
+
+from pacman2_game import (GAME_FPS, GAME_STATE_LEVEL_COMPLETE, GAME_STATE_PLAYING, GHOST_MOVES, GHOST_START_GRID_POS,
+                          Game)
+
+from benchmarks.harness import benchmark
+
+SEED = 0
+TURN_PROB = 0.2 # Chance per tick that the simulated player presses a new direction (ticks are 10 per second)
+SWARM_SIZE = 5000
+
+
+def make_game(mass_ghosts=False, dirty_rects=False):
+    """A seeded Game, past the menu; in mass-ghost mode with SWARM_SIZE ghosts spread over the maze."""
+    game = Game(dirty_rects=dirty_rects, mass_ghosts=mass_ghosts, seed=SEED)
+    game.game_state = GAME_STATE_PLAYING
+    if mass_ghosts:
+        rng = random.Random(SEED)
+        swarm = game.ghost_swarm
+        tiles = open_tiles(game)
+        while len(swarm) < SWARM_SIZE:
+            swarm.add(*GHOST_START_GRID_POS, game.ghost_base_speed, len(swarm))
+        # Scatter the whole swarm (the level's MASS_GHOST_COUNT ghosts start on one tile) over the maze
+        positions = [rng.choice(tiles) for _ in range(SWARM_SIZE)]
+        swarm.x[:SWARM_SIZE] = swarm.prev_x[:SWARM_SIZE] = [x for x, _ in positions]
+        swarm.y[:SWARM_SIZE] = swarm.prev_y[:SWARM_SIZE] = [y for _, y in positions]
+        swarm._update_occupancy()
+        # With this many ghosts Pacman dies nearly every tick; keep the swarm spread out instead of
+        # stacking it on the start tile at each death (the collision check itself still runs)
+        swarm.reset_positions = lambda x, y: None
+    return game
+
+
+def open_tiles(game):
+    return [(c, r) for r, row in enumerate(game.maze) for c, tile in enumerate(row) if tile == 0]
+
+
+def play(game):
+    """Returns an op running one Game.update with Pacman steered at random and never losing or leaving the level."""
+    rng = random.Random(SEED)
+
+    def op():
+        if rng.random() < TURN_PROB:
+            game.pacman.set_direction(*rng.choice(GHOST_MOVES))
+        game.lives = game.pacman.lives = 3
+        game.update()
+        if game.game_state == GAME_STATE_LEVEL_COMPLETE:
+            game.setup_level()
+    return op
+
+
+@benchmark("pacman2.calculate_next_move")
+def calculate_next_move():
+    """Ghost.calculate_next_move from every open tile and heading, towards a handful of Pacman positions."""
+    game = make_game()
+    rng = random.Random(SEED)
+    tiles = open_tiles(game)
+    targets = rng.sample(tiles, 8)
+    cases = [(tile, rng.choice(GHOST_MOVES), rng.choice(targets)) for tile in tiles]
+    rng.shuffle(cases)
+    cases = itertools.cycle(cases)
+    ghost = game.ghosts[0]
+    maze, flow_fields, nav_graph = game.maze, game.flow_fields, game.nav_graph
+
+    def op():
+        (ghost.grid_x, ghost.grid_y), (ghost.dx, ghost.dy), target = next(cases)
+        ghost.calculate_next_move(maze, target, flow_fields, nav_graph)
+    return op
+
+
+@benchmark("pacman2.update")
+def update():
+    return play(make_game())
+
+
+@benchmark("pacman2.update_mass_ghosts")
+def update_mass_ghosts():
+    """Game.update with SWARM_SIZE ghosts in a GhostSwarm."""
+    return play(make_game(mass_ghosts=True))
+
+
+def draw_op(game):
+    """Returns an op drawing one interpolated frame, after a second of play."""
+    tick = play(game)
+    for _ in range(GAME_FPS):
+        tick()
+    return lambda: game.draw(0.5)
+
+
+@benchmark("pacman2.draw")
+def draw():
+    return draw_op(make_game())
+
+
+@benchmark("pacman2.draw_dirty_rects")
+def draw_dirty_rects():
+    return draw_op(make_game(dirty_rects=True))
+
+
+@benchmark("pacman2.draw_mass_ghosts")
+def draw_mass_ghosts():
+    return draw_op(make_game(mass_ghosts=True))
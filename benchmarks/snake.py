@@ -0,0 +1,77 @@
+"""snake_game benchmarks: moving a long snake and spawning food on crowded boards."""
+import random
+from collections import deque
+
+from snake_game import CELL_SIZE, GRID_SIZE, Food, FreeCells, Snake, cell_index, cell_position
+
+from benchmarks.harness import benchmark
+
+SEED = 0
+
+
+def hamiltonian_cycle():
+    """Cell indices of a cycle through every cell of the (even-sized) grid.
+
+    Row 0 left to right, then rows snake back and forth over columns 1.., and
+    column 0 leads back up to the start.
+    """
+    cycle = list(range(GRID_SIZE)) # Row 0
+    for row in range(1, GRID_SIZE):
+        cols = range(GRID_SIZE - 1, 0, -1) if row % 2 else range(1, GRID_SIZE)
+        cycle += [row * GRID_SIZE + col for col in cols]
+    cycle += [row * GRID_SIZE for row in range(GRID_SIZE - 1, 0, -1)]
+    return cycle
+
+
+def long_snake(length):
+    """A Snake of `length` segments laid along hamiltonian_cycle(), plus the direction to take from each cell."""
+    cycle = hamiltonian_cycle()
+    turns = {}
+    for index, cell in enumerate(cycle):
+        next_cell = cycle[(index + 1) % len(cycle)]
+        (x, y), (next_x, next_y) = cell_position(cell), cell_position(next_cell)
+        turns[cell] = ((next_x - x) // CELL_SIZE, (next_y - y) // CELL_SIZE)
+
+    snake = Snake()
+    body = cycle[:length][::-1] # Head first
+    snake.positions = deque(cell_position(cell) for cell in body)
+    snake.length = length
+    snake.direction = turns[body[1]]
+    snake.occupied = bytearray(GRID_SIZE * GRID_SIZE)
+    snake.free_cells = FreeCells(GRID_SIZE * GRID_SIZE)
+    for cell in body:
+        snake.occupied[cell] = 1
+        snake.free_cells.discard(cell)
+    return snake, turns
+
+
+@benchmark("snake.move_long_snake")
+def move_long_snake():
+    """Snake.move for a 300-segment snake following a cycle through the board (never dies)."""
+    snake, turns = long_snake(300)
+
+    def op():
+        snake.turn(turns[cell_index(snake.positions[0])])
+        snake.move()
+    return op
+
+
+@benchmark("snake.food_spawn_crowded_board")
+def food_spawn_crowded_board():
+    """Food.respawn when the snake covers all but 10 cells of the board."""
+    snake, _ = long_snake(GRID_SIZE * GRID_SIZE - 10)
+    food = Food(snake.free_cells, rng=random.Random(SEED))
+    return lambda: food.respawn(snake.free_cells)
+
+
+@benchmark("snake.food_spawn_full_food_grid")
+def food_spawn_full_food_grid():
+    """Food.spawn topping up one eaten item with 200 food items on the board."""
+    snake = Snake()
+    rng = random.Random(SEED)
+    food = Food(snake.free_cells, count=200, rng=rng)
+
+    def op():
+        food.positions.pop(rng.randrange(len(food.positions)))
+        food.spawn(snake.free_cells)
+    return op
@@ -0,0 +1,49 @@
+"""Opt-in dirty-rectangle rendering shared by the game loops.
+
+By default each game clears the whole screen, redraws everything and calls
+pygame.display.flip(). In dirty-rect mode the game keeps a background layer
+(the pre-rendered maze, or the snake board) and each frame:
+
+1. restores the areas drawn over last frame, plus any areas where the
+   background itself changed, from that layer (restore);
+2. draws the moving parts (entities, HUD text) and collects the rects
+   returned by those blit/draw calls;
+3. pushes only those rects to the display with pygame.display.update (present).
+"""
+import pygame
+
+
+class DirtyRects:
+    def __init__(self, screen):
+        self.screen = screen
+        self.drawn = [] # Areas drawn over the background last frame
+        self.changed = [] # Background areas that changed since the last frame
+        self.full_redraw = True # First frame always repaints the whole screen
+
+    def invalidate(self):
+        """Makes the next frame repaint and push the whole screen (e.g. after a level load)."""
+        self.full_redraw = True
+
+    def background_changed(self, rect):
+        """Marks an area of the background layer as changed (e.g. an eaten food dot)."""
+        self.changed.append(pygame.Rect(rect))
+
+    def restore(self, background):
+        """Start of frame: copies the background back over last frame's drawings and changes."""
+        if self.full_redraw:
+            self.screen.blit(background, (0, 0))
+            return
+        for rect in self.drawn:
+            self.screen.blit(background, rect, rect)
+        for rect in self.changed:
+            self.screen.blit(background, rect, rect)
+
+    def present(self, drawn):
+        """End of frame: pushes the areas touched this frame and remembers `drawn` for the next."""
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.drawn + self.changed + drawn)
+        self.drawn = drawn
+        self.changed = []
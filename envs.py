@@ -0,0 +1,345 @@
+"""Gym-style environments over the three games, plus a multi-process VectorEnv.
+
+Every env runs its game headless: nothing is drawn, clock.tick is never
+called and SDL uses the dummy video driver, so a step only costs the game's
+update logic. The API follows the classic gym shape:
+
+    obs = env.reset()
+    obs, reward, done, info = env.step(action)
+
+Actions are indices into ACTIONS (0 keeps the current direction). Observations
+are uint8 tile grids using the TILE_* codes below; the reward is the score
+gained during the step. Every env has its own random stream, reseeded by
+reset(seed).
+"""
+import os
+import random
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+# Must be set before pygame creates a display in any of the games
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+import snake_game
+import pacman_game
+import pacman2_game
+
+# Action index -> (dx, dy) direction, None means "no new input"
+ACTIONS = [None, (0, -1), (0, 1), (-1, 0), (1, 0)]
+NUM_ACTIONS = len(ACTIONS)
+
+# Tile codes used in observations
+TILE_EMPTY = 0
+TILE_WALL = 1
+TILE_FOOD = 2
+TILE_BODY = 3
+TILE_PLAYER = 4
+TILE_GHOST = 5
+
+
+def _mark(out, tiles, code):
+    """Writes `code` into `out` at each (col, row) tile that lies inside the grid."""
+    rows, cols = out.shape
+    for c, r in tiles:
+        if 0 <= c < cols and 0 <= r < rows:
+            out[r, c] = code
+
+
+# --- Environments ---
+
+class SnakeEnv:
+    """snake_game.Snake and Food driven one tick per step, as in snake_game.main."""
+    observation_shape = (snake_game.GRID_SIZE, snake_game.GRID_SIZE)
+
+    def __init__(self):
+        self.rng = random.Random()
+        self.snake = snake_game.Snake()
+        self.food = snake_game.Food(self.snake.free_cells, rng=self.rng)
+        self.done = False
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng.seed(seed)
+        self.snake.reset()
+        self.food.respawn(self.snake.free_cells)
+        self.done = False
+        return self.observation()
+
+    def step(self, action):
+        reward, done, info = self.advance(action)
+        return self.observation(), reward, done, info
+
+    def advance(self, action):
+        """Runs one tick without building an observation. Returns (reward, done, info)."""
+        snake = self.snake
+        previous_score = snake.score
+        if not self.done:
+            direction = ACTIONS[action]
+            if direction is not None:
+                snake.turn(direction)
+            if snake.move():
+                self.done = True
+            elif snake.get_head_position() in self.food.positions:
+                snake.eat()
+                self.food.remove(snake.get_head_position())
+                if not self.food.spawn(snake.free_cells):
+                    self.done = True # Board is full
+        info = {"score": snake.score, "length": snake.length}
+        return snake.score - previous_score, self.done, info
+
+    def observation(self, out=None):
+        if out is None:
+            out = np.empty(self.observation_shape, dtype=np.uint8)
+        # The snake's occupancy grid already has one byte per cell
+        occupied = np.frombuffer(self.snake.occupied, dtype=np.uint8).reshape(self.observation_shape)
+        np.multiply(occupied, TILE_BODY, out=out)
+        cell = snake_game.CELL_SIZE
+        _mark(out, [(x // cell, y // cell) for x, y in self.food.positions], TILE_FOOD)
+        head_x, head_y = self.snake.get_head_position()
+        _mark(out, [(head_x // cell, head_y // cell)], TILE_PLAYER)
+        return out
+
+
+def _level_grid_shape(level_maps):
+    """(rows, cols) fitting every level map up to its widest row, like level_compiler's padded tile grid.
+
+    pacman_game.MAP_WIDTH is only the first row's length; longer rows hold food too.
+    """
+    return max(len(rows) for rows in level_maps), max(len(row) for rows in level_maps for row in rows)
+
+
+class PacmanEnv:
+    """pacman_game.Game stepped through Game.update; levels advance automatically."""
+    observation_shape = _level_grid_shape(pacman_game.LEVEL_MAPS)
+
+    def __init__(self):
+        self.game = pacman_game.Game()
+        self._walls_for = None # Level map the cached wall grid was built from
+        self._wall_grid = np.zeros(self.observation_shape, dtype=np.uint8)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.game.rng.seed(seed)
+        self.game.reset_game_state()
+        return self.observation()
+
+    def step(self, action):
+        reward, done, info = self.advance(action)
+        return self.observation(), reward, done, info
+
+    def advance(self, action):
+        game = self.game
+        previous_score = game.pacman.score
+        if not game.game_over:
+            direction = ACTIONS[action]
+            if direction is not None:
+                game.pacman.change_direction(direction)
+            game.update()
+            if game.level_complete_screen:
+                # Same as pressing SPACE on the level-complete screen
+                game.current_level_index += 1
+                game.load_level(game.current_level_index)
+        info = {"score": game.pacman.score, "lives": game.pacman.lives, "level": game.current_level_index + 1}
+        return game.pacman.score - previous_score, game.game_over, info
+
+    def observation(self, out=None):
+        if out is None:
+            out = np.empty(self.observation_shape, dtype=np.uint8)
+        game = self.game
+        if self._walls_for is not game.current_level_map:
+            # Walls only change on level load, so the wall layer is rebuilt once per level
+            self._wall_grid.fill(TILE_EMPTY)
+            tile = pacman_game.TILE_SIZE
+            _mark(self._wall_grid, [(w.x // tile, w.y // tile) for w in game.walls], TILE_WALL)
+            self._walls_for = game.current_level_map
+        out[...] = self._wall_grid
+        _mark(out, game.food_dots, TILE_FOOD) # Keyed by (col, row) tile
+        _mark(out, [g.get_grid_pos() for g in game.ghosts], TILE_GHOST)
+        if game.ghost_batch is not None:
+            ghost_x, ghost_y = game.ghost_batch.grid_positions()
+            inside = (ghost_x >= 0) & (ghost_x < out.shape[1]) & (ghost_y >= 0) & (ghost_y < out.shape[0])
+            out[ghost_y[inside], ghost_x[inside]] = TILE_GHOST
+        _mark(out, [game.pacman.get_grid_pos()], TILE_PLAYER)
+        return out
+
+
+class Pacman2Env:
+    """pacman2_game.Game stepped through Game.update; levels advance automatically."""
+    observation_shape = (pacman2_game.MAZE_ROWS, pacman2_game.MAZE_COLS)
+
+    def __init__(self):
+        self.game = pacman2_game.Game()
+        self._wall_grid = (np.array(pacman2_game.MAZE_GRID, dtype=np.uint8) == 1).astype(np.uint8) * TILE_WALL
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.game.rng.seed(seed)
+        self.game.reset_game()
+        return self.observation()
+
+    def step(self, action):
+        reward, done, info = self.advance(action)
+        return self.observation(), reward, done, info
+
+    def advance(self, action):
+        game = self.game
+        previous_score = game.score
+        if game.game_state != pacman2_game.GAME_STATE_GAME_OVER:
+            direction = ACTIONS[action]
+            if direction is not None:
+                game.pacman.set_direction(*direction)
+            game.update()
+            if game.game_state == pacman2_game.GAME_STATE_LEVEL_COMPLETE:
+                game.setup_level() # Same as pressing R on the level-complete screen
+        done = game.game_state == pacman2_game.GAME_STATE_GAME_OVER
+        info = {"score": game.score, "lives": game.lives, "level": game.level}
+        return game.score - previous_score, done, info
+
+    def observation(self, out=None):
+        if out is None:
+            out = np.empty(self.observation_shape, dtype=np.uint8)
+        game = self.game
+        out[...] = self._wall_grid
+        out[game.food_grid] = TILE_FOOD
+        _mark(out, [g.get_grid_pos() for g in game.ghosts], TILE_GHOST)
+        if game.ghost_swarm is not None:
+            ghost_x, ghost_y = game.ghost_swarm.positions()
+            out[ghost_y, ghost_x] = TILE_GHOST
+        _mark(out, [game.pacman.get_grid_pos()], TILE_PLAYER)
+        return out
+
+
+ENVS = {
+    "snake": SnakeEnv,
+    "pacman": PacmanEnv,
+    "pacman2": Pacman2Env,
+}
+
+
+def make(name):
+    """Creates a single environment by name ("snake", "pacman" or "pacman2")."""
+    return ENVS[name]()
+
+
+# --- Vectorized stepping ---
+
+def _worker(conn, env_name, start, stop, num_envs, shm_names):
+    """Owns envs[start:stop] and writes their results straight into the shared buffers."""
+    env_cls = ENVS[env_name]
+    obs_shm, reward_shm, done_shm = (shared_memory.SharedMemory(name=n) for n in shm_names)
+    observations = np.ndarray((num_envs,) + env_cls.observation_shape, dtype=np.uint8, buffer=obs_shm.buf)
+    rewards = np.ndarray((num_envs,), dtype=np.float64, buffer=reward_shm.buf)
+    dones = np.ndarray((num_envs,), dtype=bool, buffer=done_shm.buf)
+    envs = [env_cls() for _ in range(start, stop)]
+
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == "reset":
+                for i, env in enumerate(envs, start):
+                    env.reset(seed=None if data is None else data + i) # One seed per env, whatever the worker count
+                    env.observation(out=observations[i])
+                conn.send(None)
+            elif command == "step":
+                infos = []
+                for i, env in enumerate(envs, start):
+                    reward, done, info = env.advance(int(data[i - start]))
+                    rewards[i] = reward
+                    dones[i] = done
+                    if done:
+                        env.reset() # Auto-reset; the returned observation is the new episode's first
+                    env.observation(out=observations[i])
+                    infos.append(info)
+                conn.send(infos)
+            elif command == "close":
+                break
+    finally:
+        del observations, rewards, dones
+        for shm in (obs_shm, reward_shm, done_shm):
+            shm.close()
+        conn.close()
+
+
+class VectorEnv:
+    """Steps `num_envs` copies of one environment across a pool of worker processes.
+
+    Each worker owns a contiguous slice of the envs. Observations, rewards and
+    dones are written by the workers into shared-memory NumPy buffers, so only
+    the actions and the small info dicts cross the process boundary. Envs that
+    finish are reset automatically. The arrays returned by reset() and step()
+    are views of the shared buffers and are overwritten by the next call.
+    """
+    def __init__(self, env_name, num_envs, num_workers=None, seed=None):
+        if num_envs < 1:
+            raise ValueError(f"VectorEnv needs at least one env, got num_envs={num_envs}")
+        env_cls = ENVS[env_name]
+        self.num_envs = num_envs
+        self.observation_shape = env_cls.observation_shape
+        self.seed = seed
+        num_workers = max(1, min(num_envs, num_workers or os.cpu_count() or 1)) # Never more workers than envs
+
+        obs_size = num_envs * int(np.prod(self.observation_shape))
+        self._shms = [
+            shared_memory.SharedMemory(create=True, size=max(1, obs_size)),
+            shared_memory.SharedMemory(create=True, size=num_envs * 8),
+            shared_memory.SharedMemory(create=True, size=num_envs),
+        ]
+        self.observations = np.ndarray((num_envs,) + self.observation_shape, dtype=np.uint8, buffer=self._shms[0].buf)
+        self.rewards = np.ndarray((num_envs,), dtype=np.float64, buffer=self._shms[1].buf)
+        self.dones = np.ndarray((num_envs,), dtype=bool, buffer=self._shms[2].buf)
+
+        # "spawn" gives every worker a fresh interpreter and its own SDL state
+        ctx = mp.get_context("spawn")
+        self._conns = []
+        self._processes = []
+        shm_names = [shm.name for shm in self._shms]
+        # (start, stop) of each worker's envs; none is empty since num_workers <= num_envs
+        self._slices = [(int(chunk[0]), int(chunk[-1]) + 1) for chunk in np.array_split(np.arange(num_envs), num_workers)]
+        for start, stop in self._slices:
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(target=_worker, args=(child_conn, env_name, start, stop, num_envs, shm_names),
+                                  daemon=True)
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+        self.closed = False
+
+    def reset(self):
+        for conn in self._conns:
+            conn.send(("reset", self.seed))
+        for conn in self._conns:
+            conn.recv()
+        return self.observations
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        for conn, (start, stop) in zip(self._conns, self._slices):
+            conn.send(("step", actions[start:stop]))
+        infos = []
+        for conn in self._conns:
+            infos.extend(conn.recv())
+        return self.observations, self.rewards, self.dones, infos
+
+    def close(self):
+        if self.closed:
+            return
+        for conn in self._conns:
+            conn.send(("close", None))
+        for process in self._processes:
+            process.join()
+        for conn in self._conns:
+            conn.close()
+        del self.observations, self.rewards, self.dones
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
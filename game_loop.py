@@ -0,0 +1,89 @@
+"""Fixed-timestep loop driver shared by the games.
+
+The simulation advances in fixed ticks of 1 / tick_rate seconds, independent
+of how often frames are drawn. Each frame the real time that passed is added
+to an accumulator and as many ticks are run as fit in it (at most
+MAX_TICKS_PER_FRAME, so a long stall is dropped instead of replayed all at
+once). The frame is then drawn with alpha = leftover time / tick length, the
+fraction of the way from the previous tick to the current one, which the
+games use to interpolate entity positions between those two ticks.
+
+Unthrottled mode is for headless runs: no clock at all, one tick per
+iteration, as fast as the CPU allows, and frames are only drawn if a draw
+callback is given (with alpha 1.0).
+
+In both modes input is handled before the ticks it affects, and a quit
+(running() turning False) takes effect right away, with no further ticks,
+so a recorded session and its replay run the same ticks.
+"""
+import time
+
+import pygame
+
+MAX_RENDER_FPS = 144 # Frame cap (0 = uncapped); frames beyond the display's refresh rate are never seen
+MAX_TICKS_PER_FRAME = 5
+
+
+class FixedTimestepLoop:
+    def __init__(self, tick_rate, max_fps=MAX_RENDER_FPS, unthrottled=False):
+        self.tick_rate = tick_rate # Ticks per second; may be changed between ticks (e.g. snake speed-ups)
+        self.max_fps = max_fps
+        self.unthrottled = unthrottled
+        self.ticks = 0 # Ticks run so far
+        self.frames = 0 # Frames drawn so far
+
+    def run(self, handle_input, update, draw=None, running=None, max_ticks=None):
+        """Runs the loop until running() returns False or max_ticks ticks have run.
+
+        handle_input() is called once per frame, update() once per tick and
+        draw(alpha) once per frame. In unthrottled mode input for tick max_ticks
+        is still handled before the loop stops.
+        """
+        if self.unthrottled:
+            self._run_unthrottled(handle_input, update, draw, running, max_ticks)
+            return
+
+        clock = pygame.time.Clock()
+        accumulator = 0.0
+        last_time = time.perf_counter()
+        while running is None or running():
+            now = time.perf_counter()
+            accumulator += now - last_time
+            last_time = now
+
+            handle_input()
+            if running is not None and not running():
+                return
+            ticks_this_frame = 0
+            while accumulator >= 1.0 / self.tick_rate:
+                accumulator -= 1.0 / self.tick_rate
+                update()
+                self.ticks += 1
+                ticks_this_frame += 1
+                if max_ticks is not None and self.ticks >= max_ticks:
+                    return
+                if ticks_this_frame >= MAX_TICKS_PER_FRAME:
+                    accumulator %= 1.0 / self.tick_rate # Too far behind: drop the missed ticks
+                    break
+
+            if draw is not None:
+                draw(min(accumulator * self.tick_rate, 1.0))
+                self.frames += 1
+            if self.max_fps:
+                clock.tick(self.max_fps)
+
+    def _run_unthrottled(self, handle_input, update, draw, running, max_ticks):
+        while running is None or running():
+            handle_input()
+            if (running is not None and not running()) or (max_ticks is not None and self.ticks >= max_ticks):
+                return
+            update()
+            self.ticks += 1
+            if draw is not None:
+                draw(1.0)
+                self.frames += 1
+
+
+def lerp(start, end, alpha):
+    """Linear interpolation between two numbers."""
+    return start + (end - start) * alpha
@@ -0,0 +1,169 @@
+"""Seeded, recordable input for the games, so any session can be replayed exactly.
+
+Every game draws its random numbers from its own seeded random.Random (and
+NumPy generators seeded from it) and reads key presses through an input
+source instead of pygame.event.get() directly:
+
+    LiveInput()            the keyboard, as before
+    LiveInput(log, path)   the keyboard, recording every key press the games
+                           react to into an InputLog saved to `path` on exit
+    ReplayInput(log)       the key presses of a recorded log, at the ticks
+                           they were made
+
+A key press is applied before the next tick runs, so it is logged with the
+number of ticks run so far. Given the same seed and the same key presses at
+the same ticks the games end in the same state, whatever the frame rate was.
+replay.py re-runs a log headless and compares the final state hashes.
+
+Log file layout (little-endian): a HEADER (magic, format version, game,
+flags, seed, tick count, final state hash, input count) followed by one
+INPUT record (tick, index into LOGGED_KEYS) per key press.
+"""
+import hashlib
+import random
+import struct
+
+import numpy as np
+import pygame
+
+MAGIC = b"GLOG"
+FORMAT_VERSION = 1
+GAMES = ("snake", "pacman", "pacman2")
+FLAG_MASS_GHOSTS = 1
+
+HEADER = struct.Struct("<4sBBBxQI32sI")
+INPUT = struct.Struct("<IB") # 5 bytes per key press
+
+# Every key any of the games reacts to; a logged input is an index into this table
+LOGGED_KEYS = (
+    pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT,
+    pygame.K_w, pygame.K_s, pygame.K_a, pygame.K_d,
+    pygame.K_r, pygame.K_q, pygame.K_SPACE, pygame.K_RETURN,
+)
+KEY_INDEX = {key: index for index, key in enumerate(LOGGED_KEYS)}
+
+
+def new_seed(seed=None):
+    """Returns `seed`, or a fresh random 64-bit seed if it is None."""
+    return seed if seed is not None else random.getrandbits(64)
+
+
+def state_hash(*parts):
+    """SHA-256 digest of a game's state, given as reprs of plain values and raw NumPy array bytes."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(f"{part.dtype}{part.shape}".encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b"\0")
+    return digest.digest()
+
+
+def cli_option(argv, name):
+    """Value following `name` in argv (e.g. "--record session.glog"), or None."""
+    if name in argv:
+        index = argv.index(name)
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return None
+
+
+def cli_session(argv, game, mass_ghosts=False):
+    """Reads the --seed N and --record PATH options of a game's command line.
+
+    Returns (seed, input source): the seed is random unless given, and the
+    input source records to PATH when --record is given (None otherwise).
+    """
+    seed = cli_option(argv, "--seed")
+    seed = new_seed(int(seed) if seed is not None else None)
+    path = cli_option(argv, "--record")
+    inputs = LiveInput(InputLog(game, seed, mass_ghosts), path) if path else None
+    return seed, inputs
+
+
+class InputLog:
+    def __init__(self, game, seed, mass_ghosts=False):
+        self.game = game # One of GAMES
+        self.seed = seed
+        self.mass_ghosts = mass_ghosts
+        self.inputs = [] # (tick, LOGGED_KEYS index) per key press, in order
+        self.ticks = 0 # Ticks the recorded session ran
+        self.state_hash = bytes(32) # state_hash() of the game when the session ended
+
+    def record(self, tick, key):
+        """Logs a key press made before tick `tick` runs; keys no game uses are skipped."""
+        index = KEY_INDEX.get(key)
+        if index is not None:
+            self.inputs.append((tick, index))
+
+    def save(self, path):
+        flags = FLAG_MASS_GHOSTS if self.mass_ghosts else 0
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, GAMES.index(self.game), flags, self.seed,
+                                self.ticks, self.state_hash, len(self.inputs)))
+            f.write(b"".join(INPUT.pack(tick, index) for tick, index in self.inputs))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path}: not an input log (too short)")
+        magic, version, game, flags, seed, ticks, final_hash, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION or game >= len(GAMES):
+            raise ValueError(f"{path}: not an input log, or written by an incompatible version")
+        if len(data) != HEADER.size + count * INPUT.size:
+            raise ValueError(f"{path}: truncated input log")
+        inputs = list(INPUT.iter_unpack(data[HEADER.size:]))
+        if any(index >= len(LOGGED_KEYS) or tick > ticks for tick, index in inputs):
+            raise ValueError(f"{path}: corrupt input log (unknown key or key press after the last tick)")
+        log = cls(GAMES[game], seed, mass_ghosts=bool(flags & FLAG_MASS_GHOSTS))
+        log.inputs = inputs
+        log.ticks = ticks
+        log.state_hash = final_hash
+        return log
+
+
+# --- Input sources ---
+
+class LiveInput:
+    """Keyboard input from pygame's event queue, optionally recorded into `log` and saved to `path`."""
+    def __init__(self, log=None, path=None):
+        self.log = log
+        self.path = path
+
+    def events(self, tick):
+        events = pygame.event.get()
+        if self.log is not None:
+            for event in events:
+                if event.type == pygame.KEYDOWN:
+                    self.log.record(tick, event.key)
+        return events
+
+    def finish(self, tick, final_hash):
+        """Called once when the game ends; saves the recording."""
+        if self.log is not None:
+            self.log.ticks = tick
+            self.log.state_hash = final_hash
+            self.log.save(self.path)
+
+
+class ReplayInput:
+    """Plays back the key presses of an InputLog as KEYDOWN events, each at its recorded tick."""
+    def __init__(self, log):
+        self.log = log
+        self.position = 0 # Next input to play
+        self.final_hash = None # state_hash() of the game when the replay ended
+
+    def events(self, tick):
+        events = []
+        inputs = self.log.inputs
+        while self.position < len(inputs) and inputs[self.position][0] <= tick:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=LOGGED_KEYS[inputs[self.position][1]]))
+            self.position += 1
+        return events
+
+    def finish(self, tick, final_hash):
+        self.final_hash = final_hash
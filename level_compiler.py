@@ -0,0 +1,207 @@
+"""Compiles pacman_game's text level maps into arrays, validates them and caches the result.
+
+A compiled level holds a uint8 tile grid (rows padded to the widest row with
+TILE_VOID), the Pacman and ghost start tiles, the food tiles and, per food
+tile, whether Pacman can reach it from its start (4-way flood fill over every
+open tile, i.e. neither wall nor void: the tiles Entity.can_move_in_direction
+lets him into).
+Dots that cannot be reached make a level impossible to finish, so they are
+reported by problems(), and warned about once whenever a map is compiled.
+Short rows are not a problem: their missing tiles are TILE_VOID, which blocks
+movement like a wall but is drawn as empty floor.
+
+Compiling walks every character, so results are saved under LEVEL_CACHE_DIR
+keyed by a hash of the map text: later runs load them with a single np.load,
+and later loads in the same process reuse the already loaded level.
+
+Run this module to validate every level in pacman_game.LEVEL_MAPS.
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import warnings
+import zipfile
+from collections import deque
+
+import numpy as np
+
+LEVEL_CACHE_DIR = ".level_cache"
+FORMAT_VERSION = 2 # Bump when the compiled layout changes, so stale cache files are ignored
+
+# Tile codes in the compiled grid
+TILE_EMPTY = 0
+TILE_WALL = 1
+TILE_FOOD = 2
+TILE_VOID = 3 # Past the end of a short row: not drawn as a wall, but blocked and not part of the navigation graph
+
+
+class CompiledLevel:
+    def __init__(self, tiles, row_lengths, pacman_start, ghost_starts, food, food_reachable):
+        self.tiles = tiles # (rows, width) uint8 tile codes
+        self.row_lengths = row_lengths # Length of each source row
+        self.pacman_start = pacman_start # (col, row), or None if the map has no 'P'
+        self.ghost_starts = ghost_starts # [(col, row)] in map order
+        self.food = food # (N, 2) array of (col, row) food tiles in map order
+        self.food_reachable = food_reachable # (N,) bool, True if Pacman can reach that dot
+
+    @classmethod
+    def compile(cls, rows):
+        """Parses one LEVEL_MAPS entry (a list of strings) and flood-fills it from the Pacman start."""
+        width = max((len(row) for row in rows), default=0)
+        tiles = np.full((len(rows), width), TILE_VOID, dtype=np.uint8)
+        pacman_start = None
+        ghost_starts = []
+        for y, row in enumerate(rows):
+            for x, char in enumerate(row):
+                if char == 'W':
+                    tiles[y, x] = TILE_WALL
+                elif char == 'F':
+                    tiles[y, x] = TILE_FOOD
+                else:
+                    tiles[y, x] = TILE_EMPTY
+                    if char == 'P':
+                        pacman_start = (x, y) # Last 'P' wins, as in the old parser
+                    elif char == 'G':
+                        ghost_starts.append((x, y))
+
+        food = np.argwhere(tiles == TILE_FOOD)[:, ::-1].astype(np.int32) # (row, col) -> (col, row)
+        reached = cls.flood_fill(tiles, pacman_start)
+        food_reachable = reached[food[:, 1], food[:, 0]] if len(food) else np.zeros(0, dtype=bool)
+        row_lengths = np.array([len(row) for row in rows], dtype=np.int32)
+        return cls(tiles, row_lengths, pacman_start, ghost_starts, food, food_reachable)
+
+    @staticmethod
+    def flood_fill(tiles, start):
+        """Bool grid of the open (neither wall nor void) tiles reachable from `start` with 4-way moves."""
+        rows, cols = tiles.shape
+        reached = np.zeros((rows, cols), dtype=bool)
+        if start is None:
+            return reached
+        open_rows = ((tiles != TILE_WALL) & (tiles != TILE_VOID)).tolist()
+        seen = [[False] * cols for _ in range(rows)]
+        seen[start[1]][start[0]] = True
+        queue = deque([start])
+        while queue:
+            x, y = queue.popleft()
+            for nx, ny in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)):
+                if 0 <= ny < rows and 0 <= nx < cols and open_rows[ny][nx] and not seen[ny][nx]:
+                    seen[ny][nx] = True
+                    queue.append((nx, ny))
+        reached[:] = seen
+        return reached
+
+    @property
+    def total_food(self):
+        return len(self.food)
+
+    @property
+    def reachable_food(self):
+        return int(self.food_reachable.sum())
+
+    def unreachable_food(self):
+        """(col, row) tiles of the dots Pacman can never eat."""
+        return [tuple(tile) for tile in self.food[~self.food_reachable].tolist()]
+
+    def wall_tiles(self):
+        """(col, row) of every wall tile in map order."""
+        return [tuple(tile) for tile in np.argwhere(self.tiles == TILE_WALL)[:, ::-1].tolist()]
+
+    def wall_rows(self):
+        """One bytearray per row, all of the level's width, 1 where the tile is blocked (a wall or void)."""
+        blocked = ((self.tiles == TILE_WALL) | (self.tiles == TILE_VOID)).astype(np.uint8)
+        return [bytearray(row.tobytes()) for row in blocked]
+
+    def problems(self):
+        """Human-readable list of what is wrong with the level (empty if nothing)."""
+        problems = []
+        if self.pacman_start is None:
+            problems.append("no Pacman start ('P')")
+        if not self.ghost_starts:
+            problems.append("no ghost start ('G')")
+        unreachable = self.unreachable_food()
+        if unreachable:
+            problems.append(f"{len(unreachable)} of {self.total_food} food dots are unreachable: {unreachable}")
+        return problems
+
+    def save(self, path):
+        """Writes a temp file next to `path` and renames it over `path`, so readers never see a partial file."""
+        ghost_starts = np.array(self.ghost_starts, dtype=np.int32).reshape(-1, 2)
+        pacman_start = np.array(self.pacman_start if self.pacman_start is not None else (-1, -1), dtype=np.int32)
+        temp_path = None
+        try:
+            # A file object stops np.savez from appending ".npz"
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or ".", suffix=".npz", delete=False) as f:
+                temp_path = f.name
+                np.savez(f, tiles=self.tiles, row_lengths=self.row_lengths, pacman_start=pacman_start,
+                         ghost_starts=ghost_starts, food=self.food, food_reachable=self.food_reachable)
+            os.replace(temp_path, path)
+        except OSError:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path) # Don't leave half-written temp files in the cache
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            pacman_start = tuple(data["pacman_start"].tolist())
+            return cls(data["tiles"], data["row_lengths"], None if pacman_start == (-1, -1) else pacman_start,
+                       [tuple(tile) for tile in data["ghost_starts"].tolist()], data["food"], data["food_reachable"])
+
+
+def level_key(rows):
+    """Content hash of a level map (plus the format version)."""
+    return hashlib.sha1(f"{FORMAT_VERSION}\n".encode() + "\n".join(rows).encode()).hexdigest()
+
+
+_loaded_levels = {} # level_key -> CompiledLevel already loaded by this process
+
+
+def load_level_map(rows, cache_dir=LEVEL_CACHE_DIR, name="Level map"):
+    """Returns the CompiledLevel for `rows`, from memory or the disk cache when it has been compiled before.
+
+    A freshly compiled level's problems() are reported once, as warnings starting with `name`.
+    The returned level is shared between callers and must not be modified.
+    """
+    key = level_key(rows)
+    level = _loaded_levels.get(key)
+    if level is not None:
+        return level
+    path = os.path.join(cache_dir, f"level_{key}.npz") if cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            level = CompiledLevel.load(path)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile): # Corrupted or truncated cache file, recompile it
+            level = None
+    if level is None:
+        level = CompiledLevel.compile(rows)
+        for problem in level.problems():
+            warnings.warn(f"{name}: {problem}", stacklevel=2)
+        if path:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                level.save(path)
+            except OSError:
+                pass # Read-only or full disk: keep the compiled level, just don't cache it
+    _loaded_levels[key] = level
+    return level
+
+
+def main():
+    """Validates every pacman_game level; exits with status 1 if any has problems."""
+    from pacman_game import LEVEL_MAPS
+
+    failed = False
+    for index, rows in enumerate(LEVEL_MAPS):
+        level = CompiledLevel.compile(rows)
+        problems = level.problems()
+        print(f"Level {index + 1}: {level.reachable_food}/{level.total_food} food reachable, "
+              f"{len(level.ghost_starts)} ghost starts")
+        for problem in problems:
+            print(f"  - {problem}")
+        failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
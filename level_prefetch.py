@@ -0,0 +1,56 @@
+"""Background preparation of the next level, shared by the pacman games.
+
+When a level is completed the game starts building the next level's data
+(parsed grid, food, navigation tables, pre-rendered background) on a worker
+thread while the level-complete screen is showing. When the player continues,
+take() hands over the finished result, so switching levels is just a swap.
+If no prefetch was started for that level, it failed, or the worker is still
+busy, the level is prepared synchronously. A busy worker is abandoned rather
+than joined: it shares the GIL with the main thread, so waiting for it takes
+about as long as preparing the level directly, and a worker stuck on a slow
+disk would otherwise stall the game with it.
+
+prepare callables run off the main thread, so they must only build new
+objects (plain data and off-screen Surfaces) and never touch the display or
+the game's current state.
+"""
+import threading
+
+
+class LevelPrefetcher:
+    def __init__(self):
+        self._key = None # Level the running or finished prefetch is for
+        self._thread = None
+        self._job = None # {"result": ...} filled in by the worker; a fresh dict per prefetch
+
+    def start(self, key, prepare):
+        """Runs prepare() on a worker thread for level `key`, unless that level is already being prefetched."""
+        if self._thread is not None and self._key == key:
+            return
+        self._key = key
+        self._job = job = {"result": None}
+        self._thread = threading.Thread(target=self._run, args=(job, prepare), daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _run(job, prepare):
+        try:
+            job["result"] = prepare()
+        except Exception: # Left as None: take() then prepares the level synchronously
+            pass
+
+    def ready(self, key):
+        """True if the prefetch for level `key` has finished."""
+        return self._thread is not None and self._key == key and not self._thread.is_alive()
+
+    def take(self, key, prepare):
+        """Returns the prepared data for level `key`, from the worker if it has finished prefetching that level."""
+        result = self._job["result"] if self.ready(key) else None
+        self.cancel() # A still running worker finishes in the background and its result is dropped
+        return result if result is not None else prepare()
+
+    def cancel(self):
+        """Forgets any prefetch (a running worker finishes in the background and its result is dropped)."""
+        self._key = None
+        self._thread = None
+        self._job = None
@@ -0,0 +1,102 @@
+"""Corridor/junction navigation graph for tile mazes, shared by the pacman games.
+
+Built once per level from a passability grid. Every open tile gets a 4-bit
+exit mask (bit k set if MOVES[k] leads to another open tile). Tiles with
+exactly two exits are corridor tiles: an entity that entered one has a single
+way forward, so ghosts only need their decision logic at the graph's nodes,
+i.e. junctions (3+ exits) and dead ends (1 exit). Edges are the corridors
+between nodes, with their length in tiles.
+"""
+
+# (dx, dy) moves, indexed by exit-mask bit
+MOVES = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+MOVE_INDEX = {move: k for k, move in enumerate(MOVES)}
+REVERSE = [1, 0, 3, 2] # Index of the opposite of each move
+
+
+def _corridor_table():
+    """CORRIDOR_NEXT[mask][k]: move index that continues a heading of MOVES[k] through a
+    tile with exit mask `mask`, or -1 if that tile is not a corridor for this heading."""
+    table = []
+    for mask in range(16):
+        row = []
+        for k in range(len(MOVES)):
+            back = 1 << REVERSE[k]
+            if bin(mask).count("1") == 2 and mask & back:
+                row.append((mask & ~back).bit_length() - 1)
+            else:
+                row.append(-1)
+        table.append(row)
+    return table
+
+CORRIDOR_NEXT = _corridor_table()
+
+
+class NavGraph:
+    def __init__(self, passable):
+        """passable: one sequence per maze row, truthy where the tile can be walked on.
+
+        Rows may differ in length; tiles outside a row count as blocked.
+        """
+        self.exit_masks = []
+        for y, row in enumerate(passable):
+            masks = bytearray(len(row))
+            for x, is_open in enumerate(row):
+                if not is_open:
+                    continue
+                mask = 0
+                for k, (dx, dy) in enumerate(MOVES):
+                    nx, ny = x + dx, y + dy
+                    if 0 <= ny < len(passable) and 0 <= nx < len(passable[ny]) and passable[ny][nx]:
+                        mask |= 1 << k
+                masks[x] = mask
+            self.exit_masks.append(masks)
+
+        # Nodes: open tiles that are not plain corridor tiles
+        self.nodes = []
+        for y, row in enumerate(passable):
+            for x, is_open in enumerate(row):
+                if is_open and bin(self.exit_masks[y][x]).count("1") != 2:
+                    self.nodes.append((x, y))
+
+        # Edges: node -> [(first move index, node reached, corridor length in tiles)]
+        self.edges = {node: self._walk_corridors(node) for node in self.nodes}
+
+    def _walk_corridors(self, node):
+        edges = []
+        max_length = sum(len(row) for row in self.exit_masks)
+        mask = self.exit_mask(*node)
+        for k, (dx, dy) in enumerate(MOVES):
+            if not mask & (1 << k):
+                continue
+            x, y = node[0] + dx, node[1] + dy
+            heading = k
+            length = 1
+            while length <= max_length:
+                next_heading = CORRIDOR_NEXT[self.exit_mask(x, y)][heading]
+                if next_heading < 0:
+                    break # Reached a junction or dead end
+                heading = next_heading
+                x += MOVES[heading][0]
+                y += MOVES[heading][1]
+                length += 1
+            edges.append((k, (x, y), length))
+        return edges
+
+    def exit_mask(self, x, y):
+        """4-bit exit mask of tile (x, y); 0 for walls and tiles outside the maze."""
+        if 0 <= y < len(self.exit_masks) and 0 <= x < len(self.exit_masks[y]):
+            return self.exit_masks[y][x]
+        return 0
+
+    def corridor_move(self, x, y, direction):
+        """The only way forward for an entity heading `direction` on corridor tile (x, y).
+
+        Returns None at junctions, dead ends, walls, or when `direction` is not a
+        move (e.g. stopped); the caller then runs its normal decision logic.
+        """
+        k = MOVE_INDEX.get(direction)
+        if k is None:
+            return None
+        next_k = CORRIDOR_NEXT[self.exit_mask(x, y)][k]
+        return MOVES[next_k] if next_k >= 0 else None
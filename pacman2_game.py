@@ -1,6 +1,20 @@
 import pygame
 import random
-import math
+import sys
+import os
+import hashlib
+import tempfile
+from collections import deque, OrderedDict
+
+import numpy as np
+
+from dirty_rects import DirtyRects
+from game_loop import FixedTimestepLoop, lerp
+from input_log import LiveInput, cli_option, cli_session, new_seed, state_hash
+from level_prefetch import LevelPrefetcher
+from nav_graph import NavGraph
+from profiler import PROFILER_KEY, FrameProfiler
+from text_cache import TextCache
 
 # --- Constants ---
 SCREEN_WIDTH = 800
@@ -56,6 +70,180 @@ MAZE_COLS = len(MAZE_GRID[0])
 PACMAN_START_GRID_POS = (1, 1)
 GHOST_START_GRID_POS = (MAZE_COLS // 2, MAZE_ROWS // 2)
 
+# Directory for cached maze distance tables (created on first use)
+DISTANCE_CACHE_DIR = ".maze_cache"
+UNREACHABLE = 0xFFFF # Distance stored for tile pairs with no path between them
+BLOCKED = UNREACHABLE + 1 # Flow field value for a move into a wall
+FLOW_FIELD_CACHE_SIZE = 16 # Max flow fields kept (scatter corners plus recent Pacman tiles)
+
+# Ghost moves, in the order used by the distance table's neighbor lists and flow fields
+GHOST_MOVES = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+# --- Maze Distance Table ---
+
+class DistanceTable:
+    """True shortest-path distances (in tiles) between every pair of walkable maze tiles.
+
+    Distances are stored as an N x N uint16 array over the N walkable tiles.
+    Computing them takes one BFS per tile, so the result is saved under
+    DISTANCE_CACHE_DIR keyed by a hash of the maze and loaded on later startups.
+    """
+    def __init__(self, maze, cache_dir=DISTANCE_CACHE_DIR):
+        grid = np.array(maze, dtype=np.uint8)
+        walkable = grid == 0
+        # (row, col) -> index into the table, -1 for walls
+        self.tile_index = np.full(grid.shape, -1, dtype=np.int32)
+        self.tile_index[walkable] = np.arange(int(walkable.sum()), dtype=np.int32)
+        self.tile_index_rows = self.tile_index.tolist() # Plain lists index faster per lookup
+
+        # Table index of the neighbor reached by each of GHOST_MOVES, -1 if it is a wall
+        coords = np.argwhere(walkable)
+        self.neighbors = np.full((len(coords), len(GHOST_MOVES)), -1, dtype=np.int32)
+        for k, (dx, dy) in enumerate(GHOST_MOVES):
+            nr = coords[:, 0] + dy
+            nc = coords[:, 1] + dx
+            inside = (nr >= 0) & (nr < grid.shape[0]) & (nc >= 0) & (nc < grid.shape[1])
+            self.neighbors[inside, k] = self.tile_index[nr[inside], nc[inside]]
+
+        self.key = hashlib.sha1(repr(grid.shape).encode() + grid.tobytes()).hexdigest()
+        path = os.path.join(cache_dir, f"distances_{self.key}.npy") if cache_dir else None
+        self.distances = None
+        if path and os.path.exists(path):
+            try:
+                self.distances = np.load(path)
+            except (OSError, ValueError, EOFError): # Corrupted or truncated cache file, recompute it
+                self.distances = None
+        if self.distances is None or self.distances.shape != (int(walkable.sum()),) * 2:
+            self.distances = self.compute(walkable, self.tile_index)
+            if path:
+                self.save(path)
+
+    def save(self, path):
+        """Caches the table at `path`; on a read-only or full disk the game carries on uncached."""
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write a temp file and rename it into place, so a killed process or another
+            # process building the same cache never leaves a partial file at `path`
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".npy", delete=False) as f:
+                temp_path = f.name
+                np.save(f, self.distances)
+            os.replace(temp_path, path)
+        except OSError:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def compute(walkable, tile_index):
+        """Runs a BFS from every walkable tile and returns the N x N distance array."""
+        rows, cols = walkable.shape
+        coords = np.argwhere(walkable).tolist() # [row, col] per tile index
+        index_rows = tile_index.tolist()
+        neighbors = []
+        for r, c in coords:
+            tile_neighbors = []
+            for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < rows and 0 <= nc < cols and index_rows[nr][nc] >= 0:
+                    tile_neighbors.append(index_rows[nr][nc])
+            neighbors.append(tile_neighbors)
+
+        n = len(coords)
+        distances = np.full((n, n), UNREACHABLE, dtype=np.uint16)
+        for source in range(n):
+            row = [UNREACHABLE] * n
+            row[source] = 0
+            queue = deque([source])
+            while queue:
+                tile = queue.popleft()
+                next_distance = row[tile] + 1
+                for neighbor in neighbors[tile]:
+                    if row[neighbor] == UNREACHABLE:
+                        row[neighbor] = next_distance
+                        queue.append(neighbor)
+            distances[source] = row
+        return distances
+
+    def index_of(self, x, y):
+        """Table index of grid tile (x, y), or -1 if it is a wall or off the maze."""
+        if 0 <= y < len(self.tile_index_rows) and 0 <= x < len(self.tile_index_rows[y]):
+            return self.tile_index_rows[y][x]
+        return -1
+
+    def distances_to(self, x, y):
+        """Row of distances from every walkable tile to (x, y), or None if (x, y) is not walkable."""
+        index = self.index_of(x, y)
+        return self.distances[index] if index >= 0 else None
+
+    def distance(self, a, b):
+        """Shortest-path distance between grid tiles a and b, UNREACHABLE if there is no path."""
+        ia = self.index_of(*a)
+        ib = self.index_of(*b)
+        if ia < 0 or ib < 0:
+            return UNREACHABLE
+        return int(self.distances[ia, ib])
+
+
+class FlowField:
+    """Next-step distances from every walkable tile towards one target tile.
+
+    step_distances[i][k] is the maze distance to the target after taking
+    GHOST_MOVES[k] from tile i (BLOCKED if that move hits a wall). It is built
+    from one row of the DistanceTable, so any number of ghosts heading for the
+    same target share a single field.
+    """
+    def __init__(self, distances, target):
+        self.distances = distances
+        self.target = target
+        self.row = row = distances.distances_to(*target)
+        neighbors = distances.neighbors
+        if row is None: # Target is a wall: every open move is equally (un)reachable
+            steps = np.where(neighbors >= 0, UNREACHABLE, BLOCKED)
+        else:
+            steps = np.where(neighbors >= 0, row[neighbors].astype(np.int32), BLOCKED)
+        self.step_distances = steps.tolist()
+
+    def moves_from(self, x, y):
+        """Distances after each of GHOST_MOVES from tile (x, y)."""
+        index = self.distances.index_of(x, y)
+        if index >= 0:
+            return self.step_distances[index]
+        # Off the walkable tiles (e.g. a ghost spawned inside a wall): look the neighbors up directly
+        moves = []
+        for dx, dy in GHOST_MOVES:
+            neighbor = self.distances.index_of(x + dx, y + dy)
+            if neighbor < 0:
+                moves.append(BLOCKED)
+            else:
+                moves.append(UNREACHABLE if self.row is None else int(self.row[neighbor]))
+        return moves
+
+
+class FlowFields:
+    """Per-target FlowField cache shared by all ghosts.
+
+    A field is only built the first time its target is asked for, so the chase
+    field is rebuilt once when Pacman enters a new tile (not once per ghost), and
+    scatter targets keep their own fields. The least recently used field is
+    dropped past `max_size`.
+    """
+    def __init__(self, distances, max_size=FLOW_FIELD_CACHE_SIZE):
+        self.distances = distances
+        self.max_size = max_size
+        self.fields = OrderedDict()
+
+    def get(self, target):
+        field = self.fields.get(target)
+        if field is not None:
+            self.fields.move_to_end(target)
+            return field
+        field = FlowField(self.distances, target)
+        self.fields[target] = field
+        if len(self.fields) > self.max_size:
+            self.fields.popitem(last=False)
+        return field
+
+
 # --- Classes ---
 
 class Entity(pygame.sprite.Sprite):
@@ -71,6 +259,7 @@ class Entity(pygame.sprite.Sprite):
         self.grid_y = y
         # Center the entity within its tile
         self.rect.topleft = (x * TILE_SIZE + (TILE_SIZE - size) // 2, y * TILE_SIZE + (TILE_SIZE - size) // 2)
+        self.prev_center = self.rect.center # Center at the previous tick, for interpolated drawing
 
         self.dx = 0 # current direction x
         self.dy = 0 # current direction y
@@ -94,6 +283,17 @@ class Entity(pygame.sprite.Sprite):
     def get_grid_pos(self):
         return self.grid_x, self.grid_y
 
+    def store_previous_position(self):
+        """Remembers the current position as the start of the next tick's interpolation."""
+        self.prev_center = self.rect.center
+
+    def draw_center(self, alpha):
+        """Pixel center to draw at, `alpha` of the way from the previous tick's position to the current one."""
+        if alpha >= 1.0:
+            return self.rect.center
+        return (int(lerp(self.prev_center[0], self.rect.centerx, alpha)),
+                int(lerp(self.prev_center[1], self.rect.centery, alpha)))
+
     def set_grid_pos(self, x, y):
         self.grid_x = x
         self.grid_y = y
@@ -171,8 +371,9 @@ class Pacman(Entity):
 
 
 class Ghost(Entity):
-    def __init__(self, x, y, speed_tiles_per_sec, color):
+    def __init__(self, x, y, speed_tiles_per_sec, color, rng=random):
         super().__init__(x, y, color, TILE_SIZE - 4, speed_tiles_per_sec)
+        self.rng = rng # Source of the ghost's random choices (the game's seeded random.Random)
         self.scatter_target = (1, 1) # A fixed corner for scatter mode (grid coords)
         self.state = "scatter" # "scatter", "chase"
         self.state_timer = 0
@@ -190,7 +391,7 @@ class Ghost(Entity):
     def reset_direction(self):
         # Pick a random initial direction
         possible_directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        self.dx, self.dy = random.choice(possible_directions)
+        self.dx, self.dy = self.rng.choice(possible_directions)
 
     def update_state(self):
         self.state_timer += 1
@@ -201,88 +402,304 @@ class Ghost(Entity):
             self.state = "scatter"
             self.state_timer = 0
 
-    def calculate_next_move(self, maze, pacman_pos):
+    def calculate_next_move(self, maze, pacman_pos, flow_fields, nav_graph):
         self.update_state()
 
-        target_x, target_y = self.scatter_target
+        # Inside a corridor the only non-reversing move is the way forward: no decision needed
+        corridor_move = nav_graph.corridor_move(self.grid_x, self.grid_y, (self.dx, self.dy))
+        if corridor_move is not None:
+            self.dx, self.dy = corridor_move
+            return
+
+        target = self.scatter_target
         if self.state == "chase":
-            target_x, target_y = pacman_pos
+            target = pacman_pos
 
-        current_x, current_y = self.grid_x, self.grid_y
-        best_direction = (self.dx, self.dy) # Default to current direction if no better option
-        min_distance = float('inf')
+        # Maze distance to the target after each possible move, read from the shared field
+        move_distances = flow_fields.get(target).moves_from(self.grid_x, self.grid_y)
 
-        possible_moves = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        best_moves = [] # Non-reversing moves with the shortest path to the target
+        min_distance = BLOCKED
+        valid_moves = [] # Every move that does not hit a wall, including reversing
         opposite_direction = (-self.dx, -self.dy)
 
-        # Shuffle to add some randomness when multiple paths are equally good
-        random.shuffle(possible_moves)
-
         # Prioritize moves that reduce distance to target and are not immediately reversing
-        for move_dx, move_dy in possible_moves:
-            if (move_dx, move_dy) == opposite_direction:
+        for move, distance in zip(GHOST_MOVES, move_distances):
+            if distance == BLOCKED:
+                continue # Wall
+            valid_moves.append(move)
+            if move == opposite_direction:
                 continue # Ghosts generally avoid reversing unless necessary
-
-            next_x, next_y = current_x + move_dx, current_y + move_dy
-
-            if self.can_move_to(next_x, next_y, maze):
-                distance = math.hypot(next_x - target_x, next_y - target_y)
-                if distance < min_distance:
-                    min_distance = distance
-                    best_direction = (move_dx, move_dy)
-
-        # If no non-reversing valid moves were found (e.g., at a dead end or junction where only reverse is valid)
-        if min_distance == float('inf'):
-            valid_moves = []
-            for move_dx, move_dy in possible_moves: # Re-check all moves including reverse
-                 next_x, next_y = current_x + move_dx, current_y + move_dy
-                 if self.can_move_to(next_x, next_y, maze):
-                     valid_moves.append((move_dx, move_dy))
-            if valid_moves:
-                best_direction = random.choice(valid_moves) # Pick any valid move if stuck
-            else:
-                best_direction = (0,0) # Completely stuck, stop moving
+            if distance < min_distance:
+                min_distance = distance
+                best_moves = [move]
+            elif distance == min_distance:
+                best_moves.append(move)
+
+        if best_moves:
+            # Add some randomness when multiple paths are equally good
+            best_direction = best_moves[0] if len(best_moves) == 1 else self.rng.choice(best_moves)
+        elif valid_moves:
+            # Only reversing is possible (dead end): pick any valid move
+            best_direction = self.rng.choice(valid_moves)
+        else:
+            best_direction = (0,0) # Completely stuck, stop moving
 
         self.dx, self.dy = best_direction
 
-    def update(self, maze, pacman_pos):
+    def update(self, maze, pacman_pos, flow_fields, nav_graph):
         # Calculate next move based on AI only when it's time for the ghost to move
         if self.move_tick_counter == 0:
-            self.calculate_next_move(maze, pacman_pos)
+            self.calculate_next_move(maze, pacman_pos, flow_fields, nav_graph)
 
         self.update_position(maze) # This handles the actual grid movement based on speed
 
 
-class FoodDot:
-    def __init__(self, x, y):
-        self.grid_x = x
-        self.grid_y = y
-        # Rect for drawing, actual collision is grid-based
-        self.rect = pygame.Rect(x * TILE_SIZE + TILE_SIZE // 2 - 2,
-                                y * TILE_SIZE + TILE_SIZE // 2 - 2,
-                                4, 4)
+# --- Mass-Ghost Engine ---
+
+MASS_GHOST_COUNT = 2000 # Ghosts each level starts with in mass-ghost mode (all on GHOST_START_GRID_POS)
+MASS_GHOST_LIMIT = 10000 # max_active_ghosts in mass-ghost mode: caps the start count and later dynamic spawns
+GHOST_SCATTER = 0
+GHOST_CHASE = 1
+GHOST_STOPPED = len(GHOST_MOVES) # Direction index for (0, 0)
+
+
+class GhostSwarm:
+    """Struct-of-arrays ghost engine for stress tests with thousands of ghosts.
+
+    Holds the same per-ghost state as Ghost (grid position, direction, move tick
+    counter and interval, scatter/chase state and timer) in NumPy arrays and
+    runs each part of Ghost.update as one array operation for all ghosts per
+    tick: scatter/chase switching, choosing moves from the DistanceTable (no
+    reversing, random pick among ties) and moving. An occupancy grid of ghost
+    counts per tile is kept up to date for spawn clearance checks.
+    """
+    def __init__(self, maze, distances, capacity=64, seed=None):
+        self.maze = np.array(maze, dtype=np.uint8)
+        self.rows, self.cols = self.maze.shape
+        self.walkable = self.maze == 0
+        self.distances = distances
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+
+        # Walkable-table index of each grid tile's neighbors, per GHOST_MOVES (-1 = wall),
+        # for every tile (ghosts can start on a wall tile, like GHOST_START_GRID_POS)
+        index = np.pad(distances.tile_index, 1, constant_values=-1)
+        self.grid_neighbors = np.stack([
+            index[1 + dy:1 + dy + self.rows, 1 + dx:1 + dx + self.cols].ravel()
+            for dx, dy in GHOST_MOVES], axis=1)
+        self.move_dx = np.array([dx for dx, _ in GHOST_MOVES] + [0], dtype=np.int32)
+        self.move_dy = np.array([dy for _, dy in GHOST_MOVES] + [0], dtype=np.int32)
+        self.reverse = np.array([1, 0, 3, 2, GHOST_STOPPED], dtype=np.int32)
+
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.prev_x = np.zeros(capacity, dtype=np.int32) # Tiles at the previous tick, for interpolated drawing
+        self.prev_y = np.zeros(capacity, dtype=np.int32)
+        self.direction = np.zeros(capacity, dtype=np.int32)
+        self.move_interval = np.zeros(capacity, dtype=np.int32)
+        self.move_counter = np.zeros(capacity, dtype=np.int32)
+        self.state = np.zeros(capacity, dtype=np.int8)
+        self.state_timer = np.zeros(capacity, dtype=np.int32)
+        self.color_index = np.zeros(capacity, dtype=np.int32)
+        self.scatter_x, self.scatter_y = 1, 1 # Same corner as Ghost.scatter_target
+        self.scatter_time = 7 * GAME_FPS
+        self.chase_time = 20 * GAME_FPS
+        self.occupancy = np.zeros(self.rows * self.cols, dtype=np.int32)
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, needed):
+        capacity = len(self.x)
+        while capacity < needed:
+            capacity *= 2
+        for name in ("x", "y", "prev_x", "prev_y", "direction", "move_interval", "move_counter", "state", "state_timer", "color_index"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, x, y, speed_tiles_per_sec, color_index, count=1):
+        """Adds `count` ghosts at tile (x, y), each with a random initial direction."""
+        if self.count + count > len(self.x):
+            self._grow(self.count + count)
+        new = slice(self.count, self.count + count)
+        self.x[new] = x
+        self.y[new] = y
+        self.prev_x[new] = x
+        self.prev_y[new] = y
+        self.direction[new] = self.rng.integers(0, len(GHOST_MOVES), count)
+        # Same movement timing as Entity (speed is always positive for ghosts)
+        self.move_interval[new] = max(1, round(GAME_FPS / speed_tiles_per_sec))
+        self.move_counter[new] = 0
+        self.state[new] = GHOST_SCATTER
+        self.state_timer[new] = 0
+        self.color_index[new] = color_index
+        self.count += count
+        self.occupancy[y * self.cols + x] += count
+
+    def reset_positions(self, x, y):
+        """Same as Ghost.reset_position for every ghost."""
+        n = self.count
+        self.x[:n] = x
+        self.y[:n] = y
+        self.direction[:n] = self.rng.integers(0, len(GHOST_MOVES), n)
+        self.state[:n] = GHOST_SCATTER
+        self.state_timer[:n] = 0
+        self.move_counter[:n] = 0
+        self._update_occupancy()
+
+    def store_previous_positions(self):
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def _update_occupancy(self):
+        n = self.count
+        self.occupancy = np.bincount(self.y[:n] * self.cols + self.x[:n], minlength=self.rows * self.cols)
+
+    def is_tile_free(self, x, y):
+        return self.occupancy[y * self.cols + x] == 0
+
+    def collides_with(self, x, y):
+        """True if any ghost is on tile (x, y)."""
+        return self.occupancy[y * self.cols + x] > 0
+
+    def update(self, pacman_pos):
+        """One game tick for every ghost (the batched equivalent of Ghost.update)."""
+        n = self.count
+        if n == 0:
+            return
 
-    def draw(self, screen):
-        pygame.draw.circle(screen, WHITE, self.rect.center, 2)
+        # Ghosts whose move counter is at 0 choose a direction this tick
+        deciding = np.flatnonzero(self.move_counter[:n] == 0)
+        if deciding.size:
+            self._update_states(deciding)
+            self._choose_directions(deciding, pacman_pos)
+
+        # Entity.update_position: count ticks, move one tile when the interval is reached
+        self.move_counter[:n] += 1
+        moving = np.flatnonzero(self.move_counter[:n] >= self.move_interval[:n])
+        self.move_counter[moving] = 0
+        moving = moving[self.direction[moving] != GHOST_STOPPED]
+        next_x = self.x[moving] + self.move_dx[self.direction[moving]]
+        next_y = self.y[moving] + self.move_dy[self.direction[moving]]
+        inside = (next_x >= 0) & (next_x < self.cols) & (next_y >= 0) & (next_y < self.rows)
+        can_move = inside & self.walkable[np.clip(next_y, 0, self.rows - 1), np.clip(next_x, 0, self.cols - 1)]
+        self.x[moving[can_move]] = next_x[can_move]
+        self.y[moving[can_move]] = next_y[can_move]
+        self._update_occupancy()
+
+    def _update_states(self, idx):
+        """Ghost.update_state for the given ghosts."""
+        self.state_timer[idx] += 1
+        state = self.state[idx]
+        timer = self.state_timer[idx]
+        to_chase = idx[(state == GHOST_SCATTER) & (timer >= self.scatter_time)]
+        to_scatter = idx[(state == GHOST_CHASE) & (timer >= self.chase_time)]
+        self.state[to_chase] = GHOST_CHASE
+        self.state[to_scatter] = GHOST_SCATTER
+        self.state_timer[to_chase] = 0
+        self.state_timer[to_scatter] = 0
+
+    def _choose_directions(self, idx, pacman_pos):
+        """Ghost.calculate_next_move's direction choice for the given ghosts."""
+        chasing = self.state[idx] == GHOST_CHASE
+        target_x = np.where(chasing, pacman_pos[0], self.scatter_x)
+        target_y = np.where(chasing, pacman_pos[1], self.scatter_y)
+        target = self.distances.tile_index[target_y, target_x]
+
+        # Maze distance to the target after each move (BLOCKED for walls)
+        neighbors = self.grid_neighbors[self.y[idx] * self.cols + self.x[idx]]
+        table = self.distances.distances[np.maximum(target, 0)[:, None], np.maximum(neighbors, 0)].astype(np.int32)
+        table[target < 0] = UNREACHABLE
+        move_distances = np.where(neighbors >= 0, table, BLOCKED)
+
+        # Best non-reversing moves, with a random pick among ties
+        rows = np.arange(idx.size)
+        reverse = self.reverse[self.direction[idx]]
+        forward = move_distances.copy()
+        has_reverse = reverse != GHOST_STOPPED
+        forward[rows[has_reverse], reverse[has_reverse]] = BLOCKED
+        best = forward.min(axis=1)
+        keys = self.rng.random(forward.shape)
+        keys[forward != best[:, None]] = -1.0
+        choice = keys.argmax(axis=1)
+
+        # Dead end: any valid move (only the reverse is left); no valid move: stop
+        valid = move_distances != BLOCKED
+        fallback_keys = self.rng.random(forward.shape)
+        fallback_keys[~valid] = -1.0
+        fallback = fallback_keys.argmax(axis=1)
+
+        self.direction[idx] = np.where(best != BLOCKED, choice,
+                                       np.where(valid.any(axis=1), fallback, GHOST_STOPPED))
+
+    def positions(self):
+        """(x, y) arrays of the active ghosts' tiles."""
+        return self.x[:self.count], self.y[:self.count]
+
+    def draw(self, screen, colors, size, alpha=1.0):
+        """Draws one circle per occupied tile (the last ghost on it wins). Returns the drawn rects.
+
+        With alpha < 1 ghosts are drawn between their previous and current tiles,
+        one circle per distinct (previous tile, current tile) move.
+        """
+        n = self.count
+        flat = (self.y[:n] * self.cols + self.x[:n]).astype(np.int64)
+        if alpha < 1.0:
+            flat += (self.prev_y[:n] * self.cols + self.prev_x[:n]).astype(np.int64) * (self.rows * self.cols)
+        # Last ghost per tile (or move), in tile order
+        _, last_from_end = np.unique(flat[::-1], return_index=True)
+        offset = (TILE_SIZE - size) // 2 + size // 2
+        rects = []
+        for i in (n - 1 - last_from_end).tolist():
+            center = (int(lerp(int(self.prev_x[i]), int(self.x[i]), alpha) * TILE_SIZE) + offset,
+                      int(lerp(int(self.prev_y[i]), int(self.y[i]), alpha) * TILE_SIZE) + offset)
+            rects.append(pygame.draw.circle(screen, colors[self.color_index[i] % len(colors)], center, size // 2))
+        return rects
 
 
 # --- Game Class ---
 class Game:
-    def __init__(self):
+    def __init__(self, dirty_rects=False, mass_ghosts=False, seed=None, inputs=None, profiler=None):
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # Opt-in dirty-rect mode: only repaint and push the screen areas that changed
+        self.dirty_rects = DirtyRects(self.screen) if dirty_rects else None
         pygame.display.set_caption("Pacman")
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
+        self.text_cache = TextCache() # Reuses HUD text surfaces until their text changes
 
         self.game_state = GAME_STATE_MENU
         self.running = True
+        self.ticks = 0 # Ticks run so far; key presses are logged against it
+
+        # The game's own random stream (mass-ghost swarms are seeded from it), so a seeded game can be replayed
+        self.seed = new_seed(seed)
+        self.rng = random.Random(self.seed)
+        self.inputs = inputs or LiveInput() # Keyboard, recording or replay (see input_log)
+        self.profiler = profiler or FrameProfiler("pacman2") # Per-phase frame timings, off until PROFILER_KEY
         self.maze = MAZE_GRID
+        self.distances = DistanceTable(self.maze) # All-pairs maze distances for ghost targeting
+        self.flow_fields = FlowFields(self.distances) # Shared per-target ghost steering
+        # Junction/corridor graph: ghosts only run their decision logic at junctions and dead ends
+        self.nav_graph = NavGraph([[tile == 0 for tile in row] for row in self.maze])
 
         self.pacman = None
         self.ghosts = []
-        self.food_dots = []
+        # Mass-ghost mode keeps all ghost state in a GhostSwarm instead of Ghost objects
+        self.mass_ghosts = mass_ghosts
+        self.ghost_swarm = None
+        # Food is a bitmap shaped like the maze (True = dot present) plus a count of dots left
+        self.food_grid = np.zeros((MAZE_ROWS, MAZE_COLS), dtype=bool)
+        self.food_remaining = 0
+        self.wall_layer = None # Pre-rendered maze walls
+        self.maze_layer = None # wall_layer plus the remaining food dots
+        self.prefetcher = LevelPrefetcher() # Builds the next level while the level-complete screen shows
         self.score = 0
         self.lives = 3
         self.level = 1
@@ -292,7 +709,7 @@ class Game:
         self.ghost_base_speed = 4 # tiles per second
 
         # --- New Ghost Spawning Configuration Parameters (in game ticks) ---
-        self.max_active_ghosts = 4 # Maximum number of ghosts allowed on screen at once
+        self.max_active_ghosts = MASS_GHOST_LIMIT if mass_ghosts else 4 # Maximum number of ghosts allowed on screen at once
         self.ghost_spawn_interval_min = 5 * GAME_FPS # Minimum time (ticks) between dynamic ghost spawns (5 seconds)
         self.ghost_spawn_interval_max = 15 * GAME_FPS # Maximum time (ticks) between dynamic ghost spawns (15 seconds)
         self.time_to_next_ghost_spawn = 0 # Timer for the next dynamic ghost spawn (in ticks)
@@ -317,75 +734,134 @@ class Game:
         self.pacman.score = self.score # Carry over score from previous level
 
         self.ghosts = []
-        # Number of ghosts increases by 1 per level, up to self.max_active_ghosts
-        num_initial_ghosts = min(self.level + 1, self.max_active_ghosts)
-        # Ghost speed also increases slightly per level
+        # Ghost speed increases slightly per level
         ghost_current_speed = self.ghost_base_speed + (self.level - 1) * 0.5
+        if self.mass_ghosts:
+            # Mass-ghost mode: every level starts with MASS_GHOST_COUNT ghosts (in one add per color)
+            self.ghost_swarm = GhostSwarm(self.maze, self.distances, seed=self.rng.getrandbits(64))
+            count = min(MASS_GHOST_COUNT, self.max_active_ghosts)
+            for color_index in range(len(self.ghost_colors)):
+                per_color = count // len(self.ghost_colors) + (color_index < count % len(self.ghost_colors))
+                self.ghost_swarm.add(GHOST_START_GRID_POS[0], GHOST_START_GRID_POS[1], ghost_current_speed,
+                                     color_index, per_color)
+        # Otherwise the number of ghosts increases by 1 per level, up to self.max_active_ghosts
+        num_initial_ghosts = 0 if self.mass_ghosts else min(self.level + 1, self.max_active_ghosts)
         for i in range(num_initial_ghosts):
-            color = self.ghost_colors[i % len(self.ghost_colors)]
             # Spawn initial ghosts at GHOST_START_GRID_POS
-            ghost = Ghost(GHOST_START_GRID_POS[0], GHOST_START_GRID_POS[1], ghost_current_speed, color)
+            color = self.ghost_colors[i % len(self.ghost_colors)]
+            ghost = Ghost(GHOST_START_GRID_POS[0], GHOST_START_GRID_POS[1], ghost_current_speed, color, self.rng)
             self.ghosts.append(ghost)
 
         # Initialize the timer for the *first* dynamic ghost spawn in this level
-        self.time_to_next_ghost_spawn = random.uniform(
+        self.time_to_next_ghost_spawn = self.rng.uniform(
             self.ghost_spawn_interval_min,
             self.ghost_spawn_interval_max
         )
 
-        self.generate_food()
+        # Swap in the level's food and background, prefetched during the level-complete screen when possible
+        self.food_grid, self.wall_layer, self.maze_layer = self.prefetcher.take(self.level, self.prepare_level)
+        self.food_remaining = int(self.food_grid.sum())
+        if self.dirty_rects:
+            self.dirty_rects.invalidate() # The whole background changed
         self.game_state = GAME_STATE_PLAYING
 
+    def prepare_level(self):
+        """Builds a level's food grid and background layers without touching the current level.
+
+        Every level uses the same maze, so nothing here depends on the level number (the
+        prefetcher is still keyed by self.level). Safe to run on a worker thread.
+        Returns (food_grid, wall_layer, maze_layer).
+        """
+        food_grid = self.generate_food()
+        return (food_grid,) + self.build_maze_layers(food_grid)
+
+    def ghost_count(self):
+        return len(self.ghost_swarm) if self.ghost_swarm is not None else len(self.ghosts)
+
     def _spawn_ghost(self):
         """
         Attempts to spawn a new ghost if the maximum active ghost limit hasn't been reached.
         Chooses a random spawn point and resets the spawn timer.
         """
-        if len(self.ghosts) < self.max_active_ghosts:
+        if self.ghost_count() < self.max_active_ghosts:
             if not self.ghost_spawn_points:
                 # Fallback if no specific spawn points are defined
                 spawn_x, spawn_y = GHOST_START_GRID_POS
             else:
                 # Choose a random spawn point from the list of available points
-                spawn_x, spawn_y = random.choice(self.ghost_spawn_points)
+                spawn_x, spawn_y = self.rng.choice(self.ghost_spawn_points)
 
             # Check if the chosen spawn point is currently free from other ghosts
             # This prevents multiple ghosts from spawning on the exact same tile.
-            is_spawn_point_clear = True
-            for ghost in self.ghosts:
-                if (ghost.grid_x, ghost.grid_y) == (spawn_x, spawn_y):
-                    is_spawn_point_clear = False
-                    break
+            if self.ghost_swarm is not None:
+                # Mass-ghost mode: one lookup in the swarm's occupancy grid
+                is_spawn_point_clear = self.ghost_swarm.is_tile_free(spawn_x, spawn_y)
+            else:
+                is_spawn_point_clear = True
+                for ghost in self.ghosts:
+                    if (ghost.grid_x, ghost.grid_y) == (spawn_x, spawn_y):
+                        is_spawn_point_clear = False
+                        break
 
             if is_spawn_point_clear:
                 # Ghost speed increases slightly per level
                 ghost_current_speed = self.ghost_base_speed + (self.level - 1) * 0.5
-                color = self.ghost_colors[len(self.ghosts) % len(self.ghost_colors)] # Cycle colors for new ghosts
-                new_ghost = Ghost(spawn_x, spawn_y, ghost_current_speed, color)
-                self.ghosts.append(new_ghost)
+                if self.ghost_swarm is not None:
+                    self.ghost_swarm.add(spawn_x, spawn_y, ghost_current_speed, self.ghost_count())
+                else:
+                    color = self.ghost_colors[len(self.ghosts) % len(self.ghost_colors)] # Cycle colors for new ghosts
+                    new_ghost = Ghost(spawn_x, spawn_y, ghost_current_speed, color, self.rng)
+                    self.ghosts.append(new_ghost)
 
         # Reset the timer for the *next* dynamic ghost spawn, regardless if one was spawned
-        self.time_to_next_ghost_spawn = random.uniform(
+        self.time_to_next_ghost_spawn = self.rng.uniform(
             self.ghost_spawn_interval_min,
             self.ghost_spawn_interval_max
         )
 
 
     def generate_food(self):
-        self.food_dots = []
+        """Returns a new food bitmap for the maze."""
+        # Food on every path tile (0 means path, 1 means wall)
+        food_grid = np.array(self.maze, dtype=np.uint8) == 0
+        # Don't place food at Pacman's start position or any ghost spawn points
+        food_grid[PACMAN_START_GRID_POS[1], PACMAN_START_GRID_POS[0]] = False
+        for c, r in self.ghost_spawn_points:
+            food_grid[r, c] = False
+        return food_grid
+
+    def build_maze_layers(self, food_grid):
+        """Pre-renders the maze walls and food so draw() can blit them in one call.
+
+        Returns (wall_layer, maze_layer), created in the screen's pixel format.
+        """
+        wall_layer = pygame.Surface(self.screen.get_size(), 0, self.screen)
+        wall_layer.fill(BLACK)
         for r in range(MAZE_ROWS):
             for c in range(MAZE_COLS):
-                if self.maze[r][c] == 0: # If it's a path
-                    # Don't place food at Pacman's start position or any ghost spawn points
-                    if (c, r) != PACMAN_START_GRID_POS and (c, r) not in self.ghost_spawn_points:
-                        self.food_dots.append(FoodDot(c, r))
+                if self.maze[r][c] == 1: # Wall
+                    pygame.draw.rect(wall_layer, BLUE, (c * TILE_SIZE, r * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+
+        maze_layer = wall_layer.copy()
+        for r, c in np.argwhere(food_grid).tolist():
+            pygame.draw.circle(maze_layer, WHITE, (c * TILE_SIZE + TILE_SIZE // 2, r * TILE_SIZE + TILE_SIZE // 2), 2)
+        return wall_layer, maze_layer
+
+    def erase_food(self, col, row):
+        """Removes one eaten dot from the maze layer by restoring its tile from the wall layer."""
+        tile_rect = pygame.Rect(col * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+        self.maze_layer.blit(self.wall_layer, tile_rect, tile_rect)
+        if self.dirty_rects:
+            self.dirty_rects.background_changed(tile_rect)
 
     def handle_input(self):
-        for event in pygame.event.get():
+        for event in self.inputs.events(self.ticks):
             if event.type == pygame.QUIT:
                 self.running = False
             if event.type == pygame.KEYDOWN:
-                if self.game_state == GAME_STATE_MENU:
+                if event.key == PROFILER_KEY: # Show/hide the frame profiler overlay
+                    self.profiler.toggle_overlay()
+                elif self.game_state == GAME_STATE_MENU:
                     if event.key == pygame.K_RETURN:
                         self.game_state = GAME_STATE_PLAYING
                 elif self.game_state == GAME_STATE_GAME_OVER or self.game_state == GAME_STATE_LEVEL_COMPLETE:
@@ -407,7 +883,17 @@ class Game:
                     elif event.key == pygame.K_DOWN:
                         self.pacman.set_direction(0, 1)
 
+    def store_previous_positions(self):
+        """Start of a tick (or a jump): entities are drawn interpolated from where they are now."""
+        self.pacman.store_previous_position()
+        for ghost in self.ghosts:
+            ghost.store_previous_position()
+        if self.ghost_swarm is not None:
+            self.ghost_swarm.store_previous_positions()
+
     def update(self):
+        self.ticks += 1
+        self.store_previous_positions()
         if self.game_state != GAME_STATE_PLAYING:
             return
 
@@ -416,104 +902,153 @@ class Game:
 
         # Update Ghosts
         pacman_grid_pos = self.pacman.get_grid_pos()
+        if self.ghost_swarm is not None:
+            self.ghost_swarm.update(pacman_grid_pos)
         for ghost in self.ghosts:
-            ghost.update(self.maze, pacman_grid_pos)
+            ghost.update(self.maze, pacman_grid_pos, self.flow_fields, self.nav_graph)
 
         # --- Dynamic Ghost Spawning Logic ---
         self.time_to_next_ghost_spawn -= 1 # Decrement by 1 game tick
         if self.time_to_next_ghost_spawn <= 0:
             self._spawn_ghost()
 
-        # Check Pacman-Food collision (grid-based)
-        food_eaten = []
-        for food in self.food_dots:
-            if self.pacman.get_grid_pos() == (food.grid_x, food.grid_y):
-                food_eaten.append(food)
-                self.score += 10 # Each food dot gives 10 points
-                self.pacman.score = self.score # Update pacman's internal score too
-
-        for food in food_eaten:
-            self.food_dots.remove(food)
+        # Check Pacman-Food collision (grid-based, one bitmap lookup)
+        pacman_x, pacman_y = self.pacman.get_grid_pos()
+        if self.food_grid[pacman_y, pacman_x]:
+            self.food_grid[pacman_y, pacman_x] = False
+            self.food_remaining -= 1
+            self.score += 10 # Each food dot gives 10 points
+            self.pacman.score = self.score # Update pacman's internal score too
+            self.erase_food(pacman_x, pacman_y)
 
         # Check Pacman-Ghost collision (grid-based)
+        pacman_hit = False
+        if self.ghost_swarm is not None:
+            pacman_hit = self.ghost_swarm.collides_with(pacman_x, pacman_y)
         for ghost in self.ghosts:
             if self.pacman.get_grid_pos() == ghost.get_grid_pos():
-                self.pacman.lives -= 1
-                self.lives = self.pacman.lives # Update game's lives
-                if self.pacman.lives <= 0:
-                    self.game_state = GAME_STATE_GAME_OVER
-                else:
-                    # Reset Pacman and Ghosts to start positions after losing a life
-                    self.pacman.reset_position(PACMAN_START_GRID_POS[0], PACMAN_START_GRID_POS[1])
-                    for g in self.ghosts:
-                        g.reset_position(GHOST_START_GRID_POS[0], GHOST_START_GRID_POS[1])
+                pacman_hit = True
                 break # Only lose one life per collision event
 
+        if pacman_hit:
+            self.pacman.lives -= 1
+            self.lives = self.pacman.lives # Update game's lives
+            if self.pacman.lives <= 0:
+                self.game_state = GAME_STATE_GAME_OVER
+            else:
+                # Reset Pacman and Ghosts to start positions after losing a life
+                self.pacman.reset_position(PACMAN_START_GRID_POS[0], PACMAN_START_GRID_POS[1])
+                for g in self.ghosts:
+                    g.reset_position(GHOST_START_GRID_POS[0], GHOST_START_GRID_POS[1])
+                if self.ghost_swarm is not None:
+                    self.ghost_swarm.reset_positions(GHOST_START_GRID_POS[0], GHOST_START_GRID_POS[1])
+                self.store_previous_positions() # Jump to the start positions instead of sliding there
+
         # Check for level complete
-        if not self.food_dots:
+        if self.food_remaining == 0:
             self.level += 1
             self.game_state = GAME_STATE_LEVEL_COMPLETE
+            self.prefetcher.start(self.level, self.prepare_level)
             # The actual setup for the next level will happen when 'R' is pressed from GAME_STATE_LEVEL_COMPLETE
 
-    def draw(self):
-        self.screen.fill(BLACK)
-
-        # Draw Maze walls
-        for r in range(MAZE_ROWS):
-            for c in range(MAZE_COLS):
-                if self.maze[r][c] == 1: # Wall
-                    pygame.draw.rect(self.screen, BLUE, (c * TILE_SIZE, r * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+    def draw(self, alpha=1.0):
+        # alpha: how far (0 to 1) the frame is from the previous tick to the current one;
+        # Pacman and the ghosts are drawn interpolated between their positions at those ticks
+        start = self.profiler.start()
 
-        # Draw Food dots
-        for food in self.food_dots:
-            food.draw(self.screen)
+        # Draw Maze walls and remaining food dots (cached layer, also clears the previous frame)
+        if self.dirty_rects:
+            self.dirty_rects.restore(self.maze_layer) # Only where the last frame drew
+        else:
+            self.screen.blit(self.maze_layer, (0, 0))
+        drawn = [] # Areas drawn over the maze layer this frame
+        start = self.profiler.lap("draw.maze", start)
 
         # Draw Pacman
         if self.pacman:
-            pygame.draw.circle(self.screen, self.pacman.color, self.pacman.rect.center, self.pacman.size // 2)
+            drawn.append(pygame.draw.circle(self.screen, self.pacman.color, self.pacman.draw_center(alpha), self.pacman.size // 2))
 
         # Draw Ghosts
         for ghost in self.ghosts:
-            pygame.draw.circle(self.screen, ghost.color, ghost.rect.center, ghost.size // 2)
+            drawn.append(pygame.draw.circle(self.screen, ghost.color, ghost.draw_center(alpha), ghost.size // 2))
+        if self.ghost_swarm is not None:
+            drawn.extend(self.ghost_swarm.draw(self.screen, self.ghost_colors, TILE_SIZE - 4, alpha))
+        start = self.profiler.lap("draw.entities", start)
 
         # Draw Score, Lives, Level HUD
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-        lives_text = self.font.render(f"Lives: {self.lives}", True, WHITE)
-        level_text = self.font.render(f"Level: {self.level}", True, WHITE)
-        self.screen.blit(score_text, (5, SCREEN_HEIGHT - 40))
-        self.screen.blit(lives_text, (SCREEN_WIDTH - lives_text.get_width() - 5, SCREEN_HEIGHT - 40))
-        self.screen.blit(level_text, (SCREEN_WIDTH // 2 - level_text.get_width() // 2, SCREEN_HEIGHT - 40))
+        score_text = self.text_cache.render(self.font, f"Score: {self.score}", True, WHITE)
+        lives_text = self.text_cache.render(self.font, f"Lives: {self.lives}", True, WHITE)
+        level_text = self.text_cache.render(self.font, f"Level: {self.level}", True, WHITE)
+        drawn.append(self.screen.blit(score_text, (5, SCREEN_HEIGHT - 40)))
+        drawn.append(self.screen.blit(lives_text, (SCREEN_WIDTH - lives_text.get_width() - 5, SCREEN_HEIGHT - 40)))
+        drawn.append(self.screen.blit(level_text, (SCREEN_WIDTH // 2 - level_text.get_width() // 2, SCREEN_HEIGHT - 40)))
 
 
         # Draw Game State Overlays (Menu, Game Over, Level Complete)
         if self.game_state == GAME_STATE_MENU:
-            title_text = self.font.render("Pacman", True, YELLOW)
-            start_text = self.small_font.render("Press ENTER to Start", True, WHITE)
-            self.screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
-            self.screen.blit(start_text, (SCREEN_WIDTH // 2 - start_text.get_width() // 2, SCREEN_HEIGHT // 2 + 10))
+            title_text = self.text_cache.render(self.font, "Pacman", True, YELLOW)
+            start_text = self.text_cache.render(self.small_font, "Press ENTER to Start", True, WHITE)
+            drawn.append(self.screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50)))
+            drawn.append(self.screen.blit(start_text, (SCREEN_WIDTH // 2 - start_text.get_width() // 2, SCREEN_HEIGHT // 2 + 10)))
         elif self.game_state == GAME_STATE_GAME_OVER:
-            game_over_text = self.font.render("GAME OVER", True, RED)
-            restart_text = self.small_font.render("Press 'R' to Restart or 'Q' to Quit", True, WHITE)
-            self.screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
-            self.screen.blit(restart_text, (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, SCREEN_HEIGHT // 2 + 10))
+            game_over_text = self.text_cache.render(self.font, "GAME OVER", True, RED)
+            restart_text = self.text_cache.render(self.small_font, "Press 'R' to Restart or 'Q' to Quit", True, WHITE)
+            drawn.append(self.screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50)))
+            drawn.append(self.screen.blit(restart_text, (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, SCREEN_HEIGHT // 2 + 10)))
         elif self.game_state == GAME_STATE_LEVEL_COMPLETE:
             # Display current level as completed (which is self.level - 1, as self.level was already incremented)
-            level_complete_text = self.font.render(f"LEVEL {self.level - 1} COMPLETE!", True, YELLOW)
-            next_level_text = self.small_font.render("Press 'R' for Next Level or 'Q' to Quit", True, WHITE)
-            self.screen.blit(level_complete_text, (SCREEN_WIDTH // 2 - level_complete_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
-            self.screen.blit(next_level_text, (SCREEN_WIDTH // 2 - next_level_text.get_width() // 2, SCREEN_HEIGHT // 2 + 10))
-
-        pygame.display.flip() # Update the full display Surface to the screen
-
-    def run(self):
-        while self.running:
-            self.handle_input()
-            self.update()
-            self.draw()
-            self.clock.tick(GAME_FPS) # Control game speed (frames per second)
-
+            level_complete_text = self.text_cache.render(self.font, f"LEVEL {self.level - 1} COMPLETE!", True, YELLOW)
+            next_level_text = self.text_cache.render(self.small_font, "Press 'R' for Next Level or 'Q' to Quit", True, WHITE)
+            drawn.append(self.screen.blit(level_complete_text, (SCREEN_WIDTH // 2 - level_complete_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50)))
+            drawn.append(self.screen.blit(next_level_text, (SCREEN_WIDTH // 2 - next_level_text.get_width() // 2, SCREEN_HEIGHT // 2 + 10)))
+
+        overlay_rect = self.profiler.draw_overlay(self.screen, (5, MAZE_ROWS * TILE_SIZE + 5)) # Below the maze
+        if overlay_rect is not None:
+            drawn.append(overlay_rect)
+        start = self.profiler.lap("draw.hud", start)
+
+        if self.dirty_rects:
+            self.dirty_rects.present(drawn) # Update only the changed areas of the display
+        else:
+            pygame.display.flip() # Update the full display Surface to the screen
+        self.profiler.lap("draw.present", start)
+
+    def state_hash(self):
+        """Hash of everything that decides how the game continues (see input_log.state_hash)."""
+        pacman = self.pacman
+        parts = [self.ticks, self.game_state, self.level, self.score, self.lives, self.time_to_next_ghost_spawn,
+                 self.food_grid, pacman.grid_x, pacman.grid_y, pacman.dx, pacman.dy, pacman.current_direction,
+                 pacman.next_direction, pacman.move_tick_counter,
+                 [(g.grid_x, g.grid_y, g.dx, g.dy, g.state, g.state_timer, g.move_tick_counter) for g in self.ghosts],
+                 self.rng.getstate()]
+        if self.ghost_swarm is not None:
+            swarm, n = self.ghost_swarm, len(self.ghost_swarm)
+            parts += [swarm.x[:n], swarm.y[:n], swarm.direction[:n], swarm.move_counter[:n], swarm.state[:n],
+                      swarm.state_timer[:n], swarm.rng.bit_generator.state]
+        return state_hash(*parts)
+
+    def run(self, unthrottled=False, max_ticks=None, headless=None):
+        # The game ticks at GAME_FPS while frames are drawn (interpolated) up to game_loop.MAX_RENDER_FPS;
+        # unthrottled: ticks run back to back, one frame per tick
+        # max_ticks: stop after this many ticks (replays)
+        # headless: draw nothing (defaults to unthrottled; soak tests draw every unthrottled frame)
+        headless = unthrottled if headless is None else headless
+        loop = FixedTimestepLoop(GAME_FPS, unthrottled=unthrottled)
+        profiler = self.profiler
+        loop.run(profiler.wrap("input", self.handle_input), profiler.wrap("update", self.update),
+                 None if headless else profiler.wrap("draw", self.draw),
+                 running=lambda: self.running, max_ticks=max_ticks)
+
+        self.inputs.finish(self.ticks, self.state_hash()) # Saves the recording, if any
+        profiler.export() # Writes the --profile trace, if any
         pygame.quit()
 
 if __name__ == "__main__":
-    game = Game()
+    mass_ghosts = "--mass-ghosts" in sys.argv
+    # --seed N fixes the random stream, --record PATH saves the session for replay.py
+    seed, inputs = cli_session(sys.argv, "pacman2", mass_ghosts)
+    # --profile PATH records frame timings from the start and saves them as a Chrome trace
+    profiler = FrameProfiler("pacman2", trace_path=cli_option(sys.argv, "--profile"))
+    game = Game(dirty_rects="--dirty-rects" in sys.argv, mass_ghosts=mass_ghosts, seed=seed, inputs=inputs,
+                profiler=profiler)
     game.run()
@@ -2,6 +2,23 @@ import pygame
 import random
 import sys
 import math
+import logging
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from dirty_rects import DirtyRects
+from game_loop import FixedTimestepLoop, lerp
+from input_log import LiveInput, cli_option, cli_session, new_seed, state_hash
+from level_compiler import load_level_map
+from level_prefetch import LevelPrefetcher
+from nav_graph import NavGraph, CORRIDOR_NEXT, MOVE_INDEX, MOVES
+from profiler import PROFILER_KEY, FrameProfiler
+from text_cache import TextCache
+
+# Level and life messages go to this logger at INFO level: shown when the game is run
+# directly, silent when it is imported (soak runs and tests) unless logging is configured
+log = logging.getLogger("pacman_game")
 
 # --- Constants ---
 # Initial screen dimensions (will be adjusted based on maze)
@@ -19,6 +36,7 @@ ORANGE = (255, 165, 0)
 PINK = (255, 192, 203)
 CYAN = (0, 255, 255)
 GREEN = (0, 255, 0) # For additional ghost color if needed
+GHOST_COLORS = [RED, ORANGE, PINK, CYAN, GREEN] # Ghosts cycle through these
 
 # Game Parameters
 PACMAN_INITIAL_SPEED = 3
@@ -26,7 +44,13 @@ GHOST_INITIAL_SPEED = 2
 FOOD_SCORE = 10
 INITIAL_LIVES = 3
 GHOST_CHANGE_DIR_PROB = 0.02 # Probability for ghost to change direction each frame (per update)
+GHOST_CHASE_PROB = 0.75 # Probability for ghost to head for Pacman at a junction instead of turning randomly
+FPS = 60 # Game ticks per second
 DEATH_PAUSE_MS = 1000 # Milliseconds to pause after Pacman loses a life
+DEATH_PAUSE_TICKS = DEATH_PAUSE_MS * FPS // 1000 # The same pause counted in game ticks
+SPRITE_CACHE_SIZE = 64 # Max pre-rendered entity sprites kept (colors x directions x mouth states)
+PATH_CACHE_SIZE = 512 # Max ghost-to-Pacman tile paths kept
+MASS_GHOST_COUNT = 1000 # Ghosts per level in mass-ghost mode (spread over the level's ghost start tiles)
 
 # Maze Layouts for different levels
 # W: Wall, F: Food, P: Pacman Start, G: Ghost Start, S: Empty Space
@@ -93,6 +117,183 @@ LEFT = (-1, 0)
 RIGHT = (1, 0)
 STOP = (0, 0)
 
+# Ghost direction indices used by GhostBatch (same order as Ghost.random_direction tries them)
+GHOST_DIRECTIONS = [UP, DOWN, LEFT, RIGHT, STOP]
+DIR_STOP = 4
+GHOST_DX = np.array([d[0] for d in GHOST_DIRECTIONS], dtype=np.float64)
+GHOST_DY = np.array([d[1] for d in GHOST_DIRECTIONS], dtype=np.float64)
+GHOST_REVERSE = np.array([1, 0, 3, 2, DIR_STOP], dtype=np.int64)
+NAV_MOVE_OF = np.array([MOVE_INDEX[d] for d in GHOST_DIRECTIONS[:4]], dtype=np.int64) # -> nav_graph.MOVES index
+DIRECTION_OF_NAV_MOVE = np.array([GHOST_DIRECTIONS.index(m) for m in MOVES], dtype=np.int64)
+
+# --- Sprite Rendering ---
+
+def draw_pacman_shape(screen, color, center, size, direction, open_mouth):
+    """Draws Pacman centered at `center`, with the mouth cut out facing `direction` if open."""
+    radius = size // 2
+    center_x, center_y = center
+
+    if open_mouth:
+        # Draw the full circle body
+        pygame.draw.circle(screen, color, (center_x, center_y), radius)
+
+        # Define the mouth opening using angles (in radians)
+        # These angles define the 'cut-out' part of the mouth.
+        mouth_angle_start_rad = 0
+        mouth_angle_end_rad = 0
+
+        if direction == RIGHT:
+            mouth_angle_start_rad = math.radians(315) # -45 degrees
+            mouth_angle_end_rad = math.radians(45)
+        elif direction == LEFT:
+            mouth_angle_start_rad = math.radians(135)
+            mouth_angle_end_rad = math.radians(225)
+        elif direction == UP:
+            mouth_angle_start_rad = math.radians(225)
+            mouth_angle_end_rad = math.radians(315)
+        elif direction == DOWN:
+            mouth_angle_start_rad = math.radians(45)
+            mouth_angle_end_rad = math.radians(135)
+
+        # Points for the mouth triangle (drawn in background color to "cut out" the mouth)
+        p_center = (center_x, center_y)
+        p_mouth_edge1 = (center_x + radius * math.cos(mouth_angle_start_rad),
+                         center_y + radius * math.sin(mouth_angle_start_rad))
+        p_mouth_edge2 = (center_x + radius * math.cos(mouth_angle_end_rad),
+                         center_y + radius * math.sin(mouth_angle_end_rad))
+        pygame.draw.polygon(screen, BLACK, [p_center, p_mouth_edge1, p_mouth_edge2])
+    else:
+        pygame.draw.circle(screen, color, (center_x, center_y), radius)
+
+
+def draw_ghost_shape(screen, color, center, size, direction):
+    """Draws a ghost centered at `center`, with custom shape and eyes looking towards `direction`."""
+    radius = size // 2
+    center_x, center_y = center
+
+    # Body (circle on top, rectangle below)
+    # The circle's center is adjusted to sit on top of the rectangle
+    circle_center_for_ghost = (center_x, center_y - radius // 2)
+    pygame.draw.circle(screen, color, circle_center_for_ghost, radius)
+    pygame.draw.rect(screen, color, (center_x - radius, center_y - radius // 2, size, radius + radius // 2))
+
+    # Skirt (scalloped bottom)
+    num_scallops = 3
+    scallop_width = size / num_scallops
+    scallop_radius = scallop_width / 2
+    for i in range(num_scallops):
+        x_pos = center_x - radius + (i * scallop_width) + scallop_radius
+        pygame.draw.circle(screen, color, (int(x_pos), center_y + radius // 2), int(scallop_radius))
+
+    # Eyes (white circles with black pupils)
+    eye_radius = radius // 4
+    pupil_radius = radius // 8
+
+    # Determine pupil offset based on ghost's current direction
+    pupil_offset_x = direction[0] * pupil_radius
+    pupil_offset_y = direction[1] * pupil_radius
+
+    # Left Eye
+    pygame.draw.circle(screen, WHITE, (center_x - radius // 2, center_y - radius // 2), eye_radius)
+    pygame.draw.circle(screen, BLACK, (center_x - radius // 2 + pupil_offset_x,
+                                      center_y - radius // 2 + pupil_offset_y), pupil_radius)
+    # Right Eye
+    pygame.draw.circle(screen, WHITE, (center_x + radius // 2, center_y - radius // 2), eye_radius)
+    pygame.draw.circle(screen, BLACK, (center_x + radius // 2 + pupil_offset_x,
+                                      center_y + radius // 2 + pupil_offset_y), pupil_radius)
+
+
+class SpriteAtlas:
+    """Pre-rendered Pacman and ghost sprites, created on first use.
+
+    Each sprite is a transparent (2 * size) x (2 * size) surface with the shape drawn
+    centered in it by the draw_*_shape functions above, so blitting it at
+    (center - size) reproduces the direct drawing pixel for pixel. At most
+    `max_size` sprites are kept; the least recently used one is dropped first.
+    """
+    def __init__(self, max_size=SPRITE_CACHE_SIZE):
+        self.max_size = max_size
+        self.sprites = OrderedDict()
+
+    def _get(self, key, draw_shape, *args):
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+        size = key[2]
+        sprite = pygame.Surface((2 * size, 2 * size), pygame.SRCALPHA).convert_alpha()
+        draw_shape(sprite, key[1], (size, size), size, *args)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_size:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def pacman(self, color, size, direction, open_mouth):
+        return self._get(("pacman", color, size, direction, open_mouth), draw_pacman_shape, direction, open_mouth)
+
+    def ghost(self, color, size, direction):
+        return self._get(("ghost", color, size, direction), draw_ghost_shape, direction)
+
+
+class PathCache:
+    """Shortest tile paths for chasing ghosts, memoized in an LRU.
+
+    Paths are found by BFS over the level's NavGraph (the open tiles inside each
+    map row) and keyed by (start tile, goal tile, level index), so every ghost
+    deciding on the same tile while Pacman stays on his tile shares one search.
+    At most `max_size` paths are kept; the least recently used one is dropped
+    first. Game.load_level clears the cache.
+    """
+    def __init__(self, max_size=PATH_CACHE_SIZE):
+        self.max_size = max_size
+        self.paths = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.paths.clear()
+
+    def get(self, nav_graph, start, goal, level_index):
+        """Tiles from start to goal (both included), or None if goal can't be reached from start."""
+        key = (start, goal, level_index)
+        if key in self.paths:
+            self.paths.move_to_end(key)
+            self.hits += 1
+            return self.paths[key]
+        self.misses += 1
+        path = self.find_path(nav_graph, start, goal)
+        self.paths[key] = path
+        if len(self.paths) > self.max_size:
+            self.paths.popitem(last=False)
+        return path
+
+    @staticmethod
+    def find_path(nav_graph, start, goal):
+        if start == goal:
+            return (start,)
+        if not nav_graph.exit_mask(*start) or not nav_graph.exit_mask(*goal):
+            return None # Wall or off the maze
+        came_from = {start: None}
+        queue = deque([start])
+        while queue:
+            tile = queue.popleft()
+            mask = nav_graph.exit_mask(*tile)
+            for k, (dx, dy) in enumerate(MOVES):
+                if not mask & (1 << k):
+                    continue
+                neighbor = (tile[0] + dx, tile[1] + dy)
+                if neighbor in came_from:
+                    continue
+                came_from[neighbor] = tile
+                if neighbor == goal:
+                    path = [goal]
+                    while came_from[path[-1]] is not None:
+                        path.append(came_from[path[-1]])
+                    return tuple(reversed(path))
+                queue.append(neighbor)
+        return None
+
+
 # --- Game Classes ---
 
 class Entity(pygame.sprite.Sprite):
@@ -109,6 +310,8 @@ class Entity(pygame.sprite.Sprite):
         # Pixel position (center of the entity)
         self.x = self.grid_x * TILE_SIZE + TILE_SIZE // 2
         self.y = self.grid_y * TILE_SIZE + TILE_SIZE // 2
+        self.prev_x = self.x # Position at the previous tick, for interpolated drawing
+        self.prev_y = self.y
 
         self.size = int(TILE_SIZE * size_factor)
         # Create a transparent surface for drawing, allows custom shapes
@@ -128,24 +331,30 @@ class Entity(pygame.sprite.Sprite):
         predicted_x = self.x + direction[0] * self.speed
         predicted_y = self.y + direction[1] * self.speed
 
-        # Create a temporary rectangle for the predicted position
-        # This is more robust than just checking the center point
-        temp_rect = pygame.Rect(0, 0, self.size, self.size)
-        temp_rect.center = (int(predicted_x), int(predicted_y))
+        # Check the full predicted rectangle (same placement as Rect.center would give),
+        # which is more robust than just checking the center point
+        left = int(predicted_x) - self.size // 2
+        top = int(predicted_y) - self.size // 2
+        return not self.game.area_has_wall(left, top, self.size, self.size)
+
+    def store_previous_position(self):
+        """Remembers the current position as the start of the next tick's interpolation."""
+        self.prev_x = self.x
+        self.prev_y = self.y
 
-        # Check if any corner of the predicted rectangle would collide with a wall
-        for wall_rect in self.game.walls:
-            if temp_rect.colliderect(wall_rect):
-                return False
-        return True
+    def draw_center(self, alpha):
+        """Pixel center to draw at, `alpha` of the way from the previous tick's position to the current one."""
+        if alpha >= 1.0:
+            return self.rect.center
+        return (int(lerp(self.prev_x, self.x, alpha)), int(lerp(self.prev_y, self.y, alpha)))
 
     def update(self):
         """Placeholder for update logic, to be overridden by subclasses."""
         pass
 
     def draw(self, screen):
-        """Placeholder for draw logic, to be overridden by subclasses."""
-        screen.blit(self.image, self.rect)
+        """Placeholder for draw logic, to be overridden by subclasses. Returns the area drawn."""
+        return screen.blit(self.image, self.rect)
 
 
 class Pacman(Entity):
@@ -206,43 +415,12 @@ class Pacman(Entity):
             self.open_mouth = not self.open_mouth
             self.mouth_timer = 0
 
-    def draw(self, screen):
-        """Draws Pacman on the screen, including mouth animation."""
-        radius = self.size // 2
-        center_x, center_y = self.rect.center
-
-        if self.open_mouth and self.direction != STOP:
-            # Draw the full circle body
-            pygame.draw.circle(screen, self.color, (center_x, center_y), radius)
-
-            # Define the mouth opening using angles (in radians)
-            # These angles define the 'cut-out' part of the mouth.
-            mouth_angle_start_rad = 0
-            mouth_angle_end_rad = 0
-
-            if self.direction == RIGHT:
-                mouth_angle_start_rad = math.radians(315) # -45 degrees
-                mouth_angle_end_rad = math.radians(45)
-            elif self.direction == LEFT:
-                mouth_angle_start_rad = math.radians(135)
-                mouth_angle_end_rad = math.radians(225)
-            elif self.direction == UP:
-                mouth_angle_start_rad = math.radians(225)
-                mouth_angle_end_rad = math.radians(315)
-            elif self.direction == DOWN:
-                mouth_angle_start_rad = math.radians(45)
-                mouth_angle_end_rad = math.radians(135)
-
-            # Points for the mouth triangle (drawn in background color to "cut out" the mouth)
-            p_center = (center_x, center_y)
-            p_mouth_edge1 = (center_x + radius * math.cos(mouth_angle_start_rad),
-                             center_y + radius * math.sin(mouth_angle_start_rad))
-            p_mouth_edge2 = (center_x + radius * math.cos(mouth_angle_end_rad),
-                             center_y + radius * math.sin(mouth_angle_end_rad))
-
-            pygame.draw.polygon(screen, BLACK, [p_center, p_mouth_edge1, p_mouth_edge2])
-        else:
-            pygame.draw.circle(screen, self.color, (center_x, center_y), radius)
+    def draw(self, screen, alpha=1.0):
+        """Draws Pacman on the screen, including mouth animation (one pre-rendered sprite blit)."""
+        open_mouth = self.open_mouth and self.direction != STOP
+        sprite = self.game.sprites.pacman(self.color, self.size, self.direction, open_mouth)
+        center_x, center_y = self.draw_center(alpha)
+        return screen.blit(sprite, (center_x - self.size, center_y - self.size))
 
 
 class Ghost(Entity):
@@ -280,12 +458,20 @@ class Ghost(Entity):
                 valid_directions.append(d)
 
         if valid_directions:
-            self.direction = random.choice(valid_directions)
+            self.direction = self.game.rng.choice(valid_directions)
         elif self.can_move_in_direction((-self.direction[0], -self.direction[1])): # If no other choice, reverse
             self.direction = (-self.direction[0], -self.direction[1])
         else: # Stuck
             self.direction = STOP
 
+    def chase_pacman(self, grid_x, grid_y):
+        """Takes the first step of the shortest path to Pacman's tile (a random turn if there is none)."""
+        direction = self.game.chase_direction(grid_x, grid_y)
+        if direction is not None and self.can_move_in_direction(direction):
+            self.direction = direction
+        else:
+            self.random_direction()
+
     def update(self):
         """Updates the ghost's position and AI."""
         current_speed = self.speed * self.ghost_speed_multiplier
@@ -300,7 +486,16 @@ class Ghost(Entity):
         is_aligned_y = abs(self.y - target_center_y) < current_speed + 1
 
         # If at an intersection or random chance, change direction
-        if (is_aligned_x and is_aligned_y) or random.random() < GHOST_CHANGE_DIR_PROB:
+        if is_aligned_x and is_aligned_y:
+            # Between junctions there is only one way forward, so no decision is needed
+            corridor_move = self.game.nav_graph.corridor_move(current_grid_x, current_grid_y, self.direction)
+            if corridor_move is not None:
+                self.direction = corridor_move
+            elif self.game.rng.random() < GHOST_CHASE_PROB:
+                self.chase_pacman(current_grid_x, current_grid_y)
+            else:
+                self.random_direction()
+        elif self.game.rng.random() < GHOST_CHANGE_DIR_PROB:
             self.random_direction()
 
         # If current direction leads to a wall, find a new one
@@ -312,62 +507,260 @@ class Ghost(Entity):
         self.y += self.direction[1] * current_speed
         self.rect.center = (int(self.x), int(self.y))
 
-    def draw(self, screen):
-        """Draws the ghost on the screen with custom shape and eyes."""
-        radius = self.size // 2
-        center_x, center_y = self.rect.center
-
-        # Body (circle on top, rectangle below)
-        # The circle's center is adjusted to sit on top of the rectangle
-        circle_center_for_ghost = (center_x, center_y - radius // 2)
-        pygame.draw.circle(screen, self.color, circle_center_for_ghost, radius)
-        pygame.draw.rect(screen, self.color, (center_x - radius, center_y - radius // 2, self.size, radius + radius // 2))
-
-        # Skirt (scalloped bottom)
-        num_scallops = 3
-        scallop_width = self.size / num_scallops
-        scallop_radius = scallop_width / 2
-        for i in range(num_scallops):
-            x_pos = center_x - radius + (i * scallop_width) + scallop_radius
-            pygame.draw.circle(screen, self.color, (int(x_pos), center_y + radius // 2), int(scallop_radius))
-
-        # Eyes (white circles with black pupils)
-        eye_radius = radius // 4
-        pupil_radius = radius // 8
-
-        # Determine pupil offset based on ghost's current direction
-        pupil_offset_x = self.direction[0] * pupil_radius
-        pupil_offset_y = self.direction[1] * pupil_radius
-
-        # Left Eye
-        pygame.draw.circle(screen, WHITE, (center_x - radius // 2, center_y - radius // 2), eye_radius)
-        pygame.draw.circle(screen, BLACK, (center_x - radius // 2 + pupil_offset_x,
-                                          center_y - radius // 2 + pupil_offset_y), pupil_radius)
-        # Right Eye
-        pygame.draw.circle(screen, WHITE, (center_x + radius // 2, center_y - radius // 2), eye_radius)
-        pygame.draw.circle(screen, BLACK, (center_x + radius // 2 + pupil_offset_x,
-                                          center_y + radius // 2 + pupil_offset_y), pupil_radius)
+    def draw(self, screen, alpha=1.0):
+        """Draws the ghost on the screen with custom shape and eyes (one pre-rendered sprite blit)."""
+        sprite = self.game.sprites.ghost(self.color, self.size, self.direction)
+        center_x, center_y = self.draw_center(alpha)
+        return screen.blit(sprite, (center_x - self.size, center_y - self.size))
+
+
+class GhostBatch:
+    """Array-based ghost engine for pacman_game's mass-ghost mode.
+
+    Stores every ghost's pixel position, direction and speed in NumPy arrays and
+    runs Ghost.update for all of them at once: tile-center alignment, the
+    corridor fast path, chasing Pacman (one cached path per distinct tile, not
+    per ghost), GHOST_CHANGE_DIR_PROB random turns, valid-exit lookup
+    (the same rect-vs-wall-tiles probe as can_move_in_direction, for all four
+    directions per ghost) and random_direction's choice. Random draws come from
+    a seeded NumPy generator instead of the random module.
+    """
+    def __init__(self, game, colors, seed=None):
+        self.game = game
+        self.colors = colors
+        self.rng = np.random.default_rng(seed)
+        self.size = int(TILE_SIZE * 0.7) # Same as Ghost; less than a tile, so a rect spans at most 2x2 tiles
+
+        # Wall and exit-mask grids (every wall_grid row is the level's full width, void included);
+        # off the map is blocked, as in area_has_wall and NavGraph.exit_mask
+        rows = len(game.wall_grid)
+        self.walls = np.frombuffer(b"".join(game.wall_grid), dtype=np.uint8).reshape(rows, -1) > 0
+        self.exit_masks = np.frombuffer(b"".join(game.nav_graph.exit_masks), dtype=np.uint8).reshape(rows, -1).astype(np.int64)
+        self.corridor_next = np.array(CORRIDOR_NEXT, dtype=np.int64)
+
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.prev_x = np.zeros(0) # Positions at the previous tick, for interpolated drawing
+        self.prev_y = np.zeros(0)
+        self.start_x = np.zeros(0)
+        self.start_y = np.zeros(0)
+        self.direction = np.zeros(0, dtype=np.int64) # Index into GHOST_DIRECTIONS
+        self.speed = np.zeros(0)
+        self.speed_multiplier = np.zeros(0)
+        self.color_index = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.x)
+
+    def add(self, grid_positions, color_indices, speed_multiplier):
+        """Adds one ghost per (col, row) start tile, then picks their first directions like Ghost.__init__."""
+        positions = np.asarray(grid_positions, dtype=np.float64).reshape(-1, 2)
+        count = len(positions)
+        centers = positions * TILE_SIZE + TILE_SIZE // 2
+        self.x = np.concatenate([self.x, centers[:, 0]])
+        self.y = np.concatenate([self.y, centers[:, 1]])
+        self.prev_x = np.concatenate([self.prev_x, centers[:, 0]])
+        self.prev_y = np.concatenate([self.prev_y, centers[:, 1]])
+        self.start_x = np.concatenate([self.start_x, centers[:, 0]])
+        self.start_y = np.concatenate([self.start_y, centers[:, 1]])
+        self.direction = np.concatenate([self.direction, np.full(count, DIR_STOP, dtype=np.int64)])
+        self.speed = np.concatenate([self.speed, np.full(count, float(GHOST_INITIAL_SPEED))])
+        self.speed_multiplier = np.concatenate([self.speed_multiplier, np.full(count, float(speed_multiplier))])
+        self.color_index = np.concatenate([self.color_index, np.asarray(color_indices, dtype=np.int64)])
+        new = np.arange(len(self) - count, len(self))
+        self.random_direction(new, self.open_directions(new))
+
+    def reset_positions(self):
+        """Ghost.reset_position for every ghost."""
+        self.x[:] = self.start_x
+        self.y[:] = self.start_y
+        self.direction[:] = DIR_STOP
+        everyone = np.arange(len(self))
+        self.random_direction(everyone, self.open_directions(everyone))
+
+    def store_previous_positions(self):
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+
+    def grid_positions(self):
+        """(col, row) arrays of the tile each ghost is in, like get_grid_pos."""
+        return (self.x // TILE_SIZE).astype(np.int64), (self.y // TILE_SIZE).astype(np.int64)
+
+    def open_directions(self, idx):
+        """(len(idx), 4) bool array: can_move_in_direction for each of UP, DOWN, LEFT, RIGHT."""
+        step = self.speed[idx, None] # Probes use the base speed, as in can_move_in_direction
+        predicted_x = self.x[idx, None] + GHOST_DX[None, :4] * step
+        predicted_y = self.y[idx, None] + GHOST_DY[None, :4] * step
+        left = np.trunc(predicted_x).astype(np.int64) - self.size // 2
+        top = np.trunc(predicted_y).astype(np.int64) - self.size // 2
+        blocked = np.zeros(left.shape, dtype=bool)
+        for col in (left // TILE_SIZE, (left + self.size - 1) // TILE_SIZE):
+            for row in (top // TILE_SIZE, (top + self.size - 1) // TILE_SIZE):
+                blocked |= self._lookup(self.walls, col, row, outside=True)
+        return ~blocked
+
+    def _lookup(self, grid, col, row, outside=0):
+        """grid[row, col] where inside the grid, `outside` elsewhere."""
+        rows, cols = grid.shape
+        inside = (col >= 0) & (col < cols) & (row >= 0) & (row < rows)
+        values = grid[np.clip(row, 0, rows - 1), np.clip(col, 0, cols - 1)]
+        values[~inside] = outside
+        return values
+
+    def random_direction(self, idx, open_directions):
+        """Ghost.random_direction for the ghosts in idx, given their open_directions rows."""
+        if idx.size == 0:
+            return
+        reverse = GHOST_REVERSE[self.direction[idx]]
+        candidates = open_directions.copy()
+        has_reverse = reverse != DIR_STOP
+        candidates[np.flatnonzero(has_reverse), reverse[has_reverse]] = False # Avoid reversing if possible
+        keys = self.rng.random(candidates.shape)
+        keys[~candidates] = -1.0
+        choice = keys.argmax(axis=1)
+        # No other choice: reverse if that is open (reversing from STOP stays STOP), else stop
+        can_reverse = ~has_reverse | open_directions[np.arange(idx.size), np.minimum(reverse, DIR_STOP - 1)]
+        fallback = np.where(can_reverse, reverse, DIR_STOP)
+        self.direction[idx] = np.where(candidates.any(axis=1), choice, fallback)
+
+    def update(self):
+        """One frame of Ghost.update for every ghost."""
+        n = len(self)
+        if n == 0:
+            return
+        everyone = np.arange(n)
+        current_speed = self.speed * self.speed_multiplier
+        open_directions = self.open_directions(everyone)
+
+        # Alignment with the center of the current tile
+        grid_x, grid_y = self.grid_positions()
+        is_aligned = ((np.abs(self.x - (grid_x * TILE_SIZE + TILE_SIZE // 2)) < current_speed + 1) &
+                      (np.abs(self.y - (grid_y * TILE_SIZE + TILE_SIZE // 2)) < current_speed + 1))
+
+        # Aligned: follow the corridor, or pick a new direction at junctions and dead ends
+        aligned = np.flatnonzero(is_aligned)
+        masks = self._lookup(self.exit_masks, grid_x[aligned], grid_y[aligned])
+        heading = self.direction[aligned]
+        moving = heading != DIR_STOP
+        corridor = np.full(aligned.size, -1, dtype=np.int64)
+        corridor[moving] = self.corridor_next[masks[moving], NAV_MOVE_OF[heading[moving]]]
+        follows = corridor >= 0
+        self.direction[aligned[follows]] = DIRECTION_OF_NAV_MOVE[corridor[follows]]
+        decide = aligned[~follows]
+
+        # Chase Pacman from junctions, one path lookup per distinct tile; failed chases turn randomly
+        chasing = decide[self.rng.random(decide.size) < GHOST_CHASE_PROB]
+        chase = self.chase_directions(grid_x[chasing], grid_y[chasing])
+        chased = chase != DIR_STOP
+        chased[chased] = open_directions[chasing[chased], chase[chased]]
+        self.direction[chasing[chased]] = chase[chased]
+        decide = decide[~np.isin(decide, chasing[chased])]
+
+        # Between tile centers: an occasional random turn
+        unaligned = np.flatnonzero(~is_aligned)
+        turning = unaligned[self.rng.random(unaligned.size) < GHOST_CHANGE_DIR_PROB]
+        decide = np.concatenate([decide, turning])
+        self.random_direction(decide, open_directions[decide])
+
+        # If the current direction leads to a wall, find a new one
+        blocked = np.flatnonzero((self.direction != DIR_STOP) &
+                                 ~open_directions[everyone, np.minimum(self.direction, DIR_STOP - 1)])
+        self.random_direction(blocked, open_directions[blocked])
+
+        # Move
+        self.x += GHOST_DX[self.direction] * current_speed
+        self.y += GHOST_DY[self.direction] * current_speed
+
+    def chase_directions(self, grid_x, grid_y):
+        """Direction index of the first step towards Pacman from each tile (DIR_STOP if there is no path)."""
+        directions = np.full(grid_x.size, DIR_STOP, dtype=np.int64)
+        if grid_x.size == 0:
+            return directions
+        tiles, inverse = np.unique(np.stack([grid_x, grid_y], axis=1), axis=0, return_inverse=True)
+        tile_directions = np.full(len(tiles), DIR_STOP, dtype=np.int64)
+        for i, (x, y) in enumerate(tiles.tolist()):
+            direction = self.game.chase_direction(x, y)
+            if direction is not None:
+                tile_directions[i] = GHOST_DIRECTIONS.index(direction)
+        return tile_directions[inverse.ravel()]
+
+    def collides_with(self, rect):
+        """True if any ghost's rect overlaps `rect` (Rect.colliderect over all ghosts)."""
+        if len(self) == 0 or rect.width <= 0 or rect.height <= 0:
+            return False
+        left = self.x.astype(np.int64) - self.size // 2 # int() truncates, like Ghost.rect.center
+        top = self.y.astype(np.int64) - self.size // 2
+        return bool(np.any((left < rect.right) & (rect.left < left + self.size) &
+                           (top < rect.bottom) & (rect.top < top + self.size)))
+
+    def draw(self, screen, alpha=1.0):
+        """Blits each ghost's sprite, in order, interpolated like Entity.draw_center. Returns the drawn rects."""
+        sprites = self.game.sprites
+        blits = []
+        x = self.x if alpha >= 1.0 else lerp(self.prev_x, self.x, alpha)
+        y = self.y if alpha >= 1.0 else lerp(self.prev_y, self.y, alpha)
+        for x, y, direction, color in zip(x.astype(np.int64).tolist(), y.astype(np.int64).tolist(),
+                                          self.direction.tolist(), self.color_index.tolist()):
+            sprite = sprites.ghost(self.colors[color], self.size, GHOST_DIRECTIONS[direction])
+            blits.append((sprite, (x - self.size, y - self.size)))
+        return screen.blits(blits)
+
+
+class PreparedLevel:
+    """Everything load_level swaps in for one level, built by Game.prepare_level (possibly on a worker thread)."""
+    def __init__(self, level_map, level, walls, wall_grid, food_dots, nav_graph, wall_layer, maze_layer):
+        self.level_map = level_map
+        self.level = level
+        self.walls = walls
+        self.wall_grid = wall_grid
+        self.food_dots = food_dots
+        self.nav_graph = nav_graph
+        self.wall_layer = wall_layer
+        self.maze_layer = maze_layer
 
 
 class Game:
     """Manages the overall game state, levels, and interactions."""
-    def __init__(self):
+    def __init__(self, dirty_rects=False, mass_ghosts=False, seed=None, inputs=None, profiler=None, level_maps=None):
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # Opt-in dirty-rect mode: only repaint and push the screen areas that changed
+        self.dirty_rects = DirtyRects(self.screen) if dirty_rects else None
         pygame.display.set_caption("Pacman")
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 36)
+        self.text_cache = TextCache() # Reuses HUD text surfaces until their text changes
         self.running = True
         self.game_over = False
         self.level_complete_screen = False
+        self.death_pause_ticks = 0 # Ticks left in the pause after Pacman loses a life
+        self.ticks = 0 # Ticks run so far; key presses are logged against it
+
+        # The game's own random stream (mass-ghost batches are seeded from it), so a seeded game can be replayed
+        self.seed = new_seed(seed)
+        self.rng = random.Random(self.seed)
+        self.inputs = inputs or LiveInput() # Keyboard, recording or replay (see input_log)
+        self.profiler = profiler or FrameProfiler("pacman") # Per-phase frame timings, off until PROFILER_KEY
 
         self.pacman = None
         self.ghosts = []
-        self.food_dots = []
+        # Mass-ghost mode keeps MASS_GHOST_COUNT ghosts in a GhostBatch instead of Ghost objects
+        self.mass_ghosts = mass_ghosts
+        self.ghost_batch = None
+        self.food_dots = {} # (col, row) tile -> food dot Rect, at most one dot per tile
         self.walls = []
-
+        self.wall_grid = [] # One bytearray per map row, 1 where the tile is a wall or void
+        self.nav_graph = None # Junction/corridor graph with per-tile exit masks
+        self.wall_layer = None # Pre-rendered walls for the current level
+        self.sprites = SpriteAtlas() # Pre-rendered Pacman and ghost sprites
+        self.maze_layer = None # wall_layer plus the remaining food dots
+        self.prefetcher = LevelPrefetcher() # Builds the next level while the level-complete screen shows
+        self.paths = PathCache() # Ghost chase paths for the current level
+
+        self.level_maps = LEVEL_MAPS if level_maps is None else level_maps # The levels to play, in order
         self.current_level_index = 0
         self.current_level_map = []
+        self.current_level = None # level_compiler.CompiledLevel of current_level_map
         self.pacman_start_pos = (0, 0)
         self.ghost_start_positions = []
         self.total_food_this_level = 0
@@ -377,17 +770,30 @@ class Game:
 
     def load_level(self, level_index):
         """Loads a new level based on its index, sets up game elements."""
-        if level_index >= len(LEVEL_MAPS):
+        if level_index >= len(self.level_maps):
             self.game_over = True # All levels completed, game won
-            print("Congratulations! You completed all levels!")
+            log.info("Congratulations! You completed all levels!")
             return
 
-        self.current_level_map = LEVEL_MAPS[level_index]
-        self.walls = []
-        self.food_dots = []
-        self.ghost_start_positions = []
-        self.total_food_this_level = 0
+        # Swap in the level's data, prefetched during the level-complete screen when possible
+        prepared = self.prefetcher.take(level_index, lambda: self.prepare_level(level_index))
+        self.current_level_map = prepared.level_map
+        self.current_level = level = prepared.level
+        self.walls = prepared.walls
+        self.wall_grid = prepared.wall_grid
+        self.food_dots = prepared.food_dots
+        self.nav_graph = prepared.nav_graph
+        self.paths.clear() # Paths of the previous level no longer apply
+        self.wall_layer = prepared.wall_layer
+        self.maze_layer = prepared.maze_layer
+        if self.dirty_rects:
+            self.dirty_rects.invalidate() # The whole background changed
+        self.total_food_this_level = level.total_food
+        if level.pacman_start is not None:
+            self.pacman_start_pos = level.pacman_start
+        self.ghost_start_positions = list(level.ghost_starts)
         self.food_eaten_this_level = 0
+        self.death_pause_ticks = 0
 
         # Initialize or update Pacman
         if self.pacman:
@@ -399,22 +805,6 @@ class Game:
 
         self.ghosts = [] # Clear existing ghosts
 
-        # Define ghost colors - more levels could cycle through more colors or repeat
-        ghost_colors = [RED, ORANGE, PINK, CYAN, GREEN]
-
-        for y, row in enumerate(self.current_level_map):
-            for x, char in enumerate(row):
-                if char == 'W':
-                    self.walls.append(pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
-                elif char == 'F':
-                    self.food_dots.append(pygame.Rect(x * TILE_SIZE + TILE_SIZE // 2 - 3, # Center food dot
-                                                      y * TILE_SIZE + TILE_SIZE // 2 - 3, 6, 6)) # 6x6 pixel dot
-                    self.total_food_this_level += 1
-                elif char == 'P':
-                    self.pacman_start_pos = (x, y)
-                elif char == 'G':
-                    self.ghost_start_positions.append((x, y))
-
         # Set Pacman's actual starting position and reset state
         self.pacman.grid_x, self.pacman.grid_y = self.pacman_start_pos
         self.pacman.x = self.pacman.grid_x * TILE_SIZE + TILE_SIZE // 2
@@ -425,16 +815,100 @@ class Game:
         # Increase number of ghosts for higher levels, but don't exceed available start positions
         num_ghosts_to_spawn = min(len(self.ghost_start_positions), 2 + level_index)
 
+        if self.mass_ghosts:
+            self.ghost_batch = GhostBatch(self, GHOST_COLORS, seed=self.rng.getrandbits(64))
+            if self.ghost_start_positions:
+                starts = [self.ghost_start_positions[i % len(self.ghost_start_positions)] for i in range(MASS_GHOST_COUNT)]
+                colors = [i % len(GHOST_COLORS) for i in range(MASS_GHOST_COUNT)]
+                self.ghost_batch.add(starts, colors, 1.0 + level_index * 0.1)
+            num_ghosts_to_spawn = 0
+
         for i in range(num_ghosts_to_spawn):
             g_x, g_y = self.ghost_start_positions[i % len(self.ghost_start_positions)] # Cycle through ghost start positions
-            color_index = i % len(ghost_colors)
-            ghost = Ghost(self, g_x, g_y, ghost_colors[color_index])
+            color_index = i % len(GHOST_COLORS)
+            ghost = Ghost(self, g_x, g_y, GHOST_COLORS[color_index])
             ghost.ghost_speed_multiplier = 1.0 + level_index * 0.1 # Ghosts also get faster each level
             self.ghosts.append(ghost)
 
-        print(f"Level {self.current_level_index + 1} loaded with {self.total_food_this_level} food dots and {len(self.ghosts)} ghosts.")
+        self.store_previous_positions() # Nothing to interpolate from on a new level
+        num_ghosts = len(self.ghost_batch) if self.ghost_batch is not None else len(self.ghosts)
+        log.info("Level %d loaded with %d food dots and %d ghosts.",
+                 self.current_level_index + 1, self.total_food_this_level, num_ghosts)
         self.level_complete_screen = False # Reset flag for level transition
 
+    def prepare_level(self, level_index):
+        """Builds a level's data and background layers without touching the current level.
+
+        Safe to run on a worker thread: it only reads constants and the screen's size and pixel format.
+        """
+        level_map = self.level_maps[level_index]
+        # Parsed, validated arrays for this map (compiled once, then loaded from the level cache)
+        level = load_level_map(level_map, name=f"Level {level_index + 1}")
+        walls = [pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE) for x, y in level.wall_tiles()]
+        wall_grid = level.wall_rows()
+        food_dots = {(x, y): pygame.Rect(x * TILE_SIZE + TILE_SIZE // 2 - 3, # Center food dot
+                                         y * TILE_SIZE + TILE_SIZE // 2 - 3, 6, 6) # 6x6 pixel dot
+                     for x, y in level.food.tolist()}
+        nav_graph = NavGraph([[not blocked for blocked in row] for row in wall_grid])
+        wall_layer, maze_layer = self.build_maze_layers(walls, food_dots)
+        return PreparedLevel(level_map, level, walls, wall_grid, food_dots, nav_graph, wall_layer, maze_layer)
+
+    def prefetch_next_level(self):
+        """Starts preparing the level after the current one on a worker thread (if there is one)."""
+        next_index = self.current_level_index + 1
+        if next_index < len(self.level_maps):
+            self.prefetcher.start(next_index, lambda: self.prepare_level(next_index))
+
+    def build_maze_layers(self, walls, food_dots):
+        """Pre-renders a level's walls and food so draw() can blit them in one call.
+
+        Returns (wall_layer, maze_layer), created in the screen's pixel format.
+        """
+        wall_layer = pygame.Surface(self.screen.get_size(), 0, self.screen)
+        wall_layer.fill(BLACK)
+        for wall in walls:
+            pygame.draw.rect(wall_layer, BLUE, wall)
+
+        maze_layer = wall_layer.copy()
+        for food_rect in food_dots.values():
+            pygame.draw.circle(maze_layer, WHITE, food_rect.center, food_rect.width // 2)
+        return wall_layer, maze_layer
+
+    def erase_food(self, col, row):
+        """Removes one eaten dot from the maze layer by restoring its tile from the wall layer."""
+        tile_rect = pygame.Rect(col * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+        self.maze_layer.blit(self.wall_layer, tile_rect, tile_rect)
+        if self.dirty_rects:
+            self.dirty_rects.background_changed(tile_rect)
+
+    def chase_direction(self, grid_x, grid_y):
+        """Direction of the first step from tile (grid_x, grid_y) towards Pacman's tile, or None."""
+        path = self.paths.get(self.nav_graph, (grid_x, grid_y), self.pacman.get_grid_pos(), self.current_level_index)
+        if path is None or len(path) < 2:
+            return None
+        return (path[1][0] - path[0][0], path[1][1] - path[0][1])
+
+    def area_has_wall(self, left, top, width, height):
+        """Checks whether a pixel rectangle overlaps any wall or void tile, or leaves the map.
+
+        Only the tiles under the rectangle are looked up in wall_grid (1 to 4 for an
+        entity), giving the same answer as colliderect against every blocked tile rect.
+        """
+        if width <= 0 or height <= 0:
+            return False # An empty rect never collides
+        first_col = left // TILE_SIZE
+        last_col = (left + width - 1) // TILE_SIZE
+        first_row = top // TILE_SIZE
+        last_row = (top + height - 1) // TILE_SIZE
+        if first_col < 0 or first_row < 0 or last_row >= len(self.wall_grid) or last_col >= len(self.wall_grid[0]):
+            return True # Off the map counts as blocked, as in NavGraph
+        for row in range(first_row, last_row + 1):
+            row_walls = self.wall_grid[row]
+            for col in range(first_col, last_col + 1):
+                if row_walls[col]:
+                    return True
+        return False
+
     def reset_game_state(self):
         """Resets the entire game for a new playthrough."""
         self.pacman.score = 0
@@ -448,15 +922,22 @@ class Game:
         self.pacman.reset_position()
         for ghost in self.ghosts:
             ghost.reset_position()
-        pygame.time.wait(DEATH_PAUSE_MS) # Pause briefly after death
+        if self.ghost_batch is not None:
+            self.ghost_batch.reset_positions()
+        # Pause briefly after death: update() holds everything still for this many ticks while
+        # the loop keeps drawing and handling input (no wall-clock sleep, so headless runs don't wait)
+        self.death_pause_ticks = DEATH_PAUSE_TICKS
+        self.store_previous_positions() # Jump to the start positions instead of sliding there
 
     def handle_input(self):
         """Processes user input (keyboard events)."""
-        for event in pygame.event.get():
+        for event in self.inputs.events(self.ticks):
             if event.type == pygame.QUIT:
                 self.running = False
             if event.type == pygame.KEYDOWN:
-                if self.game_over:
+                if event.key == PROFILER_KEY: # Show/hide the frame profiler overlay
+                    self.profiler.toggle_overlay()
+                elif self.game_over:
                     if event.key == pygame.K_r: # Restart game
                         self.reset_game_state()
                     elif event.key == pygame.K_q: # Quit game
@@ -479,106 +960,166 @@ class Game:
                     elif event.key == pygame.K_q: # Quit mid-game
                         self.running = False
 
+    def store_previous_positions(self):
+        """Start of a tick (or a jump): entities are drawn interpolated from where they are now."""
+        self.pacman.store_previous_position()
+        for ghost in self.ghosts:
+            ghost.store_previous_position()
+        if self.ghost_batch is not None:
+            self.ghost_batch.store_previous_positions()
+
     def update(self):
         """Updates all game objects and checks for collisions and game state changes."""
+        self.ticks += 1
+        self.store_previous_positions()
         if self.game_over or self.level_complete_screen:
             return # Don't update game logic if game over or level complete screen is active
+        if self.death_pause_ticks > 0:
+            self.death_pause_ticks -= 1
+            return # Still in the pause after losing a life
 
         self.pacman.update()
         for ghost in self.ghosts:
             ghost.update()
-
-        # Pacman eats food
-        food_eaten_indices = []
-        for i, food_rect in enumerate(self.food_dots):
-            if self.pacman.rect.colliderect(food_rect):
-                food_eaten_indices.append(i)
-                self.pacman.score += FOOD_SCORE
-                self.food_eaten_this_level += 1
-
-        # Remove eaten food dots (iterate backwards to avoid index issues if multiple eaten in one frame)
-        for i in sorted(food_eaten_indices, reverse=True):
-            del self.food_dots[i]
+        if self.ghost_batch is not None:
+            self.ghost_batch.update()
+
+        # Pacman eats food: only dots on the tiles under Pacman's rect can be touched
+        pacman_rect = self.pacman.rect
+        for row in range(pacman_rect.top // TILE_SIZE, (pacman_rect.bottom - 1) // TILE_SIZE + 1):
+            for col in range(pacman_rect.left // TILE_SIZE, (pacman_rect.right - 1) // TILE_SIZE + 1):
+                food_rect = self.food_dots.get((col, row))
+                if food_rect is not None and pacman_rect.colliderect(food_rect):
+                    del self.food_dots[(col, row)]
+                    self.erase_food(col, row)
+                    self.pacman.score += FOOD_SCORE
+                    self.food_eaten_this_level += 1
 
         # Pacman-Ghost collision
+        pacman_hit = self.ghost_batch is not None and self.ghost_batch.collides_with(self.pacman.rect)
         for ghost in self.ghosts:
             if self.pacman.rect.colliderect(ghost.rect):
-                self.pacman.lives -= 1
-                if self.pacman.lives <= 0:
-                    self.game_over = True
-                else:
-                    print(f"Pacman hit a ghost! Lives remaining: {self.pacman.lives}")
-                    self.reset_after_death()
+                pacman_hit = True
                 break # Only lose one life per collision event
 
+        if pacman_hit:
+            self.pacman.lives -= 1
+            if self.pacman.lives <= 0:
+                self.game_over = True
+            else:
+                log.info("Pacman hit a ghost! Lives remaining: %d", self.pacman.lives)
+                self.reset_after_death()
+
         # Check for level completion
         if self.food_eaten_this_level >= self.total_food_this_level and self.total_food_this_level > 0:
             self.level_complete_screen = True
-            print(f"Level {self.current_level_index + 1} complete!")
-
-    def draw(self):
-        """Draws all game elements on the screen."""
-        self.screen.fill(BLACK)
-
-        # Draw walls
-        for wall in self.walls:
-            pygame.draw.rect(self.screen, BLUE, wall)
-
-        # Draw food dots
-        for food_rect in self.food_dots:
-            pygame.draw.circle(self.screen, WHITE, food_rect.center, food_rect.width // 2)
+            self.prefetch_next_level()
+            log.info("Level %d complete!", self.current_level_index + 1)
+
+    def draw(self, alpha=1.0):
+        """Draws all game elements on the screen.
+
+        alpha: how far (0 to 1) the frame is from the previous tick to the current one;
+        Pacman and the ghosts are drawn interpolated between their positions at those ticks.
+        """
+        start = self.profiler.start()
+        # Draw walls and remaining food dots (cached layer, also clears the previous frame)
+        if self.dirty_rects:
+            self.dirty_rects.restore(self.maze_layer) # Only where the last frame drew
+        else:
+            self.screen.blit(self.maze_layer, (0, 0))
+        drawn = [] # Areas drawn over the maze layer this frame
+        start = self.profiler.lap("draw.maze", start)
 
         # Draw Pacman
-        self.pacman.draw(self.screen)
+        drawn.append(self.pacman.draw(self.screen, alpha))
 
         # Draw Ghosts
         for ghost in self.ghosts:
-            ghost.draw(self.screen)
+            drawn.append(ghost.draw(self.screen, alpha))
+        if self.ghost_batch is not None:
+            drawn.extend(self.ghost_batch.draw(self.screen, alpha))
+        start = self.profiler.lap("draw.entities", start)
 
         # Draw score, lives, and current level
-        score_text = self.font.render(f"Score: {self.pacman.score}", True, WHITE)
-        self.screen.blit(score_text, (TILE_SIZE // 2, 5))
+        score_text = self.text_cache.render(self.font, f"Score: {self.pacman.score}", True, WHITE)
+        drawn.append(self.screen.blit(score_text, (TILE_SIZE // 2, 5)))
 
-        lives_text = self.font.render(f"Lives: {self.pacman.lives}", True, WHITE)
-        self.screen.blit(lives_text, (SCREEN_WIDTH - lives_text.get_width() - TILE_SIZE // 2, 5))
+        lives_text = self.text_cache.render(self.font, f"Lives: {self.pacman.lives}", True, WHITE)
+        drawn.append(self.screen.blit(lives_text, (SCREEN_WIDTH - lives_text.get_width() - TILE_SIZE // 2, 5)))
 
-        level_text = self.font.render(f"Level: {self.current_level_index + 1}", True, WHITE)
-        self.screen.blit(level_text, (SCREEN_WIDTH // 2 - level_text.get_width() // 2, 5))
+        level_text = self.text_cache.render(self.font, f"Level: {self.current_level_index + 1}", True, WHITE)
+        drawn.append(self.screen.blit(level_text, (SCREEN_WIDTH // 2 - level_text.get_width() // 2, 5)))
 
 
         # Display Game Over or Level Complete messages
         if self.game_over:
             # If all levels completed
-            if self.current_level_index >= len(LEVEL_MAPS):
-                final_message_text = self.font.render("YOU WON! ALL LEVELS COMPLETED!", True, YELLOW)
+            if self.current_level_index >= len(self.level_maps):
+                final_message_text = self.text_cache.render(self.font, "YOU WON! ALL LEVELS COMPLETED!", True, YELLOW)
             else: # Standard game over
-                final_message_text = self.font.render("GAME OVER!", True, RED)
+                final_message_text = self.text_cache.render(self.font, "GAME OVER!", True, RED)
 
-            restart_text = self.font.render("Press 'R' to Restart or 'Q' to Quit", True, WHITE)
+            restart_text = self.text_cache.render(self.font, "Press 'R' to Restart or 'Q' to Quit", True, WHITE)
 
-            self.screen.blit(final_message_text, (SCREEN_WIDTH // 2 - final_message_text.get_width() // 2, SCREEN_HEIGHT // 2 - 20))
-            self.screen.blit(restart_text, (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, SCREEN_HEIGHT // 2 + 20))
+            drawn.append(self.screen.blit(final_message_text, (SCREEN_WIDTH // 2 - final_message_text.get_width() // 2, SCREEN_HEIGHT // 2 - 20)))
+            drawn.append(self.screen.blit(restart_text, (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, SCREEN_HEIGHT // 2 + 20)))
 
         if self.level_complete_screen:
-            next_level_text = self.font.render(f"LEVEL {self.current_level_index + 1} COMPLETE!", True, YELLOW)
-            continue_text = self.font.render("Press SPACE for Next Level or 'Q' to Quit", True, WHITE)
-            self.screen.blit(next_level_text, (SCREEN_WIDTH // 2 - next_level_text.get_width() // 2, SCREEN_HEIGHT // 2 - 20))
-            self.screen.blit(continue_text, (SCREEN_WIDTH // 2 - continue_text.get_width() // 2, SCREEN_HEIGHT // 2 + 20))
-
-
-        pygame.display.flip() # Update the full display Surface to the screen
-
-    def run(self):
-        """Main game loop."""
-        while self.running:
-            self.handle_input()
-            self.update()
-            self.draw()
-            self.clock.tick(60) # Control frame rate to 60 FPS
-
+            next_level_text = self.text_cache.render(self.font, f"LEVEL {self.current_level_index + 1} COMPLETE!", True, YELLOW)
+            continue_text = self.text_cache.render(self.font, "Press SPACE for Next Level or 'Q' to Quit", True, WHITE)
+            drawn.append(self.screen.blit(next_level_text, (SCREEN_WIDTH // 2 - next_level_text.get_width() // 2, SCREEN_HEIGHT // 2 - 20)))
+            drawn.append(self.screen.blit(continue_text, (SCREEN_WIDTH // 2 - continue_text.get_width() // 2, SCREEN_HEIGHT // 2 + 20)))
+
+        overlay_rect = self.profiler.draw_overlay(self.screen, (TILE_SIZE // 2, 40))
+        if overlay_rect is not None:
+            drawn.append(overlay_rect)
+        start = self.profiler.lap("draw.hud", start)
+
+        if self.dirty_rects:
+            self.dirty_rects.present(drawn) # Update only the changed areas of the display
+        else:
+            pygame.display.flip() # Update the full display Surface to the screen
+        self.profiler.lap("draw.present", start)
+
+    def state_hash(self):
+        """Hash of everything that decides how the game continues (see input_log.state_hash)."""
+        pacman = self.pacman
+        parts = [self.ticks, self.current_level_index, self.game_over, self.level_complete_screen,
+                 self.death_pause_ticks, self.food_eaten_this_level, sorted(self.food_dots),
+                 pacman.x, pacman.y, pacman.direction, pacman.next_direction, pacman.score, pacman.lives,
+                 [(ghost.x, ghost.y, ghost.direction) for ghost in self.ghosts], self.rng.getstate()]
+        if self.ghost_batch is not None:
+            batch = self.ghost_batch
+            parts += [batch.x, batch.y, batch.direction, batch.rng.bit_generator.state]
+        return state_hash(*parts)
+
+    def run(self, unthrottled=False, max_ticks=None, headless=None):
+        """Main game loop: the game ticks at FPS while frames are drawn (interpolated) up to game_loop.MAX_RENDER_FPS.
+
+        unthrottled: ticks run back to back, one frame per tick.
+        max_ticks: stop after this many ticks (replays).
+        headless: draw nothing (defaults to unthrottled; soak tests draw every unthrottled frame).
+        """
+        headless = unthrottled if headless is None else headless
+        loop = FixedTimestepLoop(FPS, unthrottled=unthrottled)
+        profiler = self.profiler
+        loop.run(profiler.wrap("input", self.handle_input), profiler.wrap("update", self.update),
+                 None if headless else profiler.wrap("draw", self.draw),
+                 running=lambda: self.running, max_ticks=max_ticks)
+
+        self.inputs.finish(self.ticks, self.state_hash()) # Saves the recording, if any
+        profiler.export() # Writes the --profile trace, if any
         pygame.quit()
-        sys.exit()
 
 if __name__ == "__main__":
-    game = Game()
+    logging.basicConfig(level=logging.INFO, format="%(message)s") # Print the level and life messages
+    mass_ghosts = "--mass-ghosts" in sys.argv
+    # --seed N fixes the random stream, --record PATH saves the session for replay.py
+    seed, inputs = cli_session(sys.argv, "pacman", mass_ghosts)
+    # --profile PATH records frame timings from the start and saves them as a Chrome trace
+    profiler = FrameProfiler("pacman", trace_path=cli_option(sys.argv, "--profile"))
+    game = Game(dirty_rects="--dirty-rects" in sys.argv, mass_ghosts=mass_ghosts, seed=seed, inputs=inputs,
+                profiler=profiler)
     game.run()
+    sys.exit()
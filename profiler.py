@@ -0,0 +1,168 @@
+"""Per-phase frame profiler shared by the games.
+
+Each game times the phases of its loop (input, update, draw) and of its
+drawing (background layer, entities, HUD, pushing the frame to the display)
+with perf_counter_ns, into a fixed-size ring buffer that keeps the most
+recent RING_SIZE spans:
+
+    start = profiler.start()
+    ...draw the maze...
+    start = profiler.lap("draw.maze", start) # Records the span, starts the next one
+
+PROFILER_KEY toggles an overlay with the p50/p95/p99 of every phase over the
+last OVERLAY_SAMPLES spans. Run a game with --profile PATH to record from the
+start and write the buffer to PATH as Chrome trace JSON on exit (open it in
+chrome://tracing or https://ui.perfetto.dev).
+
+While disabled (no --profile and the overlay hidden) start() returns 0, lap()
+returns right away when given 0 and wrapped loop callbacks only check a flag,
+so the profiler can stay in every build.
+"""
+import json
+import os
+from array import array
+from time import perf_counter_ns
+
+import numpy as np
+import pygame
+
+PROFILER_KEY = pygame.K_F3 # Not in input_log.LOGGED_KEYS, so toggling the overlay is never recorded
+RING_SIZE = 1 << 16 # Spans kept (about a minute of frames at 144 fps)
+OVERLAY_SAMPLES = 4096 # Recent spans the overlay percentiles are computed over
+OVERLAY_REFRESH_NS = 500_000_000 # The overlay's numbers are recomputed twice a second
+PERCENTILES = (50, 95, 99)
+
+# Overlay layout
+OVERLAY_FONT_SIZE = 20
+OVERLAY_LINE_HEIGHT = 16
+OVERLAY_COLUMNS = (6, 116, 176, 236) # x of the phase name and of each percentile column
+OVERLAY_WIDTH = 300
+OVERLAY_BACKGROUND = (0, 0, 0, 180)
+OVERLAY_TEXT = (255, 255, 255)
+OVERLAY_HEADER = (255, 255, 0)
+
+
+class FrameProfiler:
+    def __init__(self, name, trace_path=None, capacity=RING_SIZE):
+        self.name = name # Process name shown in the trace
+        self.trace_path = trace_path # Chrome trace written here by export(); None = don't record from the start
+        self.enabled = trace_path is not None
+        self.show_overlay = False
+        self.phase_names = [] # Phase index -> name, in the order phases were first recorded
+        self.phase_index = {}
+        # The ring buffer: span i lives in slot i % capacity
+        self.capacity = capacity
+        self.phases = array("B", bytes(capacity))
+        self.starts = array("q", bytes(8 * capacity))
+        self.durations = array("q", bytes(8 * capacity))
+        self.count = 0 # Spans recorded so far, including overwritten ones
+        self.origin = perf_counter_ns() # Trace timestamps are relative to this
+        self.font = None
+        self.overlay = None # Rendered overlay, reused until the next refresh
+        self.next_refresh = 0
+
+    def start(self):
+        """Start time of a span, or 0 while disabled."""
+        return perf_counter_ns() if self.enabled else 0
+
+    def lap(self, phase, start):
+        """Records the span `phase` from `start` (as returned by start() or lap()) to now. Returns now."""
+        if not start:
+            return 0 # Disabled when the span started
+        now = perf_counter_ns()
+        self.record(phase, start, now)
+        return now
+
+    def record(self, phase, start, end):
+        index = self.phase_index.get(phase)
+        if index is None:
+            index = self.phase_index[phase] = len(self.phase_names)
+            self.phase_names.append(phase)
+        slot = self.count % self.capacity
+        self.phases[slot] = index
+        self.starts[slot] = start
+        self.durations[slot] = end - start
+        self.count += 1
+
+    def wrap(self, phase, callback):
+        """Returns `callback` timed as one `phase` span per call (for the loop's input/update/draw callbacks)."""
+        def timed(*args):
+            if not self.enabled:
+                return callback(*args)
+            start = perf_counter_ns()
+            result = callback(*args)
+            self.record(phase, start, perf_counter_ns())
+            return result
+        return timed
+
+    def spans(self, last=None):
+        """The recorded spans, oldest first, as NumPy arrays (phase indices, start ns, duration ns).
+
+        last: only the most recent `last` spans.
+        """
+        n = min(self.count, self.capacity, self.capacity if last is None else last)
+        end = self.count % self.capacity
+        order = np.arange(end - n, end) % self.capacity
+        return (np.frombuffer(self.phases, np.uint8)[order], np.frombuffer(self.starts, np.int64)[order],
+                np.frombuffer(self.durations, np.int64)[order])
+
+    def stats(self, last=OVERLAY_SAMPLES):
+        """{phase: {"p50": ms, "p95": ms, "p99": ms}} over the most recent `last` spans."""
+        phases, _, durations = self.spans(last)
+        stats = {}
+        for index, phase in enumerate(self.phase_names):
+            samples = durations[phases == index]
+            if len(samples):
+                values = np.percentile(samples, PERCENTILES) / 1e6 # ns -> ms
+                stats[phase] = {f"p{p}": float(value) for p, value in zip(PERCENTILES, values)}
+        return stats
+
+    # --- Overlay ---
+
+    def toggle_overlay(self):
+        """Shows or hides the overlay. Showing it starts recording; hiding it stops unless --profile was given."""
+        self.show_overlay = not self.show_overlay
+        self.enabled = self.show_overlay or self.trace_path is not None
+        self.next_refresh = 0
+
+    def draw_overlay(self, screen, position):
+        """Draws the overlay at `position` if it is shown. Returns the drawn rect, or None."""
+        if not self.show_overlay:
+            return None
+        now = perf_counter_ns()
+        if now >= self.next_refresh:
+            self.overlay = self.render_overlay()
+            self.next_refresh = now + OVERLAY_REFRESH_NS
+        return screen.blit(self.overlay, position)
+
+    def render_overlay(self):
+        if self.font is None:
+            self.font = pygame.font.Font(None, OVERLAY_FONT_SIZE)
+        stats = self.stats()
+        rows = [(phase, *(f"{values[f'p{p}']:.2f}" for p in PERCENTILES)) for phase, values in stats.items()]
+        surface = pygame.Surface((OVERLAY_WIDTH, (len(rows) + 1) * OVERLAY_LINE_HEIGHT + 6), pygame.SRCALPHA)
+        surface.fill(OVERLAY_BACKGROUND)
+        header = ("phase (ms)", *(f"p{p}" for p in PERCENTILES))
+        for line, (row, color) in enumerate([(header, OVERLAY_HEADER)] + [(row, OVERLAY_TEXT) for row in rows]):
+            for x, text in zip(OVERLAY_COLUMNS, row):
+                surface.blit(self.font.render(text, True, color), (x, 3 + line * OVERLAY_LINE_HEIGHT))
+        return surface
+
+    # --- Export ---
+
+    def export(self, path=None):
+        """Writes the recorded spans to `path` (default: trace_path) as Chrome trace JSON. Returns the path, or None."""
+        path = path or self.trace_path
+        if path is None or not self.count:
+            return None
+        phases, starts, durations = self.spans()
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.name}}]
+        for index, start, duration in zip(phases.tolist(), ((starts - self.origin) / 1000).tolist(),
+                                          (durations / 1000).tolist()):
+            phase = self.phase_names[index]
+            events.append({"name": phase, "cat": phase.split(".")[0], "ph": "X", "ts": start, "dur": duration,
+                           "pid": pid, "tid": 0})
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
@@ -0,0 +1,172 @@
+"""Headless, vectorized Snake engine.
+
+SnakeBatch advances N independent Snake boards with one step() call, using
+NumPy array operations instead of a Snake/Food pair per Python loop. The rules
+mirror snake_game: Snake.turn, Snake.move, Snake.eat, Food.spawn and the speed
+curve in main(). Boards are tracked in grid cells instead of pixels.
+"""
+import numpy as np
+
+from snake_game import GRID_SIZE, INITIAL_SNAKE_SPEED, UP, DOWN, LEFT, RIGHT
+
+# Actions are direction indices into DIRECTION_DELTAS; NO_ACTION keeps the current direction
+ACTION_UP = 0
+ACTION_DOWN = 1
+ACTION_LEFT = 2
+ACTION_RIGHT = 3
+NO_ACTION = -1
+
+DIRECTION_DELTAS = np.array([UP, DOWN, LEFT, RIGHT], dtype=np.int64)
+OPPOSITE_ACTION = np.array([ACTION_DOWN, ACTION_UP, ACTION_RIGHT, ACTION_LEFT], dtype=np.int64)
+
+INITIAL_LENGTH = 3 # Same as Snake.reset
+FOOD_SCORE = 10 # Same as Snake.eat
+
+
+class SnakeBatch:
+    """N Snake boards stored as arrays and stepped together.
+
+    Per board: head position, direction, length, pending growth, score, speed,
+    a ring buffer of body cells (head at head_ptr, tail length - 1 slots behind),
+    an occupancy row and the food cell. Finished boards are frozen until reset().
+    """
+    def __init__(self, num_boards, grid_size=GRID_SIZE, seed=None):
+        self.num_boards = num_boards
+        self.grid_size = grid_size
+        self.num_cells = grid_size * grid_size
+        self.rng = np.random.default_rng(seed)
+
+        n = num_boards
+        self.head_x = np.zeros(n, dtype=np.int64)
+        self.head_y = np.zeros(n, dtype=np.int64)
+        self.direction = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.grow_pending = np.zeros(n, dtype=bool)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.speed = np.zeros(n, dtype=np.int64)
+        self.body = np.zeros((n, self.num_cells), dtype=np.int32) # Ring buffer of cell indices
+        self.head_ptr = np.zeros(n, dtype=np.int64)
+        self.occupied = np.zeros((n, self.num_cells), dtype=bool)
+        self.food = np.zeros(n, dtype=np.int64) # Food cell index, -1 if the board is full
+        self.done = np.zeros(n, dtype=bool)
+
+        self.reset()
+
+    def reset(self, boards=None):
+        """Resets the given boards (indices or bool mask; all boards if None) to the start state."""
+        if boards is None:
+            idx = np.arange(self.num_boards)
+        else:
+            idx = np.asarray(boards)
+            if idx.dtype == bool:
+                idx = np.flatnonzero(idx)
+        if idx.size == 0:
+            return
+
+        g = self.grid_size
+        head_x = g // 2
+        head_y = g // 2
+
+        self.head_x[idx] = head_x
+        self.head_y[idx] = head_y
+        self.direction[idx] = ACTION_RIGHT
+        self.length[idx] = INITIAL_LENGTH
+        self.grow_pending[idx] = False
+        self.score[idx] = 0
+        self.speed[idx] = INITIAL_SNAKE_SPEED
+        self.done[idx] = False
+
+        # Body occupies the head cell and the two cells to its left, tail first in the ring
+        self.occupied[idx] = False
+        for i in range(INITIAL_LENGTH):
+            cell = head_y * g + head_x - (INITIAL_LENGTH - 1 - i)
+            self.body[idx, i] = cell
+            self.occupied[idx, cell] = True
+        self.head_ptr[idx] = INITIAL_LENGTH - 1
+
+        self._spawn_food(idx)
+
+    def _spawn_food(self, idx):
+        """Places food on a uniformly random free cell of each given board.
+
+        Boards with no free cell left get food -1 and are marked done (board full).
+        """
+        free = ~self.occupied[idx]
+        keys = self.rng.random((idx.size, self.num_cells))
+        keys[~free] = -1.0
+        cells = keys.argmax(axis=1)
+        has_free = free.any(axis=1)
+        self.food[idx] = np.where(has_free, cells, -1)
+        self.done[idx[~has_free]] = True
+
+    def step(self, actions=None):
+        """Advances every board that is not done by one tick.
+
+        actions: array of direction indices per board (NO_ACTION to keep going
+        straight), or None for no input. Reversals are ignored, like Snake.turn.
+        Returns (ate, ended): bool arrays marking boards that ate food this tick
+        and boards whose game ended this tick (wall, self collision or full board).
+        """
+        n = self.num_boards
+        ate = np.zeros(n, dtype=bool)
+        ended = np.zeros(n, dtype=bool)
+        idx = np.flatnonzero(~self.done)
+        if idx.size == 0:
+            return ate, ended
+
+        # Snake.turn: apply inputs unless they reverse the current direction
+        if actions is not None:
+            act = np.asarray(actions, dtype=np.int64)[idx]
+            turn = (act >= 0) & (act != OPPOSITE_ACTION[self.direction[idx]])
+            self.direction[idx[turn]] = act[turn]
+
+        # Snake.move: wall check
+        g = self.grid_size
+        delta = DIRECTION_DELTAS[self.direction[idx]]
+        new_x = self.head_x[idx] + delta[:, 0]
+        new_y = self.head_y[idx] + delta[:, 1]
+        in_bounds = (new_x >= 0) & (new_x < g) & (new_y >= 0) & (new_y < g)
+        new_cell = np.where(in_bounds, new_y * g + new_x, 0)
+
+        # Self collision; the tail cell is only a target if the snake is growing
+        tail_ptr = (self.head_ptr[idx] - self.length[idx] + 1) % self.num_cells
+        tail_cell = self.body[idx, tail_ptr]
+        growing = self.grow_pending[idx]
+        hit_self = self.occupied[idx, new_cell] & (growing | (new_cell != tail_cell))
+        crashed = ~in_bounds | hit_self
+        self.done[idx[crashed]] = True
+        ended[idx[crashed]] = True
+
+        # Advance the surviving boards: release the tail (or grow), then claim the head
+        moving = ~crashed
+        b = idx[moving]
+        cell = new_cell[moving]
+        grew = growing[moving]
+        self.occupied[b[~grew], tail_cell[moving][~grew]] = False
+        self.length[b[grew]] += 1
+        self.grow_pending[b] = False
+        ptr = (self.head_ptr[b] + 1) % self.num_cells
+        self.body[b, ptr] = cell
+        self.head_ptr[b] = ptr
+        self.occupied[b, cell] = True
+        self.head_x[b] = new_x[moving]
+        self.head_y[b] = new_y[moving]
+
+        # Snake.eat, Food.spawn and the speed curve from main()
+        eaters = b[self.food[b] == cell]
+        if eaters.size:
+            ate[eaters] = True
+            self.score[eaters] += FOOD_SCORE
+            self.grow_pending[eaters] = True
+            self._spawn_food(eaters)
+            self.speed[eaters] = INITIAL_SNAKE_SPEED + self.length[eaters] // 5
+            full = eaters[self.done[eaters]]
+            ended[full] = True
+
+        return ate, ended
+
+    def body_cells(self, board):
+        """Returns the (x, y) cells of one board's body, head first (for inspection and drawing)."""
+        ptrs = (self.head_ptr[board] - np.arange(self.length[board])) % self.num_cells
+        cells = self.body[board, ptrs]
+        return [(int(c) % self.grid_size, int(c) // self.grid_size) for c in cells]
@@ -1,6 +1,14 @@
 import pygame
 import random
 import os
+import sys
+from collections import deque
+
+from dirty_rects import DirtyRects
+from game_loop import FixedTimestepLoop, lerp
+from input_log import LiveInput, cli_option, cli_session, state_hash
+from profiler import PROFILER_KEY, FrameProfiler
+from text_cache import TextCache
 
 # --- Constants ---
 SCREEN_WIDTH = 600
@@ -22,7 +30,58 @@ LEFT = (-1, 0)
 RIGHT = (1, 0)
 
 # Game Speed
-INITIAL_SNAKE_SPEED = 10 # Frames per second
+INITIAL_SNAKE_SPEED = 10 # Game ticks (snake moves) per second
+
+# Number of food items kept on the board at once
+FOOD_COUNT = 1
+
+def cell_index(position):
+    """Converts a pixel position into a flat index into a GRID_SIZE x GRID_SIZE grid."""
+    return (position[1] // CELL_SIZE) * GRID_SIZE + position[0] // CELL_SIZE
+
+def cell_position(index):
+    """Converts a flat grid index back into the pixel position of that cell."""
+    return ((index % GRID_SIZE) * CELL_SIZE, (index // GRID_SIZE) * CELL_SIZE)
+
+# --- Free Cell Index ---
+class FreeCells:
+    """Set of grid cells not covered by the snake.
+
+    Free cells live in a flat list and `slots` maps every cell to its index in
+    that list (-1 when the cell is taken), so add, discard and picking a random
+    free cell are all O(1) (removal swaps the last entry into the hole).
+    """
+    def __init__(self, size):
+        self.cells = list(range(size))
+        self.slots = list(range(size))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, index):
+        return self.slots[index] >= 0
+
+    def add(self, index):
+        if self.slots[index] < 0:
+            self.slots[index] = len(self.cells)
+            self.cells.append(index)
+
+    def discard(self, index):
+        slot = self.slots[index]
+        if slot < 0:
+            return # Already taken
+        last = self.cells.pop()
+        if last != index:
+            # Move the last free cell into the vacated slot
+            self.cells[slot] = last
+            self.slots[last] = slot
+        self.slots[index] = -1
+
+    def random_cell(self, rng=random):
+        """Returns a random free cell index drawn from `rng`, or None if the board is full."""
+        if not self.cells:
+            return None
+        return self.cells[rng.randrange(len(self.cells))]
 
 # --- Snake Class ---
 class Snake:
@@ -54,25 +113,26 @@ class Snake:
         if not (0 <= new_head_pos[0] < SCREEN_WIDTH and 0 <= new_head_pos[1] < SCREEN_HEIGHT):
             return True # Collision with wall occurred
 
-        # Self-collision check
-        # Determine the body segments that will persist after the move.
+        # Self-collision check against the occupancy grid (O(1) regardless of length).
         # If the snake is growing, all current segments remain.
-        # If not growing, the last segment will be removed, so it's not a collision target.
-        segments_to_check = self.positions[:] # Check against all current segments
-        if not self.grow_pending:
-            # If not growing, the tail is about to move, so it's not a collision point
-            segments_to_check = self.positions[:-1]
-
-        if new_head_pos in segments_to_check:
+        # If not growing, the tail is about to move, so its cell is not a collision target.
+        head_index = cell_index(new_head_pos)
+        tail_index = cell_index(self.positions[-1])
+        if self.occupied[head_index] and (self.grow_pending or head_index != tail_index):
             return True # Collision with self occurred
 
-        # If no collision, update positions
-        self.positions.insert(0, new_head_pos) # Add new head at the beginning
+        # If no collision, update positions. The tail is released before the head is
+        # claimed so that moving into the cell the tail just left stays consistent.
         if not self.grow_pending:
             self.positions.pop() # Remove tail if not growing
+            self.occupied[tail_index] = 0
+            self.free_cells.add(tail_index)
         else:
             self.length += 1 # Increase snake length
             self.grow_pending = False # Reset flag after growing
+        self.positions.appendleft(new_head_pos) # Add new head at the beginning
+        self.occupied[head_index] = 1
+        self.free_cells.discard(head_index)
 
         return False # No collision occurred
 
@@ -94,36 +154,116 @@ class Snake:
 
         self.direction = RIGHT # Default initial direction for the snake
 
-        # Initialize positions for a 3-segment snake moving right
-        self.positions = [
+        # Initialize positions for a 3-segment snake moving right.
+        # Head is at the left end of the deque, tail at the right end.
+        self.positions = deque([
             (initial_head_x, initial_head_y),
             (initial_head_x - CELL_SIZE, initial_head_y),
             (initial_head_x - (2 * CELL_SIZE), initial_head_y)
-        ]
+        ])
+        # Occupancy grid: one byte per cell, 1 if a body segment is on it
+        self.occupied = bytearray(GRID_SIZE * GRID_SIZE)
+        # Index of the remaining cells, used by Food to spawn in O(1)
+        self.free_cells = FreeCells(GRID_SIZE * GRID_SIZE)
+        for p in self.positions:
+            self.occupied[cell_index(p)] = 1
+            self.free_cells.discard(cell_index(p))
         self.score = 0 # Reset score
         self.grow_pending = False # Reset growth flag
 
 
 # --- Food Class ---
 class Food:
-    def __init__(self, snake_positions):
-        self.position = (0,0) # Initialize with a dummy position
+    def __init__(self, free_cells, count=FOOD_COUNT, rng=random):
+        self.positions = [] # Grid-aligned pixel positions of the food items on the board
+        self.count = count # Number of food items to keep on the board
         self.color = RED # Food color
-        self.spawn(snake_positions) # Spawn initial food
-
-    def spawn(self, snake_positions):
-        while True:
-            # Generate random grid coordinates for food
-            x = random.randrange(0, GRID_SIZE) * CELL_SIZE
-            y = random.randrange(0, GRID_SIZE) * CELL_SIZE
-            self.position = (x, y)
-            # Ensure food does not spawn on the snake's body
-            if self.position not in snake_positions:
-                break # Found a valid position
+        self.rng = rng # Source of the spawn positions (the game's seeded random.Random)
+        self.spawn(free_cells) # Spawn initial food
+
+    @property
+    def position(self):
+        """Position of the first food item (None if the board had no room for food)."""
+        return self.positions[0] if self.positions else None
+
+    def spawn(self, free_cells):
+        """Tops the board up to `count` food items on cells the snake does not cover.
+
+        Returns False if there was no free cell left for any food (the board is full).
+        """
+        # Take cells already holding food out of the index while picking,
+        # so two items never land on the same cell
+        held = []
+        for p in self.positions:
+            index = cell_index(p)
+            if index in free_cells:
+                free_cells.discard(index)
+                held.append(index)
+
+        while len(self.positions) < self.count:
+            index = free_cells.random_cell(self.rng)
+            if index is None:
+                break # Board is full
+            free_cells.discard(index)
+            held.append(index)
+            self.positions.append(cell_position(index))
+
+        for index in held:
+            free_cells.add(index)
+        return bool(self.positions)
+
+    def respawn(self, free_cells):
+        """Discards all current food items and spawns a fresh set."""
+        self.positions = []
+        return self.spawn(free_cells)
+
+    def remove(self, position):
+        """Removes the food item at the given position (after it has been eaten)."""
+        self.positions.remove(position)
 
     def draw(self, surface):
-        # Draw the food item
-        pygame.draw.rect(surface, self.color, (self.position[0], self.position[1], CELL_SIZE, CELL_SIZE))
+        # Draw the food items
+        for p in self.positions:
+            pygame.draw.rect(surface, self.color, (p[0], p[1], CELL_SIZE, CELL_SIZE))
+
+# --- Board Layer (dirty-rect mode) ---
+def draw_board(surface, snake, food):
+    """Draws the whole board (background, snake and food) onto a surface."""
+    surface.fill(BLACK)
+    snake.draw(surface)
+    food.draw(surface)
+
+def draw_cell(surface, snake, food, position):
+    """Redraws a single board cell from the current snake and food state. Returns its rect."""
+    cell_rect = pygame.Rect(position[0], position[1], CELL_SIZE, CELL_SIZE)
+    if snake.occupied[cell_index(position)]:
+        pygame.draw.rect(surface, snake.color, cell_rect)
+    elif position in food.positions:
+        pygame.draw.rect(surface, food.color, cell_rect)
+    else:
+        pygame.draw.rect(surface, BLACK, cell_rect)
+    return cell_rect
+
+def draw_move(surface, snake, last_move, alpha):
+    """Draws the head (and the released tail) `alpha` of the way through the last move. Returns the drawn rects.
+
+    Called over a fully drawn board: the head's new cell is blanked first, since the head is still on its way there.
+    """
+    previous_head, released_tail = last_move
+    head = snake.get_head_position()
+    rects = [pygame.draw.rect(surface, BLACK, (head[0], head[1], CELL_SIZE, CELL_SIZE))]
+    rects.append(pygame.draw.rect(surface, snake.color, (int(lerp(previous_head[0], head[0], alpha)),
+                                                         int(lerp(previous_head[1], head[1], alpha)), CELL_SIZE, CELL_SIZE)))
+    if released_tail is not None:
+        tail = snake.positions[-1]
+        rects.append(pygame.draw.rect(surface, snake.color, (int(lerp(released_tail[0], tail[0], alpha)),
+                                                             int(lerp(released_tail[1], tail[1], alpha)), CELL_SIZE, CELL_SIZE)))
+    return rects
+
+def game_state_hash(ticks, snake, food, game_over, rng):
+    """Hash of everything that decides how the game continues (see input_log.state_hash)."""
+    return state_hash(ticks, list(snake.positions), snake.direction, snake.length, snake.score,
+                      snake.grow_pending, food.positions, game_over, rng.getstate())
 
 # --- High Score System ---
 HIGH_SCORE_FILE = "highscore.txt"
@@ -144,36 +284,71 @@ def save_high_score(score):
         f.write(str(score)) # Write score as string
 
 # --- Main Game Function ---
-def main():
+def main(dirty_rects=False, unthrottled=False, seed=None, inputs=None, max_ticks=None, keep_high_score=True,
+         headless=None, profiler=None):
+    """Runs the game. The snake moves at current_speed ticks per second while frames are
+    drawn (interpolated) up to game_loop.MAX_RENDER_FPS.
+
+    unthrottled: ticks run back to back, one frame per tick.
+    seed: seed of the game's random stream (food spawns); random if None.
+    inputs: input source (input_log.LiveInput or ReplayInput); the keyboard if None.
+    max_ticks: stop after this many ticks (replays).
+    keep_high_score: load and save highscore.txt (replays leave it alone).
+    headless: draw nothing (defaults to unthrottled; soak tests draw every unthrottled frame).
+    profiler: profiler.FrameProfiler for the frame timings; one that is off until PROFILER_KEY if None.
+    Returns the hash of the final game state.
+    """
     pygame.init() # Initialize all imported pygame modules
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT)) # Set up the display surface
     pygame.display.set_caption("Snake Game") # Set window title
-    clock = pygame.time.Clock() # Create a clock object to control frame rate
 
     # Fonts for text display
     font = pygame.font.Font(None, 36) # Default font, size 36 for score/instructions
     game_over_font = pygame.font.Font(None, 48) # Larger font for game over message
+    text_cache = TextCache() # Reuses HUD text surfaces until their text changes
 
-    high_score = load_high_score() # Load the initial high score
+    high_score = load_high_score() if keep_high_score else 0 # Load the initial high score
 
+    rng = random.Random(seed) # The game's own random stream, so a seeded game can be replayed
+    inputs = inputs or LiveInput()
+    profiler = profiler or FrameProfiler("snake")
     snake = Snake() # Create snake object
-    food = Food(snake.positions) # Create food object, ensuring it doesn't spawn on the snake
+    food = Food(snake.free_cells, rng=rng) # Create food object, ensuring it doesn't spawn on the snake
+
+    # Opt-in dirty-rect mode: the board is kept on its own layer and only the
+    # cells that changed (head, tail, food) plus the HUD are repainted and pushed
+    dirty_rects = DirtyRects(screen) if dirty_rects else None
+    board_layer = None
+    if dirty_rects:
+        board_layer = pygame.Surface(screen.get_size()).convert()
+        draw_board(board_layer, snake, food)
 
     running = True # Main loop control flag
     game_over = False # Game state flag
     current_speed = INITIAL_SNAKE_SPEED # Initialize game speed
+    loop = FixedTimestepLoop(current_speed, unthrottled=unthrottled) # Game ticks per second follow current_speed
+    last_move = None # (previous head, released tail or None) of the last tick's move, for interpolated frames
+    ticks = 0 # Ticks run so far; key presses are logged against it
 
-    while running:
-        for event in pygame.event.get(): # Process all events in the event queue
+    def handle_input():
+        nonlocal running, game_over, current_speed, last_move
+        for event in inputs.events(ticks): # Process all events in the event queue
             if event.type == pygame.QUIT: # If the user clicks the close button
                 running = False # Exit the main loop
             elif event.type == pygame.KEYDOWN: # If a key is pressed
-                if game_over:
+                if event.key == PROFILER_KEY: # Show/hide the frame profiler overlay
+                    profiler.toggle_overlay()
+                elif game_over:
                     if event.key == pygame.K_r: # 'R' to Restart
                         snake.reset() # Reset snake state
-                        food.spawn(snake.positions) # Spawn new food
+                        food.respawn(snake.free_cells) # Spawn new food
                         game_over = False # Reset game over flag
+                        last_move = None
+                        if dirty_rects:
+                            draw_board(board_layer, snake, food)
+                            dirty_rects.invalidate()
                         current_speed = INITIAL_SNAKE_SPEED # Reset speed
+                        loop.tick_rate = current_speed
                     elif event.key == pygame.K_q: # 'Q' to Quit
                         running = False # Exit the main loop
                 else:
@@ -187,54 +362,116 @@ def main():
                     elif event.key == pygame.K_RIGHT or event.key == pygame.K_d:
                         snake.turn(RIGHT)
 
-        if not game_over:
-            # Move snake and check for collisions
-            if snake.move(): # move() returns True if a collision occurred (wall or self)
-                game_over = True # Set game over flag
-                if snake.score > high_score: # Check for new high score
-                    high_score = snake.score
+    def update():
+        nonlocal game_over, high_score, current_speed, last_move, ticks
+        ticks += 1
+        last_move = None
+        if game_over:
+            return
+
+        # Cells that may change this tick (for dirty-rect mode)
+        changed_cells = [snake.positions[-1]] + food.positions
+        previous_head = snake.get_head_position()
+        previous_tail = snake.positions[-1]
+        previous_length = len(snake.positions)
+
+        # Move snake and check for collisions
+        if snake.move(): # move() returns True if a collision occurred (wall or self)
+            game_over = True # Set game over flag
+            if snake.score > high_score: # Check for new high score
+                high_score = snake.score
+                if keep_high_score:
                     save_high_score(high_score) # Save new high score
-
-            # Check for food consumption
-            if snake.get_head_position() == food.position:
-                snake.eat() # Snake eats food
-                food.spawn(snake.positions) # Spawn new food
-                # Optional: Increase game speed as the snake grows
-                # This adds difficulty over time. Speed increases by 1 for every 5 segments grown.
-                current_speed = INITIAL_SNAKE_SPEED + (snake.length // 5) * 1
-
+        else:
+            # The tail cell was released unless the snake grew this tick
+            last_move = (previous_head, previous_tail if len(snake.positions) == previous_length else None)
+
+        # Check for food consumption
+        if snake.get_head_position() in food.positions:
+            snake.eat() # Snake eats food
+            food.remove(snake.get_head_position())
+            if not food.spawn(snake.free_cells): # Spawn new food
+                # No free cell left: the snake has filled the board
+                game_over = True
+                last_move = None
+                if snake.score > high_score:
+                    high_score = snake.score
+                    if keep_high_score:
+                        save_high_score(high_score)
+            # Optional: Increase game speed as the snake grows
+            # This adds difficulty over time. Speed increases by 1 for every 5 segments grown.
+            current_speed = INITIAL_SNAKE_SPEED + (snake.length // 5) * 1
+            loop.tick_rate = current_speed
+
+        if dirty_rects:
+            changed_cells += [snake.get_head_position()] + food.positions
+            for position in changed_cells:
+                dirty_rects.background_changed(draw_cell(board_layer, snake, food, position))
+
+    def draw(alpha):
         # --- Drawing ---
-        screen.fill(BLACK) # Clear screen with black background
+        start = profiler.start()
+        if dirty_rects:
+            dirty_rects.restore(board_layer) # Repaint only what changed or was drawn over
+        else:
+            screen.fill(BLACK) # Clear screen with black background
+
+            snake.draw(screen) # Draw the snake
+            food.draw(screen) # Draw the food
+        drawn = [] # Areas drawn over the board this frame
+        start = profiler.lap("draw.board", start)
 
-        snake.draw(screen) # Draw the snake
-        food.draw(screen) # Draw the food
+        # Between ticks, show the head and tail partway through the last move
+        if last_move is not None and alpha < 1.0:
+            drawn.extend(draw_move(screen, snake, last_move, alpha))
+        start = profiler.lap("draw.entities", start)
 
         # Draw current score
-        score_text = font.render(f"Score: {snake.score}", True, WHITE)
-        screen.blit(score_text, (5, 5)) # Position at top-left
+        score_text = text_cache.render(font, f"Score: {snake.score}", True, WHITE)
+        drawn.append(screen.blit(score_text, (5, 5))) # Position at top-left
 
         # Draw high score
-        high_score_text = font.render(f"High Score: {high_score}", True, WHITE)
+        high_score_text = text_cache.render(font, f"High Score: {high_score}", True, WHITE)
         # Position high score in the top-right corner
-        screen.blit(high_score_text, (SCREEN_WIDTH - high_score_text.get_width() - 5, 5))
+        drawn.append(screen.blit(high_score_text, (SCREEN_WIDTH - high_score_text.get_width() - 5, 5)))
 
         # Display "Game Over!" message if game has ended
         if game_over:
-            game_over_message = game_over_font.render("Game Over!", True, RED)
-            restart_message = font.render("Press 'R' to Restart or 'Q' to Quit", True, WHITE)
+            game_over_message = text_cache.render(game_over_font, "Game Over!", True, RED)
+            restart_message = text_cache.render(font, "Press 'R' to Restart or 'Q' to Quit", True, WHITE)
 
             # Center the messages on the screen
             game_over_rect = game_over_message.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
             restart_rect = restart_message.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20))
 
-            screen.blit(game_over_message, game_over_rect)
-            screen.blit(restart_message, restart_rect)
+            drawn.append(screen.blit(game_over_message, game_over_rect))
+            drawn.append(screen.blit(restart_message, restart_rect))
 
-        pygame.display.flip() # Update the full display Surface to the screen
+        overlay_rect = profiler.draw_overlay(screen, (5, 40))
+        if overlay_rect is not None:
+            drawn.append(overlay_rect)
+        start = profiler.lap("draw.hud", start)
+
+        if dirty_rects:
+            dirty_rects.present(drawn) # Update only the changed areas of the display
+        else:
+            pygame.display.flip() # Update the full display Surface to the screen
+        profiler.lap("draw.present", start)
 
-        clock.tick(current_speed) # Control game speed (frames per second)
+    headless = unthrottled if headless is None else headless
+    loop.run(profiler.wrap("input", handle_input), profiler.wrap("update", update),
+             None if headless else profiler.wrap("draw", draw), running=lambda: running, max_ticks=max_ticks)
 
+    final_hash = game_state_hash(ticks, snake, food, game_over, rng)
+    inputs.finish(ticks, final_hash) # Saves the recording, if any
+    profiler.export() # Writes the --profile trace, if any
     pygame.quit() # Uninitialize pygame modules when the loop ends
+    return final_hash
 
 if __name__ == "__main__":
-    main() # Run the main game function when the script is executed
+    # --seed N fixes the random stream, --record PATH saves the session for replay.py
+    seed, inputs = cli_session(sys.argv, "snake")
+    # --profile PATH records frame timings from the start and saves them as a Chrome trace
+    profiler = FrameProfiler("snake", trace_path=cli_option(sys.argv, "--profile"))
+    main(dirty_rects="--dirty-rects" in sys.argv, seed=seed, inputs=inputs,
+         profiler=profiler) # Run the main game function when the script is executed
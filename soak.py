@@ -0,0 +1,289 @@
+"""Soak test: runs a game for a long time under a random bot and checks for memory growth and frame-time drift.
+
+    python soak.py pacman --ticks 1000000
+    python soak.py snake --ticks 200000 --dirty-rects
+
+The game runs its real loop (snake_game.main or Game.run) unthrottled and
+headless under the SDL dummy driver, drawing one frame per tick. Key presses
+come from a seeded random bot, which also keeps restarting the game after
+each game over and advancing levels. In the pacman games it often steers
+towards the nearest ghost, so a run covers many game-over/restart cycles.
+
+Every --interval ticks a sample is taken: traced Python heap (tracemalloc,
+not counting the soak's own records), process RSS (which also sees SDL
+surfaces), bytes the game printed, and a histogram of frame times
+(input + tick + draw) since the last sample. The
+first --warmup ticks fill the games' caches and are not judged. The run fails
+(exit status 1) if, after warmup:
+
+    the traced heap grew by more than --max-heap-growth KiB
+    RSS grew by more than --max-rss-growth MiB
+    the p99 frame time over the last quarter of the samples is more than
+      --max-p99-drift (as a fraction) above that over the first quarter
+      (median of the per-sample p99s, so one hiccup does not count as drift)
+    the game printed more than --max-output bytes (per-tick prints flood a kiosk's logs)
+
+On failure the lines that allocated the most new memory are listed.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Must be set before pygame creates a display in any of the games
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+
+DEFAULT_TICKS = 200_000
+SAMPLE_INTERVAL = 10_000 # Ticks between samples
+WARMUP_TICKS = 20_000
+MAX_HEAP_GROWTH_KB = 512
+MAX_RSS_GROWTH_MB = 32
+MAX_P99_DRIFT = 0.5
+MAX_OUTPUT_BYTES = 0
+BOT_PRESS_PROB = 0.05 # Chance per tick that the bot presses a key
+BOT_HUNT_PROB = 0.5 # Chance that a press heads for the nearest ghost (pacman games)
+# Directions most of the time, plus the keys that start, restart and continue the games (never Q)
+BOT_KEYS = [pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT] * 3 + [pygame.K_r, pygame.K_SPACE, pygame.K_RETURN]
+# Frame-time histogram bins: 20 per decade from 1 us to 10 s, in milliseconds
+FRAME_BINS_MS = np.logspace(-3, 4, 141)
+
+
+def rss_bytes():
+    """Resident set size of this process, or 0 where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0
+
+
+def percentile(histogram, q):
+    """Upper edge (ms) of the FRAME_BINS_MS bin holding the q-th percentile of a histogram."""
+    counts = np.cumsum(histogram)
+    if counts[-1] == 0:
+        return 0.0
+    return float(FRAME_BINS_MS[1:][np.searchsorted(counts, counts[-1] * q / 100)])
+
+
+class OutputMeter:
+    """Stands in for sys.stdout during the run: counts what the game prints and keeps the first lines."""
+    def __init__(self, keep=5):
+        self.bytes = 0
+        self.keep = keep
+        self.lines = []
+
+    def write(self, text):
+        self.bytes += len(text)
+        if len(self.lines) < self.keep and text.strip():
+            self.lines.append(text.strip())
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class Soak:
+    """Collects the samples; also the game's input source (see input_log), acting as a random bot."""
+    def __init__(self, ticks, interval, warmup, seed, report):
+        self.ticks = ticks
+        self.interval = interval
+        self.warmup = warmup
+        self.rng = random.Random(seed)
+        self.hunt = None # Returns (Pacman's tile, [ghost tiles]) in the pacman games
+        self.report = report
+        self.output = OutputMeter()
+        self.restarts = 0
+        self.samples = [] # (tick, heap bytes, rss bytes, output bytes, restarts, frame histogram)
+        self.frame_times = [] # Frame times (ms) since the last sample
+        self.last_frame = None
+        self.baseline = None # tracemalloc snapshot at the end of warmup
+        self.latest = None # tracemalloc snapshot of the last sample
+        self.started = time.perf_counter()
+
+    # --- Input source ---
+
+    def events(self, tick):
+        now = time.perf_counter_ns()
+        if self.last_frame is not None:
+            self.frame_times.append((now - self.last_frame) / 1e6)
+        if tick and tick % self.interval == 0 and tick != self._last_sample_tick():
+            self.sample(tick)
+        self.last_frame = time.perf_counter_ns() # Sampling is not part of the next frame
+        if self.rng.random() < BOT_PRESS_PROB:
+            key = self.hunt_key() if self.hunt is not None and self.rng.random() < BOT_HUNT_PROB else None
+            return [pygame.event.Event(pygame.KEYDOWN, key=key or self.rng.choice(BOT_KEYS))]
+        return []
+
+    def hunt_key(self):
+        """Arrow key towards the ghost nearest to Pacman (None if there is none)."""
+        (x, y), ghosts = self.hunt()
+        if not ghosts:
+            return None
+        ghost_x, ghost_y = min(ghosts, key=lambda tile: abs(tile[0] - x) + abs(tile[1] - y))
+        dx, dy = ghost_x - x, ghost_y - y
+        if dx == dy == 0:
+            return None
+        if self.rng.random() < abs(dx) / (abs(dx) + abs(dy)):
+            return pygame.K_RIGHT if dx > 0 else pygame.K_LEFT
+        return pygame.K_DOWN if dy > 0 else pygame.K_UP
+
+    def finish(self, tick, final_hash):
+        if tick != self._last_sample_tick():
+            self.sample(tick)
+
+    # --- Sampling ---
+
+    def _last_sample_tick(self):
+        return self.samples[-1][0] if self.samples else 0
+
+    def sample(self, tick):
+        histogram, _ = np.histogram(self.frame_times, FRAME_BINS_MS)
+        self.frame_times = []
+        snapshot = self.snapshot()
+        heap = sum(trace.size for trace in snapshot.traces)
+        self.samples.append((tick, heap, rss_bytes(), self.output.bytes, self.restarts, histogram))
+        if self.baseline is None and tick >= self.warmup:
+            self.baseline = snapshot
+        self.latest = snapshot
+        self.report(f"tick {tick:>9}  heap {heap / 1024:9.0f} KiB  rss {rss_bytes() / 2**20:7.1f} MiB  "
+                    f"p50 {percentile(histogram, 50):7.3f} ms  p99 {percentile(histogram, 99):7.3f} ms  "
+                    f"restarts {self.restarts}  ({tick / (time.perf_counter() - self.started):.0f} ticks/s)")
+
+    @staticmethod
+    def snapshot():
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+    def judge(self, limits):
+        """Returns the list of failed checks (empty if the run passed)."""
+        judged = [s for s in self.samples if s[0] >= self.warmup]
+        if len(judged) < 2:
+            return [f"run too short to judge: needs at least 2 samples after the {self.warmup}-tick warmup"]
+        first, last = judged[0], judged[-1]
+        failures = []
+        heap_growth = (last[1] - first[1]) / 1024
+        if heap_growth > limits.max_heap_growth:
+            failures.append(f"traced heap grew by {heap_growth:.0f} KiB (limit {limits.max_heap_growth} KiB)")
+        rss_growth = (last[2] - first[2]) / 2**20
+        if rss_growth > limits.max_rss_growth:
+            failures.append(f"RSS grew by {rss_growth:.1f} MiB (limit {limits.max_rss_growth} MiB)")
+
+        # p99 of each window after the baseline sample; compare the first and last quarter of them
+        p99s = [percentile(s[5], 99) for s in judged[1:]]
+        quarter = max(1, len(p99s) // 4)
+        early = float(np.median(p99s[:quarter]))
+        late = float(np.median(p99s[-quarter:]))
+        if early and late / early - 1 > limits.max_p99_drift:
+            failures.append(f"p99 frame time drifted from {early:.3f} ms to {late:.3f} ms "
+                            f"(limit +{limits.max_p99_drift:.0%})")
+
+        printed = last[3] - first[3]
+        if printed > limits.max_output:
+            sample_lines = "; ".join(self.output.lines)
+            failures.append(f"the game printed {printed} bytes (limit {limits.max_output}), e.g. {sample_lines}")
+        return failures
+
+    def top_growth(self, count=10):
+        """The lines that allocated the most memory since the end of warmup."""
+        if self.baseline is None:
+            return []
+        return self.latest.compare_to(self.baseline, "lineno")[:count]
+
+
+def count_calls(owner, name, soak):
+    """Wraps owner.name so each call counts as a restart. Returns a function restoring the original."""
+    original = getattr(owner, name)
+
+    def counted(*args, **kwargs):
+        soak.restarts += 1
+        return original(*args, **kwargs)
+    setattr(owner, name, counted)
+    return lambda: setattr(owner, name, original)
+
+
+def ghost_tiles(game, limit=64):
+    """Tiles of the game's ghosts (the first `limit` of a mass-ghost engine)."""
+    tiles = [ghost.get_grid_pos() for ghost in game.ghosts]
+    engine = getattr(game, "ghost_batch", None) or getattr(game, "ghost_swarm", None)
+    if engine is not None:
+        xs, ys = engine.grid_positions() if hasattr(engine, "grid_positions") else engine.positions()
+        tiles += zip(xs[:limit].tolist(), ys[:limit].tolist())
+    return tiles
+
+
+def run_game(args, soak):
+    """Runs the chosen game's real loop with `soak` as its input, for args.ticks ticks."""
+    if args.game == "snake":
+        import snake_game
+        restore = count_calls(snake_game.Snake, "reset", soak)
+        try:
+            snake_game.main(dirty_rects=args.dirty_rects, unthrottled=True, headless=False, seed=args.seed,
+                            inputs=soak, max_ticks=args.ticks, keep_high_score=False)
+        finally:
+            restore()
+        return
+    if args.game == "pacman":
+        import pacman_game as game_module
+        reset_name = "reset_game_state"
+    else:
+        import pacman2_game as game_module
+        reset_name = "reset_game"
+    restore = count_calls(game_module.Game, reset_name, soak)
+    try:
+        game = game_module.Game(dirty_rects=args.dirty_rects, mass_ghosts=args.mass_ghosts, seed=args.seed, inputs=soak)
+        soak.hunt = lambda: (game.pacman.get_grid_pos(), ghost_tiles(game))
+        game.run(unthrottled=True, headless=False, max_ticks=args.ticks)
+    finally:
+        restore()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak-test a game for memory growth and frame-time drift.")
+    parser.add_argument("game", choices=["snake", "pacman", "pacman2"])
+    parser.add_argument("--ticks", type=int, default=DEFAULT_TICKS)
+    parser.add_argument("--interval", type=int, default=SAMPLE_INTERVAL, help="ticks between samples")
+    parser.add_argument("--warmup", type=int, default=WARMUP_TICKS, help="ticks before growth is measured")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the game and of the bot")
+    parser.add_argument("--dirty-rects", action="store_true")
+    parser.add_argument("--mass-ghosts", action="store_true")
+    parser.add_argument("--max-heap-growth", type=float, default=MAX_HEAP_GROWTH_KB, help="KiB")
+    parser.add_argument("--max-rss-growth", type=float, default=MAX_RSS_GROWTH_MB, help="MiB")
+    parser.add_argument("--max-p99-drift", type=float, default=MAX_P99_DRIFT, help="fraction, 0.5 = +50%%")
+    parser.add_argument("--max-output", type=int, default=MAX_OUTPUT_BYTES, help="bytes printed after warmup")
+    args = parser.parse_args()
+
+    stdout = sys.stdout
+    report = lambda text: print(text, file=stdout, flush=True)
+    soak = Soak(args.ticks, args.interval, args.warmup, args.seed, report)
+    report(f"Soaking {args.game} for {args.ticks} ticks (sample every {args.interval}, warmup {args.warmup})")
+
+    tracemalloc.start()
+    sys.stdout = soak.output
+    try:
+        run_game(args, soak)
+    finally:
+        sys.stdout = stdout
+    failures = soak.judge(args)
+    if failures:
+        report("Top allocations since warmup:")
+        for stat in soak.top_growth():
+            report(f"  {stat}")
+    tracemalloc.stop()
+
+    for failure in failures:
+        report(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    report(f"OK: {soak.restarts} restarts, no growth or drift past the limits")
+
+
+if __name__ == "__main__":
+    main()
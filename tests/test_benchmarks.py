@@ -0,0 +1,13 @@
+"""Benchmark setups leave the games' module state as they found it."""
+import pacman_game
+from benchmarks import pacman as pacman_benchmarks
+
+
+def test_large_maze_benchmark_leaves_level_maps_alone():
+    level_maps = list(pacman_game.LEVEL_MAPS)
+    op = pacman_benchmarks.update_large_maze()
+    op()
+    assert pacman_game.LEVEL_MAPS == level_maps
+    game = pacman_benchmarks.make_game(level_map=pacman_benchmarks.large_level_map())
+    assert game.current_level_map == pacman_benchmarks.large_level_map()
+    assert len(game.ghosts) == 5 # Played as level 4, as before
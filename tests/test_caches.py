@@ -0,0 +1,74 @@
+"""Damaged on-disk caches are rebuilt instead of crashing every later startup."""
+import os
+
+import numpy as np
+import pytest
+
+from pacman2_game import MAZE_GRID, DistanceTable
+
+
+def truncate(path, size):
+    with open(path, "r+b") as f:
+        f.truncate(size)
+
+
+@pytest.mark.parametrize("keep", [0, 0.5])
+def test_truncated_distance_cache_is_rebuilt(tmp_path, keep):
+    table = DistanceTable(MAZE_GRID, cache_dir=str(tmp_path))
+    path = tmp_path / f"distances_{table.key}.npy"
+    truncate(path, int(os.path.getsize(path) * keep))
+
+    rebuilt = DistanceTable(MAZE_GRID, cache_dir=str(tmp_path))
+    assert np.array_equal(rebuilt.distances, table.distances)
+    assert np.array_equal(np.load(path), table.distances) # The damaged file was replaced
+    assert os.listdir(tmp_path) == [path.name] # No temp files left behind
+
+
+@pytest.mark.parametrize("keep", [0, 0.5])
+def test_truncated_level_cache_is_recompiled(tmp_path, keep, monkeypatch):
+    import level_compiler
+    from pacman_game import LEVEL_MAPS
+
+    monkeypatch.setattr(level_compiler, "_loaded_levels", {})
+    level = level_compiler.load_level_map(LEVEL_MAPS[0], cache_dir=str(tmp_path))
+    path = tmp_path / f"level_{level_compiler.level_key(LEVEL_MAPS[0])}.npz"
+    truncate(path, int(os.path.getsize(path) * keep))
+
+    monkeypatch.setattr(level_compiler, "_loaded_levels", {})
+    recompiled = level_compiler.load_level_map(LEVEL_MAPS[0], cache_dir=str(tmp_path))
+    assert np.array_equal(recompiled.tiles, level.tiles)
+    assert np.array_equal(level_compiler.CompiledLevel.load(path).tiles, level.tiles) # The damaged file was replaced
+    assert os.listdir(tmp_path) == [path.name]
+
+
+def unwritable_dirs(tmp_path):
+    """Cache dirs that can't be written: read-only (unless running as root) and one under a regular file."""
+    read_only = tmp_path / "read_only"
+    read_only.mkdir()
+    read_only.chmod(0o555)
+    blocker = tmp_path / "file"
+    blocker.write_bytes(b"")
+    dirs = [blocker / "cache"]
+    if os.geteuid() != 0: # Root can write to read-only dirs
+        dirs.append(read_only)
+    return dirs
+
+
+def test_unwritable_distance_cache_is_skipped(tmp_path):
+    expected = DistanceTable(MAZE_GRID, cache_dir=None).distances
+    for cache_dir in unwritable_dirs(tmp_path):
+        assert np.array_equal(DistanceTable(MAZE_GRID, cache_dir=str(cache_dir)).distances, expected)
+        assert not os.path.isdir(cache_dir) or os.listdir(cache_dir) == []
+
+
+def test_unwritable_level_cache_is_skipped(tmp_path, monkeypatch):
+    import level_compiler
+    from pacman_game import LEVEL_MAPS
+
+    expected = level_compiler.CompiledLevel.compile(LEVEL_MAPS[0])
+    for cache_dir in unwritable_dirs(tmp_path):
+        monkeypatch.setattr(level_compiler, "_loaded_levels", {})
+        level = level_compiler.load_level_map(LEVEL_MAPS[0], cache_dir=str(cache_dir))
+        assert np.array_equal(level.tiles, expected.tiles)
+        assert level_compiler.load_level_map(LEVEL_MAPS[0], cache_dir=str(cache_dir)) is level # Kept in memory
+        assert not os.path.isdir(cache_dir) or os.listdir(cache_dir) == []
@@ -0,0 +1,73 @@
+"""DirtyRects repaints and pushes only what was drawn or changed, and everything after invalidate()."""
+import pygame
+import pytest
+
+from dirty_rects import DirtyRects
+
+BACKGROUND = (0, 0, 80)
+SPRITE = (255, 255, 0)
+
+
+@pytest.fixture
+def screen():
+    pygame.init()
+    yield pygame.display.set_mode((100, 100))
+    pygame.quit()
+
+
+@pytest.fixture
+def pushes(monkeypatch):
+    """Records display pushes: "flip", or the list of rects given to display.update."""
+    calls = []
+    monkeypatch.setattr(pygame.display, "flip", lambda: calls.append("flip"))
+    monkeypatch.setattr(pygame.display, "update", lambda rects: calls.append([pygame.Rect(r) for r in rects]))
+    return calls
+
+
+def frame(dirty, screen, background, rects):
+    """One frame: restore, draw a sprite-colored square per rect, present."""
+    dirty.restore(background)
+    drawn = [screen.fill(SPRITE, rect) for rect in rects]
+    dirty.present(drawn)
+    return drawn
+
+
+def test_only_drawn_and_changed_areas_are_repainted_and_pushed(screen, pushes):
+    background = pygame.Surface(screen.get_size())
+    background.fill(BACKGROUND)
+    screen.fill((255, 0, 0)) # Garbage the first frame must cover
+    dirty = DirtyRects(screen)
+
+    first = frame(dirty, screen, background, [(10, 10, 5, 5)])
+    assert pushes == ["flip"] # The first frame is a full repaint
+    assert screen.get_at((50, 50)) == BACKGROUND
+
+    background.fill((0, 80, 0), (60, 60, 10, 10)) # e.g. an eaten food dot
+    dirty.background_changed((60, 60, 10, 10))
+    second = frame(dirty, screen, background, [(30, 30, 5, 5)])
+    # Last frame's sprite, the changed background and this frame's sprite, in one update
+    assert pushes[1] == first + [pygame.Rect(60, 60, 10, 10)] + second
+    assert screen.get_at((12, 12)) == BACKGROUND # Old sprite erased
+    assert screen.get_at((65, 65)) == (0, 80, 0) # Background change shown
+    assert screen.get_at((32, 32)) == SPRITE
+
+    frame(dirty, screen, background, [])
+    assert pushes[2] == second # Background changes are pushed once
+    assert screen.get_at((32, 32)) == BACKGROUND
+
+
+def test_invalidate_repaints_everything_once(screen, pushes):
+    background = pygame.Surface(screen.get_size())
+    background.fill(BACKGROUND)
+    dirty = DirtyRects(screen)
+    frame(dirty, screen, background, [(10, 10, 5, 5)])
+
+    background.fill((0, 80, 0)) # e.g. a new level
+    dirty.background_changed((0, 0, 1, 1))
+    dirty.invalidate()
+    drawn = frame(dirty, screen, background, [(40, 40, 5, 5)])
+    assert pushes[1] == "flip"
+    assert screen.get_at((90, 90)) == (0, 80, 0)
+
+    frame(dirty, screen, background, [])
+    assert pushes[2] == drawn # Back to partial updates, with the pre-invalidate change dropped
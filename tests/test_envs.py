@@ -0,0 +1,52 @@
+"""Environment observations show every tile the agent needs to see."""
+import numpy as np
+import pytest
+
+import envs
+from envs import TILE_FOOD, TILE_GHOST, TILE_PLAYER, TILE_WALL, PacmanEnv
+from pacman_game import LEVEL_MAPS
+
+
+@pytest.fixture(scope="module")
+def env():
+    return PacmanEnv()
+
+
+@pytest.mark.parametrize("level_index", range(len(LEVEL_MAPS)))
+def test_pacman_observation_shows_every_food_tile(env, level_index):
+    game = env.game
+    game.current_level_index = level_index
+    game.load_level(level_index)
+    obs = env.observation()
+    covered = {game.pacman.get_grid_pos()} | {ghost.get_grid_pos() for ghost in game.ghosts}
+    for col, row in game.food_dots:
+        expected = (TILE_PLAYER, TILE_GHOST) if (col, row) in covered else (TILE_FOOD,)
+        assert obs[row, col] in expected, (level_index, col, row)
+    assert np.count_nonzero(obs == TILE_FOOD) == len(set(game.food_dots) - covered)
+
+
+@pytest.mark.parametrize("level_index", range(len(LEVEL_MAPS)))
+def test_pacman_observation_shows_every_wall(env, level_index):
+    game = env.game
+    game.load_level(level_index)
+    obs = env.observation()
+    walls = {(x, y) for y, row in enumerate(LEVEL_MAPS[level_index]) for x, char in enumerate(row) if char == "W"}
+    assert {(int(c), int(r)) for r, c in np.argwhere(obs == TILE_WALL)} == walls
+
+
+def test_pacman_observation_fits_the_widest_row():
+    assert envs.PacmanEnv.observation_shape[1] == max(len(row) for rows in LEVEL_MAPS for row in rows)
+
+
+def test_vector_env_needs_an_env():
+    with pytest.raises(ValueError, match="at least one env"):
+        envs.VectorEnv("snake", 0)
+
+
+def test_vector_env_with_more_workers_than_envs():
+    with envs.VectorEnv("snake", 3, num_workers=8, seed=0) as vec:
+        assert vec._slices == [(0, 1), (1, 2), (2, 3)] # One env per worker, no empty slices
+        obs = vec.reset()
+        assert obs.shape == (3,) + envs.SnakeEnv.observation_shape
+        _, rewards, dones, infos = vec.step([0, 1, 2])
+        assert len(infos) == 3 and rewards.shape == dones.shape == (3,)
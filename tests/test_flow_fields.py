@@ -0,0 +1,75 @@
+"""pacman2 flow fields hold the true maze distance after every move, and are shared per target."""
+import random
+from collections import deque
+
+import pytest
+
+from pacman2_game import BLOCKED, GHOST_MOVES, MAZE_GRID, UNREACHABLE, DistanceTable, FlowField, FlowFields
+
+# 0 is a path, 1 a wall; the right-hand pocket can't be reached from the left
+SPLIT_MAZE = [
+    [0, 0, 0, 1, 0],
+    [0, 1, 0, 1, 0],
+    [0, 0, 0, 1, 1],
+]
+
+
+def bfs(maze, target):
+    """{(x, y): steps to target} over the path tiles, by plain BFS."""
+    distances = {target: 0}
+    queue = deque([target])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in GHOST_MOVES:
+            nx, ny = x + dx, y + dy
+            if 0 <= ny < len(maze) and 0 <= nx < len(maze[ny]) and maze[ny][nx] == 0 and (nx, ny) not in distances:
+                distances[(nx, ny)] = distances[(x, y)] + 1
+                queue.append((nx, ny))
+    return distances
+
+
+def expected_moves(maze, distances, x, y):
+    moves = []
+    for dx, dy in GHOST_MOVES:
+        nx, ny = x + dx, y + dy
+        if not (0 <= ny < len(maze) and 0 <= nx < len(maze[ny])) or maze[ny][nx] != 0:
+            moves.append(BLOCKED)
+        else:
+            moves.append(distances.get((nx, ny), UNREACHABLE))
+    return moves
+
+
+def path_tiles(maze):
+    return [(x, y) for y, row in enumerate(maze) for x, cell in enumerate(row) if cell == 0]
+
+
+@pytest.mark.parametrize("maze, targets", [(SPLIT_MAZE, None), (MAZE_GRID, 40)])
+def test_flow_field_matches_bfs(maze, targets):
+    table = DistanceTable(maze, cache_dir=None)
+    tiles = path_tiles(maze)
+    for target in tiles if targets is None else random.Random(0).sample(tiles, targets):
+        field = FlowField(table, target)
+        distances = bfs(maze, target)
+        for x, y in tiles:
+            assert field.moves_from(x, y) == expected_moves(maze, distances, x, y), (target, x, y)
+
+
+def test_flow_field_from_and_to_walls():
+    table = DistanceTable(SPLIT_MAZE, cache_dir=None)
+    field = FlowField(table, (0, 0))
+    distances = bfs(SPLIT_MAZE, (0, 0))
+    assert field.moves_from(1, 1) == expected_moves(SPLIT_MAZE, distances, 1, 1) # From inside a wall
+    wall_target = FlowField(table, (1, 1))
+    assert wall_target.moves_from(0, 0) == [UNREACHABLE, BLOCKED, UNREACHABLE, BLOCKED] # Down, up, right, left
+
+
+def test_flow_fields_are_shared_and_evicted():
+    table = DistanceTable(SPLIT_MAZE, cache_dir=None)
+    fields = FlowFields(table, max_size=2)
+    first = fields.get((0, 0))
+    assert fields.get((0, 0)) is first
+    fields.get((2, 0))
+    fields.get((0, 0)) # Now (2, 0) is the oldest
+    fields.get((0, 2))
+    assert list(fields.fields) == [(0, 0), (0, 2)]
+    assert fields.get((0, 0)) is first
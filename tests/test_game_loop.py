@@ -0,0 +1,98 @@
+"""FixedTimestepLoop runs one tick per 1 / tick_rate of real time, at most MAX_TICKS_PER_FRAME per frame."""
+from types import SimpleNamespace
+
+import pytest
+
+import game_loop
+from game_loop import MAX_TICKS_PER_FRAME, FixedTimestepLoop
+
+
+class NoClock:
+    def tick(self, fps):
+        return 0
+
+
+@pytest.fixture
+def frame_times(monkeypatch):
+    """Makes each frame take the given durations (seconds) of fake time; returns the list to fill in."""
+    durations = []
+    clock = {"now": 0.0, "started": False}
+
+    def perf_counter():
+        if clock["started"] and durations: # The first call (before the loop) reads the start time
+            clock["now"] += durations.pop(0)
+        clock["started"] = True
+        return clock["now"]
+
+    monkeypatch.setattr(game_loop, "time", SimpleNamespace(perf_counter=perf_counter)) # Only the loop sees fake time
+    monkeypatch.setattr(game_loop.pygame.time, "Clock", NoClock)
+    return durations
+
+
+def run(loop, frames, **kwargs):
+    """Runs `frames` frames; returns (ticks run per frame, alpha drawn per frame)."""
+    ticks, alphas = [], []
+    counts = {"ticks": 0}
+
+    def update():
+        counts["ticks"] += 1
+
+    def draw(alpha):
+        ticks.append(counts["ticks"])
+        counts["ticks"] = 0
+        alphas.append(alpha)
+
+    loop.run(lambda: None, update, draw, running=lambda: len(alphas) < frames, **kwargs)
+    return ticks, alphas
+
+
+def test_ticks_follow_real_time(frame_times):
+    frame_times.extend([0.125] * 8) # Half a tick per frame at 4 ticks/s
+    loop = FixedTimestepLoop(4)
+    ticks, alphas = run(loop, 8)
+    assert ticks == [0, 1] * 4
+    assert alphas == [0.5, 0.0] * 4 # How far each frame is between two ticks
+    assert (loop.ticks, loop.frames) == (4, 8)
+
+
+def test_uneven_frames(frame_times):
+    frame_times.extend([0.625, 0.125, 0.125, 0.75])
+    ticks, alphas = run(FixedTimestepLoop(4), 4)
+    assert ticks == [2, 1, 0, 3] # Each frame runs the whole ticks that have accrued, carrying the rest over
+    assert alphas == [0.5, 0.0, 0.5, 0.5]
+
+
+def test_a_stall_runs_at_most_max_ticks_per_frame(frame_times):
+    frame_times.extend([10.125, 0.125, 0.125])
+    ticks, alphas = run(FixedTimestepLoop(4), 3)
+    assert ticks == [MAX_TICKS_PER_FRAME, 1, 0] # The other 35 ticks of the stall are dropped
+    assert alphas == [0.5, 0.0, 0.5] # The leftover fraction of a tick is kept
+
+
+def test_tick_rate_changes_between_frames(frame_times):
+    frame_times.extend([0.5, 0.5])
+    loop = FixedTimestepLoop(4)
+    ticks = []
+
+    def draw(alpha):
+        ticks.append(loop.ticks)
+        loop.tick_rate = 8 # e.g. the snake speeding up
+
+    loop.run(lambda: None, lambda: None, draw, running=lambda: len(ticks) < 2)
+    assert ticks == [2, 6] # 2 ticks at 4/s, then 4 at 8/s
+
+
+def test_max_ticks_stops_mid_frame(frame_times):
+    frame_times.extend([1.0])
+    loop = FixedTimestepLoop(4)
+    ticks, alphas = run(loop, 1, max_ticks=3)
+    assert loop.ticks == 3 and alphas == [] # Stopped before drawing the frame
+
+
+def test_unthrottled_runs_one_tick_per_frame():
+    loop = FixedTimestepLoop(4, unthrottled=True)
+    events = []
+    loop.run(lambda: events.append("input"), lambda: events.append("tick"), lambda alpha: events.append(alpha),
+             max_ticks=3)
+    assert events == ["input", "tick", 1.0] * 3 + ["input"] # Input for the last tick is still handled
+    assert (loop.ticks, loop.frames) == (3, 3)
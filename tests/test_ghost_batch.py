@@ -0,0 +1,89 @@
+"""GhostBatch moves exactly like the same number of Ghost objects, tick by tick.
+
+The two engines draw from different generators (game.rng vs a NumPy generator),
+so both are given scripted generators that make the same decisions: each tick
+picks a draw value (deciding chases and mid-tile turns) and whether random turns
+take the first or the last open direction, in Ghost.random_direction's order.
+"""
+import random
+
+import numpy as np
+import pygame
+import pytest
+
+from pacman_game import GHOST_COLORS, GHOST_DIRECTIONS, LEVEL_MAPS, TILE_SIZE, Game, Ghost, GhostBatch
+
+GHOSTS = 12
+TICKS = 600
+TELEPORT_TICKS = 60 # Pacman jumps to another food tile this often, so chases change targets
+DRAWS = [0.0, 0.5, 0.99] # Chase and turn / chase only / neither (random turns at junctions)
+
+
+class Script:
+    """The current tick's decisions, shared by both scripted generators."""
+    def __init__(self):
+        self.draw = 0.0
+        self.first = True
+
+
+class ScriptedRandom:
+    """Stands in for game.rng in Ghost: random() and choice() follow the script."""
+    def __init__(self, script):
+        self.script = script
+
+    def random(self):
+        return self.script.draw
+
+    def choice(self, options):
+        return options[0] if self.script.first else options[-1]
+
+
+class ScriptedGenerator:
+    """Stands in for GhostBatch.rng: 1-D draws follow the script, (n, 4) keys make argmax pick the first or last open direction."""
+    def __init__(self, script):
+        self.script = script
+
+    def random(self, shape):
+        if isinstance(shape, tuple):
+            keys = np.linspace(0.9, 0.1, shape[1]) if self.script.first else np.linspace(0.1, 0.9, shape[1])
+            return np.tile(keys, (shape[0], 1))
+        return np.full(shape, self.script.draw)
+
+
+@pytest.mark.parametrize("level_index", range(len(LEVEL_MAPS)))
+def test_batch_matches_ghost_update(level_index):
+    game = Game(seed=level_index)
+    try:
+        game.load_level(level_index)
+        script = Script()
+        game.rng = ScriptedRandom(script)
+        multiplier = 1.0 + level_index * 0.1
+        starts = [game.ghost_start_positions[i % len(game.ghost_start_positions)] for i in range(GHOSTS)]
+        colors = [i % len(GHOST_COLORS) for i in range(GHOSTS)]
+
+        ghosts = []
+        for (x, y), color in zip(starts, colors):
+            ghost = Ghost(game, x, y, GHOST_COLORS[color])
+            ghost.ghost_speed_multiplier = multiplier
+            ghosts.append(ghost)
+        batch = GhostBatch(game, GHOST_COLORS)
+        batch.rng = ScriptedGenerator(script)
+        batch.add(starts, colors, multiplier)
+
+        rng = random.Random(level_index)
+        food_tiles = sorted(game.food_dots)
+        for tick in range(TICKS):
+            assert batch.x.tolist() == [ghost.x for ghost in ghosts], (level_index, tick)
+            assert batch.y.tolist() == [ghost.y for ghost in ghosts], (level_index, tick)
+            assert [GHOST_DIRECTIONS[d] for d in batch.direction.tolist()] == [ghost.direction for ghost in ghosts], \
+                (level_index, tick)
+            if tick % TELEPORT_TICKS == 0:
+                col, row = rng.choice(food_tiles)
+                game.pacman.x, game.pacman.y = col * TILE_SIZE + TILE_SIZE // 2, row * TILE_SIZE + TILE_SIZE // 2
+            script.draw = rng.choice(DRAWS)
+            script.first = rng.random() < 0.5
+            for ghost in ghosts:
+                ghost.update()
+            batch.update()
+    finally:
+        pygame.quit()
@@ -0,0 +1,93 @@
+"""Recorded sessions replay to the recorded final state, and damaged logs are rejected."""
+import random
+
+import pygame
+import pytest
+
+from input_log import HEADER, INPUT, LOGGED_KEYS, InputLog, LiveInput
+from replay import replay
+
+TICKS = 1500
+PRESS_PROB = 0.05 # Chance per tick of a key press
+BOT_KEYS = [key for key in LOGGED_KEYS if key != pygame.K_q] # Never quit early
+
+
+class BotInput(LiveInput):
+    """LiveInput fed by a seeded bot: key presses are posted to the event queue, so they are recorded like real ones."""
+    def __init__(self, log, path, seed):
+        super().__init__(log, path)
+        self.rng = random.Random(seed)
+
+    def events(self, tick):
+        if self.rng.random() < PRESS_PROB:
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=self.rng.choice(BOT_KEYS)))
+        return super().events(tick)
+
+
+def record(game, path, seed=7, mass_ghosts=False):
+    """Plays a bot session of `game` for TICKS ticks, saving the recording to `path`."""
+    inputs = BotInput(InputLog(game, seed, mass_ghosts), str(path), seed)
+    if game == "snake":
+        import snake_game
+        snake_game.main(unthrottled=True, seed=seed, inputs=inputs, max_ticks=TICKS, keep_high_score=False)
+    else:
+        import pacman2_game
+        import pacman_game
+        game_module = pacman_game if game == "pacman" else pacman2_game
+        game_module.Game(mass_ghosts=mass_ghosts, seed=seed, inputs=inputs).run(unthrottled=True, max_ticks=TICKS)
+    return InputLog.load(str(path))
+
+
+@pytest.mark.parametrize("game, mass_ghosts", [("snake", False), ("pacman", False), ("pacman2", False),
+                                               ("pacman", True)])
+def test_recorded_session_replays_to_the_same_state(tmp_path, game, mass_ghosts):
+    log = record(game, tmp_path / "session.glog", mass_ghosts=mass_ghosts)
+    assert (log.game, log.seed, log.mass_ghosts, log.ticks) == (game, 7, mass_ghosts, TICKS)
+    assert len(log.inputs) > 20
+    assert replay(log) == log.state_hash
+
+    log.inputs = log.inputs[:len(log.inputs) // 2] # A different session ends in a different state
+    assert replay(log) != log.state_hash
+
+
+@pytest.fixture(scope="module")
+def log_bytes(tmp_path_factory):
+    path = tmp_path_factory.mktemp("logs") / "session.glog"
+    record("snake", path)
+    return path.read_bytes()
+
+
+def damaged(log_bytes):
+    header = HEADER.unpack_from(log_bytes)
+    count = header[-1]
+    last_input = HEADER.size + (count - 1) * INPUT.size
+    return {
+        "empty": b"",
+        "short header": log_bytes[:HEADER.size - 1],
+        "truncated inputs": log_bytes[:-2],
+        "trailing bytes": log_bytes + b"\0",
+        "bad magic": b"XLOG" + log_bytes[4:],
+        "bad version": log_bytes[:4] + bytes([99]) + log_bytes[5:],
+        "unknown game": log_bytes[:5] + bytes([9]) + log_bytes[6:],
+        "unknown key": log_bytes[:last_input] + INPUT.pack(0, len(LOGGED_KEYS)),
+        "press after the end": log_bytes[:last_input] + INPUT.pack(TICKS + 1, 0),
+        "count too high": HEADER.pack(*header[:-1], count + 1) + log_bytes[HEADER.size:],
+    }
+
+
+@pytest.mark.parametrize("case", ["empty", "short header", "truncated inputs", "trailing bytes", "bad magic",
+                                  "bad version", "unknown game", "unknown key", "press after the end",
+                                  "count too high"])
+def test_damaged_logs_are_rejected(tmp_path, log_bytes, case):
+    path = tmp_path / "damaged.glog"
+    path.write_bytes(damaged(log_bytes)[case])
+    with pytest.raises(ValueError):
+        InputLog.load(str(path))
+
+
+def test_saved_log_round_trips(tmp_path, log_bytes):
+    path = tmp_path / "session.glog"
+    path.write_bytes(log_bytes)
+    log = InputLog.load(str(path))
+    log.save(str(tmp_path / "copy.glog"))
+    assert (tmp_path / "copy.glog").read_bytes() == log_bytes
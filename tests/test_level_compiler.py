@@ -0,0 +1,57 @@
+"""Level validation: shipped levels are clean, real defects are warned about once per compiled map."""
+import warnings
+
+import pytest
+
+import level_compiler
+from level_compiler import CompiledLevel, load_level_map
+from pacman_game import LEVEL_MAPS
+
+# Short rows are fine; the walled-in dot at (5, 2) can never be eaten
+BROKEN_MAP = [
+    "WWWWWWW",
+    "WPF WWW",
+    "W G WFW",
+    "WWWWWWW",
+]
+
+# The dot at (4, 2) is only next to void tiles (past the end of row 1) and a dead end, so it can't be reached
+VOID_MAP = [
+    "WWWWW",
+    "WP ",
+    "WWW F",
+    "WWWWW",
+]
+
+
+@pytest.mark.parametrize("index", range(len(LEVEL_MAPS)))
+def test_shipped_levels_have_no_problems(index):
+    assert CompiledLevel.compile(LEVEL_MAPS[index]).problems() == []
+
+
+def test_level_compiler_check_passes(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        level_compiler.main()
+    assert exit_info.value.code == 0
+
+
+def test_problems_are_warned_once_per_compiled_map(tmp_path, monkeypatch):
+    monkeypatch.setattr(level_compiler, "_loaded_levels", {})
+    with pytest.warns(UserWarning, match=r"Level 9: 1 of 2 food dots are unreachable: \[\(5, 2\)\]"):
+        load_level_map(BROKEN_MAP, cache_dir=str(tmp_path), name="Level 9")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        load_level_map(BROKEN_MAP, cache_dir=str(tmp_path), name="Level 9") # Already loaded
+        monkeypatch.setattr(level_compiler, "_loaded_levels", {})
+        load_level_map(BROKEN_MAP, cache_dir=str(tmp_path), name="Level 9") # From the disk cache
+
+
+def test_void_tiles_are_blocked():
+    level = CompiledLevel.compile(VOID_MAP)
+    assert level.unreachable_food() == [(4, 2)]
+    assert [list(row) for row in level.wall_rows()] == [
+        [1, 1, 1, 1, 1],
+        [1, 0, 0, 1, 1],
+        [1, 1, 1, 0, 0],
+        [1, 1, 1, 1, 1],
+    ]
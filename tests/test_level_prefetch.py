@@ -0,0 +1,54 @@
+"""LevelPrefetcher.take() hands over a finished prefetch and otherwise prepares the level itself."""
+import threading
+
+from level_prefetch import LevelPrefetcher
+
+WAIT = 5 # Seconds before a test gives up on a worker
+
+
+def finished(prefetcher, key, prepare):
+    prefetcher.start(key, prepare)
+    prefetcher._thread.join(WAIT)
+    assert prefetcher.ready(key)
+
+
+def test_take_matching_key_uses_the_prefetch():
+    prefetcher = LevelPrefetcher()
+    finished(prefetcher, 2, lambda: "prefetched 2")
+    assert prefetcher.take(2, lambda: "prepared 2") == "prefetched 2"
+    assert not prefetcher.ready(2) # Handed over once
+
+
+def test_take_mismatched_key_prepares_synchronously():
+    prefetcher = LevelPrefetcher()
+    finished(prefetcher, 2, lambda: "prefetched 2")
+    assert prefetcher.take(3, lambda: "prepared 3") == "prepared 3"
+    assert prefetcher.take(2, lambda: "prepared 2") == "prepared 2" # The dropped prefetch is not reused
+
+
+def test_take_failed_prefetch_prepares_synchronously():
+    def fail():
+        raise RuntimeError("disk error")
+
+    prefetcher = LevelPrefetcher()
+    finished(prefetcher, 2, fail)
+    assert prefetcher.take(2, lambda: "prepared 2") == "prepared 2"
+
+
+def test_take_does_not_wait_for_a_running_worker():
+    release = threading.Event()
+    done = threading.Event()
+
+    def slow():
+        release.wait(WAIT)
+        done.set()
+        return "prefetched 2"
+
+    prefetcher = LevelPrefetcher()
+    prefetcher.start(2, slow)
+    worker = prefetcher._thread
+    assert prefetcher.take(2, lambda: "prepared 2") == "prepared 2"
+    assert not done.is_set() and worker.is_alive() # Returned without joining the worker
+    release.set()
+    worker.join(WAIT)
+    assert prefetcher.take(2, lambda: "prepared again") == "prepared again" # Its late result was dropped
@@ -0,0 +1,83 @@
+"""NavGraph exit masks, node/edge extraction and corridor moves, on a hand-made ragged maze and the shipped levels."""
+import pygame
+import pytest
+
+from nav_graph import MOVES, NavGraph
+from pacman_game import LEVEL_MAPS, TILE_SIZE, Game
+
+# '.' is open. Row 3 stops after (3, 3) and row 4 after (2, 4), so the tiles past them are blocked
+MAZE = [
+    "#####",
+    "#...#",
+    "#.#.#",
+    "#...",
+    "##.",
+]
+DOWN, UP, RIGHT, LEFT = MOVES
+JUNCTION = (2, 3)
+DEAD_END = (2, 4)
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return NavGraph([[char == "." for char in row] for row in MAZE])
+
+
+def test_exit_masks(graph):
+    assert [list(row) for row in graph.exit_masks] == [
+        [0, 0, 0, 0, 0],
+        [0, 0b0101, 0b1100, 0b1001, 0],
+        [0, 0b0011, 0, 0b0011, 0],
+        [0, 0b0110, 0b1101, 0b1010],
+        [0, 0, 0b0010],
+    ]
+
+
+def test_row_ends_and_outside_are_blocked(graph):
+    assert not graph.exit_mask(3, 3) & (1 << MOVES.index(RIGHT)) # (4, 3) is past the row's end
+    assert not graph.exit_mask(3, 3) & (1 << MOVES.index(DOWN)) # (3, 4) is past the next row's end
+    for x, y in [(4, 3), (3, 4), (2, 5), (-1, 1), (5, 1)]:
+        assert graph.exit_mask(x, y) == 0
+
+
+def test_nodes_and_edges(graph):
+    assert graph.nodes == [JUNCTION, DEAD_END]
+    assert graph.edges == {
+        JUNCTION: [(MOVES.index(DOWN), DEAD_END, 1), # Straight into the dead end
+                   (MOVES.index(RIGHT), JUNCTION, 8), # Around the loop one way...
+                   (MOVES.index(LEFT), JUNCTION, 8)], # ...and the other
+        DEAD_END: [(MOVES.index(UP), JUNCTION, 1)],
+    }
+
+
+def test_corridor_move(graph):
+    assert graph.corridor_move(3, 3, RIGHT) == UP # Turns the corner at the end of the short row
+    assert graph.corridor_move(3, 3, DOWN) == LEFT
+    assert graph.corridor_move(1, 2, DOWN) == DOWN
+    assert graph.corridor_move(*JUNCTION, RIGHT) is None
+    assert graph.corridor_move(*JUNCTION, LEFT) is None
+    assert graph.corridor_move(*DEAD_END, DOWN) is None
+    assert graph.corridor_move(*DEAD_END, UP) is None
+    assert graph.corridor_move(2, 2, DOWN) is None # Wall
+    assert graph.corridor_move(4, 3, RIGHT) is None # Past the row's end
+    assert graph.corridor_move(1, 2, (0, 0)) is None # Not a move
+
+
+@pytest.mark.parametrize("level_index", range(len(LEVEL_MAPS)))
+def test_exit_masks_agree_with_area_has_wall(level_index):
+    """A tile's exits are exactly the neighbouring tiles area_has_wall lets an entity into (void and off-map included)."""
+    game = Game(seed=0)
+    try:
+        game.load_level(level_index)
+        rows, cols = len(game.wall_grid), len(game.wall_grid[0])
+        for y in range(rows):
+            for x in range(cols):
+                tile_open = not game.area_has_wall(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+                expected = 0
+                for k, (dx, dy) in enumerate(MOVES):
+                    nx, ny = x + dx, y + dy
+                    if tile_open and not game.area_has_wall(nx * TILE_SIZE, ny * TILE_SIZE, TILE_SIZE, TILE_SIZE):
+                        expected |= 1 << k
+                assert game.nav_graph.exit_mask(x, y) == expected, (level_index, x, y)
+    finally:
+        pygame.quit()
@@ -0,0 +1,49 @@
+"""pacman2's food bitmap and food_remaining count stay in step until the level is cleared."""
+import pygame
+import pytest
+
+from pacman2_game import GAME_STATE_LEVEL_COMPLETE, GAME_STATE_PLAYING, MAZE_GRID, Game
+
+
+@pytest.fixture
+def game():
+    game = Game(seed=0)
+    game.game_state = GAME_STATE_PLAYING
+    yield game
+    pygame.quit()
+
+
+def visit(game, x, y):
+    """Puts Pacman (stopped) on tile (x, y), with no ghosts around, and runs one tick."""
+    game.ghosts = []
+    game.time_to_next_ghost_spawn = 10 ** 9
+    game.pacman.reset_position(x, y)
+    game.update()
+
+
+def test_food_remaining_tracks_the_bitmap(game):
+    initial = game.food_remaining
+    assert initial == int(game.food_grid.sum()) > 0
+    tiles = [(x, y) for y, row in enumerate(MAZE_GRID) for x, cell in enumerate(row) if cell == 0]
+    eaten = 0
+    for x, y in tiles + tiles[:10]: # Revisiting tiles eats nothing
+        had_food = bool(game.food_grid[y, x])
+        visit(game, x, y)
+        eaten += had_food
+        assert not game.food_grid[y, x]
+        assert game.food_remaining == int(game.food_grid.sum()) == initial - eaten, (x, y)
+        assert game.score == 10 * eaten
+        if game.food_remaining:
+            assert game.game_state == GAME_STATE_PLAYING
+    assert eaten == initial
+    assert game.game_state == GAME_STATE_LEVEL_COMPLETE and game.level == 2
+
+
+def test_new_level_refills_the_food(game):
+    initial = game.food_remaining
+    x, y = next((x, y) for y, row in enumerate(MAZE_GRID) for x, cell in enumerate(row) if game.food_grid[y, x])
+    visit(game, x, y)
+    assert game.food_remaining == initial - 1
+    game.level += 1
+    game.setup_level()
+    assert game.food_remaining == int(game.food_grid.sum()) == initial
@@ -0,0 +1,48 @@
+"""pacman2_game's mass-ghost mode starts every level with MASS_GHOST_COUNT ghosts."""
+import pygame
+import pytest
+
+import pacman2_game
+from pacman2_game import GAME_STATE_PLAYING, GHOST_START_GRID_POS, MASS_GHOST_COUNT, MASS_GHOST_LIMIT, Game
+
+
+@pytest.fixture
+def game():
+    game = Game(mass_ghosts=True, seed=0)
+    yield game
+    pygame.quit()
+
+
+def test_levels_start_with_mass_ghost_count(game):
+    assert game.ghost_count() == MASS_GHOST_COUNT
+    assert not game.ghosts
+    colors = game.ghost_swarm.color_index[:MASS_GHOST_COUNT]
+    assert set(colors.tolist()) == set(range(len(game.ghost_colors))) # Every color in use
+
+    game.level += 1
+    game.setup_level()
+    assert game.ghost_count() == MASS_GHOST_COUNT
+
+
+def test_swarm_leaves_the_start_tile(game):
+    game.game_state = GAME_STATE_PLAYING
+    for _ in range(50):
+        game.update()
+    swarm = game.ghost_swarm
+    n = len(swarm)
+    assert n == MASS_GHOST_COUNT
+    assert not ((swarm.x[:n] == GHOST_START_GRID_POS[0]) & (swarm.y[:n] == GHOST_START_GRID_POS[1])).any()
+    assert swarm.walkable[swarm.y[:n], swarm.x[:n]].all()
+
+
+def test_mass_ghost_limit_caps_the_start_count(monkeypatch):
+    monkeypatch.setattr(pacman2_game, "MASS_GHOST_COUNT", MASS_GHOST_LIMIT + 5)
+    game = Game(mass_ghosts=True, seed=0)
+    assert game.ghost_count() == MASS_GHOST_LIMIT
+    pygame.quit()
+
+
+def test_normal_mode_is_unchanged():
+    game = Game(seed=0)
+    assert game.ghost_swarm is None and len(game.ghosts) == 2 # level + 1
+    pygame.quit()
@@ -0,0 +1,173 @@
+"""pacman_game's Game: console output, food, the death pause and the path cache."""
+import logging
+import random
+from collections import deque
+
+import pygame
+import pytest
+
+from nav_graph import NavGraph
+from pacman_game import (DEATH_PAUSE_TICKS, DOWN, FOOD_SCORE, LEFT, PATH_CACHE_SIZE, RIGHT, STOP, TILE_SIZE, UP, Game,
+                         PathCache)
+
+
+@pytest.fixture
+def game():
+    game = Game(seed=0)
+    yield game
+    pygame.quit()
+
+
+def test_messages_are_logged_not_printed(capsys, caplog):
+    with caplog.at_level(logging.INFO, logger="pacman_game"):
+        game = Game(seed=0)
+        ghost = game.ghosts[0]
+        ghost.x, ghost.y = game.pacman.x, game.pacman.y # Pacman runs into a ghost
+        game.update()
+        game.death_pause_ticks = 0
+        game.food_eaten_this_level = game.total_food_this_level
+        game.update()
+        pygame.quit()
+    assert capsys.readouterr().out == ""
+    assert [record.getMessage() for record in caplog.records] == [
+        f"Level 1 loaded with {game.total_food_this_level} food dots and 2 ghosts.",
+        f"Pacman hit a ghost! Lives remaining: {game.pacman.lives}",
+        "Level 1 complete!",
+    ]
+
+
+def eat_at(game, x, y):
+    """Puts Pacman (stopped) at pixel center (x, y) and runs one tick. Returns the dots the old scan would eat there."""
+    game.pacman.x, game.pacman.y = x, y
+    game.pacman.direction = game.pacman.next_direction = STOP
+    game.pacman.rect.center = (int(x), int(y))
+    expected = {tile for tile, food_rect in game.food_dots.items() if game.pacman.rect.colliderect(food_rect)}
+    game.update()
+    return expected
+
+
+def test_food_lookup_matches_rect_scan(game):
+    """Walks Pacman over every dot, centered and straddling tile boundaries, with no ghosts around."""
+    game.ghosts = []
+    total = game.total_food_this_level
+    tiles = sorted(game.food_dots)
+    # Straddling positions first: around half a tile off, where Pacman's rect spans two tiles and touches
+    # the dot of one of them with its edge (or neither), then diagonally at a corner, then the dot centers
+    half = TILE_SIZE // 2
+    offsets = [(d, 0) for d in (-half - 1, -half, -half + 1, half - 1, half, half + 1)]
+    offsets += [(0, d) for d in (-half - 1, half, half + 1)] + [(half, half), (-half - 1, half - 1), (0, 0)]
+    eaten = 0
+    for dx, dy in offsets:
+        for col, row in tiles:
+            before = set(game.food_dots)
+            score = game.pacman.score
+            expected = eat_at(game, col * TILE_SIZE + TILE_SIZE // 2 + dx, row * TILE_SIZE + TILE_SIZE // 2 + dy)
+            assert before - set(game.food_dots) == expected, (col, row, dx, dy)
+            eaten += len(expected)
+            assert game.pacman.score - score == FOOD_SCORE * len(expected)
+            assert game.food_eaten_this_level == eaten
+            for food_col, food_row in expected: # Erased from the maze layer (sized to the screen, from LEVEL_MAPS[0][0])
+                center = (food_col * TILE_SIZE + TILE_SIZE // 2, food_row * TILE_SIZE + TILE_SIZE // 2)
+                if game.maze_layer.get_rect().collidepoint(center):
+                    assert game.maze_layer.get_at(center) == game.wall_layer.get_at(center)
+            assert game.level_complete_screen == (eaten == total)
+    assert eaten == total and not game.food_dots
+    assert game.level_complete_screen
+
+
+def positions(game):
+    return [(entity.x, entity.y, entity.direction) for entity in [game.pacman] + game.ghosts]
+
+
+def open_direction(entity):
+    return next(d for d in (UP, DOWN, LEFT, RIGHT) if entity.can_move_in_direction(d))
+
+
+def test_death_pause_freezes_for_death_pause_ticks(game):
+    start = game.pacman_start_pos
+    ghost = game.ghosts[0]
+    for _ in range(5): # Move away from the start positions first
+        game.update()
+    ghost.x, ghost.y = game.pacman.x, game.pacman.y
+    lives = game.pacman.lives
+    game.update()
+    assert game.pacman.lives == lives - 1
+    assert game.pacman.get_grid_pos() == start # Everyone is back at the start
+    assert [g.get_grid_pos() for g in game.ghosts] == [g.initial_grid_pos for g in game.ghosts]
+    assert game.death_pause_ticks == DEATH_PAUSE_TICKS
+
+    game.pacman.change_direction(open_direction(game.pacman)) # Pressing a key doesn't end the pause early
+    frozen = positions(game)
+    for tick in range(DEATH_PAUSE_TICKS):
+        game.update()
+        assert positions(game) == frozen, tick
+    assert game.death_pause_ticks == 0
+    game.update()
+    assert (game.pacman.x, game.pacman.y) != frozen[0][:2] # Pacman takes the buffered turn on the next tick
+
+
+def test_losing_the_last_life_ends_the_game_without_a_pause(game):
+    game.pacman.lives = 1
+    game.ghosts[0].x, game.ghosts[0].y = game.pacman.x, game.pacman.y
+    game.update()
+    assert game.game_over and game.death_pause_ticks == 0
+
+
+def bfs_distances(passable, start):
+    """Plain grid BFS (no NavGraph) from start: {tile: steps}."""
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= ny < len(passable) and 0 <= nx < len(passable[ny]) and passable[ny][nx] \
+                    and (nx, ny) not in distances:
+                distances[(nx, ny)] = distances[(x, y)] + 1
+                queue.append((nx, ny))
+    return distances
+
+
+def test_paths_are_shortest(game):
+    passable = [[not blocked for blocked in row] for row in game.wall_grid]
+    tiles = [(x, y) for y, row in enumerate(passable) for x, is_open in enumerate(row) if is_open]
+    rng = random.Random(0)
+    for start in rng.sample(tiles, 20):
+        distances = bfs_distances(passable, start)
+        for goal in rng.sample(tiles, 20):
+            path = game.paths.get(game.nav_graph, start, goal, 0)
+            assert path == PathCache.find_path(game.nav_graph, start, goal) # Cached or not, the same path
+            if goal not in distances:
+                assert path is None
+                continue
+            assert path[0] == start and path[-1] == goal and len(path) - 1 == distances[goal]
+            for (x, y), (nx, ny) in zip(path, path[1:]):
+                assert abs(nx - x) + abs(ny - y) == 1 and passable[ny][nx]
+
+
+def test_path_cache_hits_and_lru_eviction(game):
+    cache = PathCache()
+    tiles = [(x, y) for y, row in enumerate(game.wall_grid) for x, blocked in enumerate(row) if not blocked]
+    pairs = [(start, goal) for goal in tiles[:4] for start in tiles][:PATH_CACHE_SIZE + 1]
+    assert len(pairs) == PATH_CACHE_SIZE + 1 # The level has enough open tiles for the test
+    first = cache.get(game.nav_graph, *pairs[0], 0)
+    assert cache.get(game.nav_graph, *pairs[0], 0) is first and (cache.hits, cache.misses) == (1, 1)
+    for start, goal in pairs[1:PATH_CACHE_SIZE]:
+        cache.get(game.nav_graph, start, goal, 0)
+    assert len(cache.paths) == PATH_CACHE_SIZE
+    cache.get(game.nav_graph, *pairs[0], 0) # Recently used again, so pairs[1] is now the oldest
+    cache.get(game.nav_graph, *pairs[-1], 0)
+    assert len(cache.paths) == PATH_CACHE_SIZE
+    assert (*pairs[0], 0) in cache.paths and (*pairs[1], 0) not in cache.paths
+    assert (cache.hits, cache.misses) == (2, PATH_CACHE_SIZE + 1)
+    assert cache.get(game.nav_graph, *pairs[0], 1) == first and cache.misses == PATH_CACHE_SIZE + 2 # Per level
+
+
+def test_find_path_to_walls_and_unreachable_tiles():
+    # Two open regions split by a wall column, plus a wall tile in each
+    graph = NavGraph([[char == "." for char in row] for row in ["..#..", ".##..", "..#.#"]])
+    assert PathCache.find_path(graph, (0, 0), (1, 2)) == ((0, 0), (0, 1), (0, 2), (1, 2))
+    assert PathCache.find_path(graph, (0, 0), (3, 0)) is None # Other region
+    assert PathCache.find_path(graph, (0, 0), (2, 0)) is None # Goal is a wall
+    assert PathCache.find_path(graph, (1, 1), (0, 0)) is None # Start is a wall
+    assert PathCache.find_path(graph, (0, 0), (9, 9)) is None # Goal off the maze
+    assert PathCache.find_path(graph, (1, 1), (1, 1)) == ((1, 1),) # Already there: no step to take
@@ -0,0 +1,104 @@
+"""Game.area_has_wall (tile lookups in wall_grid) agrees with a colliderect scan over every blocked tile rect.
+
+Blocked means a wall, a void tile past the end of a short row, or anything off the map.
+"""
+import random
+
+import pygame
+import pytest
+
+from pacman_game import DOWN, LEFT, LEVEL_MAPS, RIGHT, STOP, TILE_SIZE, UP, Game
+
+SAMPLES = 10_000 # Random checks per level
+DIRECTIONS = [UP, DOWN, LEFT, RIGHT, STOP]
+
+
+@pytest.fixture(scope="module")
+def game():
+    game = Game(seed=0)
+    yield game
+    pygame.quit()
+
+
+def map_size(level_map):
+    """Pixel size of the map, up to its widest row."""
+    return max(len(row) for row in level_map) * TILE_SIZE, len(level_map) * TILE_SIZE
+
+
+def void_rects(level_map):
+    """Rects of the tiles past the end of each short row."""
+    width = max(len(row) for row in level_map)
+    return [pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+            for y, row in enumerate(level_map) for x in range(len(row), width)]
+
+
+def rect_is_blocked(game, level_map, rect):
+    """The reference check: rect leaves the map, or collides with a wall or void tile rect."""
+    if rect.width <= 0 or rect.height <= 0:
+        return False
+    if not pygame.Rect((0, 0), map_size(level_map)).contains(rect):
+        return True
+    return any(rect.colliderect(blocked) for blocked in game.walls + void_rects(level_map))
+
+
+def reference_can_move_in_direction(entity, level_map, direction):
+    """Entity.can_move_in_direction as a scan: the predicted rect against every blocked tile rect."""
+    if direction == STOP:
+        return True
+    predicted_x = entity.x + direction[0] * entity.speed
+    predicted_y = entity.y + direction[1] * entity.speed
+    predicted_rect = entity.image.get_rect(center=(int(predicted_x), int(predicted_y)))
+    return not rect_is_blocked(entity.game, level_map, predicted_rect)
+
+
+def map_bounds(level_map):
+    """Pixel ranges from two tiles before to two tiles past the map, so edges and off-map positions are covered."""
+    width, height = map_size(level_map)
+    return (-2 * TILE_SIZE, width + 2 * TILE_SIZE), (-2 * TILE_SIZE, height + 2 * TILE_SIZE)
+
+
+def edge_positions(level_map):
+    """Centers on and just around every map edge (including the corners and the ends of short rows)."""
+    width, height = map_size(level_map)
+    xs = [-TILE_SIZE, -1, 0, 1, TILE_SIZE // 2, width - TILE_SIZE // 2, width - 1, width, width + 1, width + TILE_SIZE]
+    ys = [-TILE_SIZE, -1, 0, 1, TILE_SIZE // 2, height - TILE_SIZE // 2, height - 1, height, height + 1, height + TILE_SIZE]
+    positions = [(x, y) for x in xs for y in ys]
+    positions += [(x, y) for x in xs for y in range(0, height, TILE_SIZE // 4)]
+    positions += [(x, y) for x in range(0, width, TILE_SIZE // 4) for y in ys]
+    for row, text in enumerate(level_map): # Just past the end of each row
+        x = len(text) * TILE_SIZE
+        positions += [(x + dx, row * TILE_SIZE + TILE_SIZE // 2) for dx in (-TILE_SIZE // 2, -1, 0, 1, TILE_SIZE // 2)]
+    return positions
+
+
+@pytest.mark.parametrize("level_index", range(len(LEVEL_MAPS)))
+def test_can_move_matches_colliderect_scan(game, level_index):
+    game.load_level(level_index)
+    level_map = LEVEL_MAPS[level_index]
+    rng = random.Random(level_index)
+    (min_x, max_x), (min_y, max_y) = map_bounds(level_map)
+    entities = [game.pacman] + game.ghosts
+
+    cases = edge_positions(level_map)
+    cases += [(rng.uniform(min_x, max_x), rng.uniform(min_y, max_y)) for _ in range(SAMPLES)]
+    for x, y in cases:
+        entity = rng.choice(entities)
+        entity.x, entity.y = x, y
+        entity.speed = rng.choice([rng.uniform(0.1, 2 * TILE_SIZE), rng.randint(1, 8)])
+        for direction in DIRECTIONS:
+            assert entity.can_move_in_direction(direction) == reference_can_move_in_direction(entity, level_map, direction), \
+                (level_index, x, y, entity.speed, direction)
+
+
+@pytest.mark.parametrize("level_index", range(len(LEVEL_MAPS)))
+def test_area_has_wall_matches_colliderect_scan(game, level_index):
+    game.load_level(level_index)
+    rng = random.Random(100 + level_index)
+    level_map = LEVEL_MAPS[level_index]
+    (min_x, max_x), (min_y, max_y) = map_bounds(level_map)
+    for _ in range(SAMPLES):
+        left, top = rng.randint(int(min_x), int(max_x)), rng.randint(int(min_y), int(max_y))
+        width, height = rng.randint(0, 3 * TILE_SIZE), rng.randint(0, 3 * TILE_SIZE)
+        expected = rect_is_blocked(game, level_map, pygame.Rect(left, top, width, height))
+        assert game.area_has_wall(left, top, width, height) == expected, (level_index, left, top, width, height)
+
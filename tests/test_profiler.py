@@ -0,0 +1,76 @@
+"""FrameProfiler's ring buffer keeps the newest spans, and export() writes a loadable Chrome trace."""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from profiler import FrameProfiler
+
+CAPACITY = 8
+
+
+def recorded(count, capacity=CAPACITY):
+    """A profiler with `count` spans: span i is phase "draw" for even i, "update" for odd i, lasting (i + 1) ms."""
+    profiler = FrameProfiler("test", capacity=capacity)
+    for i in range(count):
+        start = profiler.origin + i * 10_000_000
+        profiler.record("draw" if i % 2 == 0 else "update", start, start + (i + 1) * 1_000_000)
+    return profiler
+
+
+@pytest.mark.parametrize("count", [3, CAPACITY, CAPACITY + 3, 3 * CAPACITY + 5])
+def test_spans_keep_the_newest_oldest_first(count):
+    profiler = recorded(count)
+    phases, starts, durations = profiler.spans()
+    kept = list(range(max(0, count - CAPACITY), count))
+    assert durations.tolist() == [(i + 1) * 1_000_000 for i in kept]
+    assert (starts - profiler.origin).tolist() == [i * 10_000_000 for i in kept]
+    assert [profiler.phase_names[p] for p in phases.tolist()] == ["draw" if i % 2 == 0 else "update" for i in kept]
+
+    _, _, last = profiler.spans(last=3)
+    assert last.tolist() == [(i + 1) * 1_000_000 for i in kept[-3:]]
+
+
+def test_stats_cover_the_last_spans_per_phase():
+    profiler = recorded(CAPACITY + 3) # Spans 3..10 kept
+    stats = profiler.stats(last=4) # Spans 7..10: update 8 ms and 10 ms, draw 9 ms and 11 ms
+    assert stats["update"]["p50"] == pytest.approx(np.percentile([8, 10], 50))
+    assert stats["draw"]["p99"] == pytest.approx(np.percentile([9, 11], 99))
+    assert set(profiler.stats()) == {"draw", "update"}
+    assert profiler.stats()["draw"]["p50"] == pytest.approx(np.percentile([5, 7, 9, 11], 50))
+
+
+def test_export_writes_a_chrome_trace(tmp_path):
+    profiler = recorded(CAPACITY + 3)
+    path = profiler.export(str(tmp_path / "trace.json"))
+    with open(path) as f:
+        trace = json.load(f)
+    assert trace["displayTimeUnit"] == "ms"
+    metadata, *events = trace["traceEvents"]
+    assert metadata == {"name": "process_name", "ph": "M", "pid": os.getpid(), "tid": 0, "args": {"name": "test"}}
+    assert len(events) == CAPACITY
+    for i, event in zip(range(3, CAPACITY + 3), events):
+        phase = "draw" if i % 2 == 0 else "update"
+        assert event == {"name": phase, "cat": phase, "ph": "X", "ts": pytest.approx(i * 10_000),
+                         "dur": pytest.approx((i + 1) * 1000), "pid": os.getpid(), "tid": 0} # Microseconds
+
+
+def test_export_category_is_the_phase_prefix(tmp_path):
+    profiler = FrameProfiler("test", capacity=CAPACITY)
+    profiler.record("draw.maze", profiler.origin, profiler.origin + 1000)
+    with open(profiler.export(str(tmp_path / "trace.json"))) as f:
+        assert json.load(f)["traceEvents"][1]["cat"] == "draw"
+
+
+def test_disabled_profiler_records_nothing(tmp_path):
+    profiler = FrameProfiler("test", capacity=CAPACITY)
+    start = profiler.start()
+    assert start == 0 and profiler.lap("draw", start) == 0
+    assert profiler.wrap("update", lambda x: x + 1)(1) == 2
+    assert profiler.count == 0 and profiler.export(str(tmp_path / "trace.json")) is None
+
+    profiler.toggle_overlay() # Showing the overlay starts recording
+    profiler.lap("draw", profiler.start())
+    assert profiler.wrap("update", lambda x: x + 1)(1) == 2
+    assert profiler.count == 2 and profiler.phase_names == ["draw", "update"]
@@ -0,0 +1,120 @@
+"""SnakeBatch plays exactly like one Snake/Food pair per board, run the way snake_game.main runs them.
+
+Both sides draw food cells from their own generators, so whenever a board's food
+is (re)spawned the batch's cell is checked to be free and then replaced by the
+scalar board's, keeping the two in step.
+"""
+import random
+
+import numpy as np
+
+from snake_batch import DIRECTION_DELTAS, NO_ACTION, SnakeBatch
+from snake_game import CELL_SIZE, GRID_SIZE, INITIAL_SNAKE_SPEED, Food, Snake, cell_index
+
+BOARDS = 8
+TICKS = 3000
+GREEDY = 0.85 # Share of actions that head for the food; the rest are random (and hit walls)
+DIRECTIONS = [tuple(delta) for delta in DIRECTION_DELTAS.tolist()] # Action index -> snake_game direction
+
+
+class ScalarBoard:
+    """One board of snake_game: the body of main()'s update() and its restart key."""
+    def __init__(self, seed):
+        self.snake = Snake()
+        self.food = Food(self.snake.free_cells, rng=random.Random(seed))
+        self.speed = INITIAL_SNAKE_SPEED
+        self.done = False
+
+    def reset(self):
+        self.snake.reset()
+        self.food.respawn(self.snake.free_cells)
+        self.speed = INITIAL_SNAKE_SPEED
+        self.done = False
+
+    def step(self, action):
+        """Returns (ate, ended, hit_wall)."""
+        if self.done:
+            return False, False, False
+        if action != NO_ACTION:
+            self.snake.turn(DIRECTIONS[action])
+        head = self.snake.get_head_position()
+        if self.snake.move():
+            x = head[0] // CELL_SIZE + self.snake.direction[0]
+            y = head[1] // CELL_SIZE + self.snake.direction[1]
+            self.done = True
+            return False, True, not (0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE)
+        if self.snake.get_head_position() not in self.food.positions:
+            return False, False, False
+        self.snake.eat()
+        self.food.remove(self.snake.get_head_position())
+        full = not self.food.spawn(self.snake.free_cells)
+        self.done = full
+        self.speed = INITIAL_SNAKE_SPEED + self.snake.length // 5
+        return True, full, False
+
+    def cells(self):
+        return [(x // CELL_SIZE, y // CELL_SIZE) for x, y in self.snake.positions]
+
+    def food_cell(self):
+        return cell_index(self.food.position)
+
+
+def choose_action(board, rng):
+    if rng.random() >= GREEDY:
+        return rng.choice([NO_ACTION, 0, 1, 2, 3])
+    head_x, head_y = board.cells()[0]
+    food_x, food_y = board.food_cell() % GRID_SIZE, board.food_cell() // GRID_SIZE
+    if food_x != head_x:
+        return 3 if food_x > head_x else 2 # RIGHT / LEFT
+    return 1 if food_y > head_y else 0 # DOWN / UP
+
+
+def sync_food(batch, boards, b):
+    food = batch.food[b]
+    assert food >= 0 and not batch.occupied[b, food], b # Spawned on a free cell
+    batch.food[b] = boards[b].food_cell()
+
+
+def assert_same(batch, boards, tick):
+    for b, board in enumerate(boards):
+        assert batch.body_cells(b) == board.cells(), (tick, b)
+        assert bool(batch.grow_pending[b]) == board.snake.grow_pending, (tick, b)
+        assert batch.score[b] == board.snake.score, (tick, b)
+        assert bool(batch.done[b]) == board.done, (tick, b)
+        assert batch.speed[b] == board.speed, (tick, b) # Ticks per second
+        assert batch.food[b] == board.food_cell(), (tick, b)
+        occupied = np.zeros(GRID_SIZE * GRID_SIZE, dtype=bool)
+        occupied[[y * GRID_SIZE + x for x, y in board.cells()]] = True
+        assert (batch.occupied[b] == occupied).all(), (tick, b)
+
+
+def test_batch_matches_scalar_boards():
+    batch = SnakeBatch(BOARDS, seed=0)
+    boards = [ScalarBoard(seed) for seed in range(BOARDS)]
+    for b in range(BOARDS):
+        sync_food(batch, boards, b)
+    rng = random.Random(0)
+    events = {"ate": 0, "wall": 0, "self": 0, "reset": 0}
+
+    for tick in range(TICKS):
+        assert_same(batch, boards, tick)
+        actions = np.array([choose_action(board, rng) for board in boards])
+        results = [board.step(action) for board, action in zip(boards, actions.tolist())]
+        ate, ended = batch.step(actions)
+        for b, (board_ate, board_ended, hit_wall) in enumerate(results):
+            assert (bool(ate[b]), bool(ended[b])) == (board_ate, board_ended), (tick, b)
+            if board_ate:
+                events["ate"] += 1
+                sync_food(batch, boards, b)
+            if board_ended:
+                events["wall" if hit_wall else "self"] += 1
+        # Restart finished boards a tick later, as the R key would
+        finished = [b for b, board in enumerate(boards) if board.done and rng.random() < 0.5]
+        if finished:
+            events["reset"] += len(finished)
+            batch.reset(finished)
+            for b in finished:
+                boards[b].reset()
+                sync_food(batch, boards, b)
+
+    assert all(events.values()), events # Eating, both kinds of crash and resets were all covered
@@ -0,0 +1,161 @@
+"""snake_game's free-cell index, occupancy bookkeeping and food spawning."""
+import random
+
+from snake_game import CELL_SIZE, DOWN, GRID_SIZE, LEFT, RIGHT, UP, Food, FreeCells, Snake, cell_index, cell_position
+
+
+def assert_consistent(free):
+    """Every listed cell points back at its slot, and every unlisted cell is marked taken."""
+    assert len(set(free.cells)) == len(free.cells)
+    for slot, cell in enumerate(free.cells):
+        assert free.slots[cell] == slot
+    listed = set(free.cells)
+    assert all((free.slots[cell] >= 0) == (cell in listed) for cell in range(len(free.slots)))
+
+
+def assert_snake_consistent(snake):
+    """occupied and free_cells describe exactly the cells under the snake's body."""
+    body = {cell_index(p) for p in snake.positions}
+    assert len(body) == len(snake.positions) # No overlapping segments
+    assert {cell for cell in range(GRID_SIZE * GRID_SIZE) if snake.occupied[cell]} == body
+    assert set(snake.free_cells.cells) == set(range(GRID_SIZE * GRID_SIZE)) - body
+    assert_consistent(snake.free_cells)
+
+
+def test_free_cells_swap_remove():
+    free = FreeCells(5)
+    free.discard(1) # The last cell (4) moves into slot 1
+    assert free.cells == [0, 4, 2, 3]
+    assert free.slots == [0, -1, 2, 3, 1]
+    free.discard(3) # Removing the last entry moves nothing
+    assert free.cells == [0, 4, 2]
+    free.discard(3) # Already taken: no-op
+    free.add(1)
+    free.add(1) # Already free: no-op
+    assert free.cells == [0, 4, 2, 1]
+    assert 1 in free and 3 not in free and len(free) == 4
+    assert_consistent(free)
+
+
+def test_free_cells_random_bookkeeping():
+    rng = random.Random(0)
+    free = FreeCells(50)
+    expected = set(range(50))
+    for _ in range(2000):
+        cell = rng.randrange(50)
+        if rng.random() < 0.5:
+            free.discard(cell)
+            expected.discard(cell)
+        else:
+            free.add(cell)
+            expected.add(cell)
+        assert set(free.cells) == expected
+        assert_consistent(free)
+    assert free.random_cell(rng) in expected
+
+
+def test_random_cell_on_full_board():
+    free = FreeCells(3)
+    for cell in range(3):
+        free.discard(cell)
+    assert free.random_cell(random.Random(0)) is None
+
+
+def test_move_releases_the_tail_unless_growing():
+    snake = Snake()
+    tail = cell_index(snake.positions[-1])
+    assert not snake.move()
+    assert not snake.occupied[tail] and tail in snake.free_cells and len(snake.positions) == 3
+    assert_snake_consistent(snake)
+
+    tail = cell_index(snake.positions[-1])
+    snake.eat()
+    assert not snake.move() # Growing: the tail stays
+    assert snake.occupied[tail] and tail not in snake.free_cells
+    assert len(snake.positions) == snake.length == 4 and not snake.grow_pending
+    assert_snake_consistent(snake)
+
+
+def turn_in_a_square(snake, grow):
+    """Length-4 snake: DOWN, LEFT, UP puts the head back on the cell the tail is just leaving."""
+    snake.eat()
+    assert not snake.move() # Length 4
+    for direction in (DOWN, LEFT):
+        snake.turn(direction)
+        assert not snake.move()
+    snake.turn(UP)
+    if grow:
+        snake.eat()
+    return snake.move()
+
+
+def test_moving_into_the_vacating_tail_cell():
+    snake = Snake()
+    assert not turn_in_a_square(snake, grow=False) # The tail moves away in the same tick
+    assert_snake_consistent(snake)
+
+
+def test_moving_into_the_tail_cell_while_growing_collides():
+    snake = Snake()
+    assert turn_in_a_square(snake, grow=True) # The tail stays, so the head runs into it
+    assert len(snake.positions) == 4
+    assert_snake_consistent(snake)
+
+
+def test_self_collision_and_wall_collision():
+    snake = Snake()
+    for _ in range(2):
+        snake.eat()
+        assert not snake.move() # Length 5
+    for direction in (DOWN, LEFT):
+        snake.turn(direction)
+        assert not snake.move()
+    snake.turn(UP)
+    assert snake.move() # Into the segment just ahead of the tail
+
+    snake = Snake()
+    x = snake.get_head_position()[0] // CELL_SIZE
+    assert all(not snake.move() for _ in range(GRID_SIZE - 1 - x))
+    assert snake.move() # Off the right edge
+    assert_snake_consistent(snake)
+
+
+def test_turn_ignores_reversal():
+    snake = Snake()
+    snake.turn(LEFT)
+    assert snake.direction == RIGHT
+    snake.turn(UP)
+    assert snake.direction == UP
+
+
+def test_cell_index_round_trip():
+    assert all(cell_index(cell_position(cell)) == cell for cell in range(GRID_SIZE * GRID_SIZE))
+
+
+def test_food_spawns_count_items_off_the_snake():
+    snake = Snake()
+    food = Food(snake.free_cells, count=5, rng=random.Random(0))
+    cells = [cell_index(p) for p in food.positions]
+    assert len(cells) == len(set(cells)) == 5
+    assert not any(snake.occupied[cell] for cell in cells)
+    assert len(snake.free_cells) == GRID_SIZE * GRID_SIZE - 3 # Food does not take cells out of the index
+
+    food.remove(food.positions[0])
+    assert food.spawn(snake.free_cells) and len(food.positions) == 5 # Topped back up
+    assert len({cell_index(p) for p in food.positions}) == 5
+
+
+def test_food_spawn_on_a_nearly_full_board():
+    snake = Snake()
+    free = list(snake.free_cells.cells)
+    for cell in free[2:]: # Leave two free cells
+        snake.occupied[cell] = 1
+        snake.free_cells.discard(cell)
+    food = Food(snake.free_cells, count=3, rng=random.Random(0))
+    assert sorted(cell_index(p) for p in food.positions) == sorted(free[:2]) # Only room for two
+    assert sorted(snake.free_cells.cells) == sorted(free[:2])
+
+    snake.free_cells.discard(free[0])
+    snake.free_cells.discard(free[1])
+    assert not food.respawn(snake.free_cells) # Board full: no food at all
+    assert food.positions == [] and food.position is None
@@ -0,0 +1,88 @@
+"""SpriteAtlas blits reproduce the direct draw_*_shape drawing pixel for pixel."""
+import pygame
+import pytest
+
+from pacman_game import (GHOST_COLORS, GHOST_DIRECTIONS, LEVEL_MAPS, STOP, TILE_SIZE, YELLOW, Game,
+                         draw_ghost_shape, draw_pacman_shape)
+
+
+@pytest.fixture(scope="module")
+def game():
+    game = Game(seed=0)
+    yield game
+    pygame.quit()
+
+
+def centers(game):
+    """A tile center in open maze, one over a wall, one off the tile grid and one hanging off the bottom-right edge.
+
+    Not the top-left edge: there pygame clips the mouth polygon of a directly drawn Pacman differently
+    (off by a pixel), and Pacman never gets there since every map is walled in.
+    """
+    level_map = LEVEL_MAPS[game.current_level_index]
+    open_col, open_row = game.pacman_start_pos
+    width, height = game.maze_layer.get_size()
+    return [
+        (open_col * TILE_SIZE + TILE_SIZE // 2, open_row * TILE_SIZE + TILE_SIZE // 2),
+        (TILE_SIZE // 2, TILE_SIZE // 2) if level_map[0][0] == "W" else (TILE_SIZE, TILE_SIZE),
+        (TILE_SIZE // 2 + 3, TILE_SIZE // 2 + 7), # Off the tile grid
+        (width - 3, height - 2),
+    ]
+
+
+def assert_same_pixels(direct, via_atlas, case):
+    assert pygame.image.tobytes(direct, "RGBA") == pygame.image.tobytes(via_atlas, "RGBA"), case
+
+
+def test_pacman_sprites_match_direct_drawing(game):
+    pacman = game.pacman
+    for center in centers(game):
+        for direction in GHOST_DIRECTIONS: # UP, DOWN, LEFT, RIGHT, STOP
+            for open_mouth in (True, False):
+                direct = game.maze_layer.copy()
+                draw_pacman_shape(direct, YELLOW, center, pacman.size, direction, open_mouth and direction != STOP)
+
+                via_atlas = game.maze_layer.copy()
+                pacman.x = pacman.prev_x = center[0]
+                pacman.y = pacman.prev_y = center[1]
+                pacman.rect.center = center
+                pacman.direction, pacman.open_mouth = direction, open_mouth
+                pacman.draw(via_atlas)
+                assert_same_pixels(direct, via_atlas, (center, direction, open_mouth))
+
+
+def test_ghost_sprites_match_direct_drawing(game):
+    ghost = game.ghosts[0]
+    for center in centers(game):
+        for color in GHOST_COLORS:
+            for direction in GHOST_DIRECTIONS:
+                direct = game.maze_layer.copy()
+                draw_ghost_shape(direct, color, center, ghost.size, direction)
+
+                via_atlas = game.maze_layer.copy()
+                ghost.x = ghost.prev_x = center[0]
+                ghost.y = ghost.prev_y = center[1]
+                ghost.rect.center = center
+                ghost.color, ghost.direction = color, direction
+                ghost.draw(via_atlas)
+                assert_same_pixels(direct, via_atlas, (center, color, direction))
+
+
+def test_atlas_sprites_match_at_every_entity_size(game):
+    """Both sizes the game uses, drawn straight from the atlas the way GhostBatch.draw blits them."""
+    center = centers(game)[0]
+    for size in sorted({game.pacman.size, game.ghosts[0].size}):
+        for direction in GHOST_DIRECTIONS:
+            for open_mouth in (True, False):
+                direct = game.maze_layer.copy()
+                draw_pacman_shape(direct, YELLOW, center, size, direction, open_mouth)
+                via_atlas = game.maze_layer.copy()
+                via_atlas.blit(game.sprites.pacman(YELLOW, size, direction, open_mouth),
+                               (center[0] - size, center[1] - size))
+                assert_same_pixels(direct, via_atlas, ("pacman", size, direction, open_mouth))
+            for color in GHOST_COLORS:
+                direct = game.maze_layer.copy()
+                draw_ghost_shape(direct, color, center, size, direction)
+                via_atlas = game.maze_layer.copy()
+                via_atlas.blits([(game.sprites.ghost(color, size, direction), (center[0] - size, center[1] - size))])
+                assert_same_pixels(direct, via_atlas, ("ghost", size, color, direction))
@@ -0,0 +1,56 @@
+"""TextCache returns cached renders and evicts the least recently used string."""
+from text_cache import TEXT_CACHE_SIZE, TextCache
+
+WHITE = (255, 255, 255)
+
+
+class CountingFont:
+    """Stands in for pygame.font.Font: each render returns a new object and is counted."""
+    def __init__(self):
+        self.renders = []
+
+    def render(self, text, antialias, color):
+        surface = object()
+        self.renders.append((text, antialias, color))
+        return surface
+
+
+def test_hits_reuse_the_render():
+    font = CountingFont()
+    cache = TextCache()
+    score = cache.render(font, "Score: 10", True, WHITE)
+    assert cache.render(font, "Score: 10", True, WHITE) is score
+    assert font.renders == [("Score: 10", True, WHITE)]
+    # Any part of the key changing is a new render
+    cache.render(font, "Score: 20", True, WHITE)
+    cache.render(font, "Score: 10", False, WHITE)
+    cache.render(font, "Score: 10", True, (255, 0, 0))
+    cache.render(CountingFont(), "Score: 10", True, WHITE)
+    assert cache.stats() == {"hits": 1, "misses": 5, "size": 5}
+
+
+def test_least_recently_used_is_evicted():
+    font = CountingFont()
+    cache = TextCache(max_size=3)
+    a = cache.render(font, "a", True, WHITE)
+    cache.render(font, "b", True, WHITE)
+    cache.render(font, "c", True, WHITE)
+    assert cache.render(font, "a", True, WHITE) is a # Now "b" is the oldest
+    cache.render(font, "d", True, WHITE)
+    assert cache.stats()["size"] == 3
+    assert cache.render(font, "a", True, WHITE) is a
+    cache.render(font, "c", True, WHITE)
+    assert len(font.renders) == 4 # "a" and "c" were still cached
+    cache.render(font, "b", True, WHITE) # Was evicted: rendered again
+    assert [text for text, _, _ in font.renders] == ["a", "b", "c", "d", "b"]
+
+
+def test_default_size_and_clear():
+    font = CountingFont()
+    cache = TextCache()
+    for i in range(TEXT_CACHE_SIZE + 10):
+        cache.render(font, str(i), True, WHITE)
+    assert cache.stats()["size"] == TEXT_CACHE_SIZE
+    cache.clear()
+    cache.render(font, str(TEXT_CACHE_SIZE + 9), True, WHITE)
+    assert cache.stats() == {"hits": 0, "misses": TEXT_CACHE_SIZE + 11, "size": 1}
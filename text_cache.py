@@ -0,0 +1,41 @@
+"""Small LRU cache of rendered text surfaces, shared by the games' HUDs.
+
+font.render allocates a new Surface on every call, but HUD text (score, lives,
+level, overlay messages) rarely changes between frames. TextCache keeps the
+most recently used renders keyed by font, text, antialias flag and color, so a
+string is only rendered again after its value changes.
+"""
+from collections import OrderedDict
+
+TEXT_CACHE_SIZE = 32 # Max rendered strings kept per cache
+
+
+class TextCache:
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0 # Renders served from the cache
+        self.misses = 0 # Renders that had to call font.render
+
+    def render(self, font, text, antialias, color):
+        """Same as font.render(text, antialias, color), reusing the Surface when possible."""
+        key = (font, text, antialias, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False) # Evict the least recently used string
+        return surface
+
+    def stats(self):
+        """Returns the hit/miss counters and current size, e.g. for logging."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.surfaces)}
+
+    def clear(self):
+        self.surfaces.clear()